@@ -0,0 +1,255 @@
+"""
+An index of the auctions that are still open, for browse and search pages.
+Auctions enter it when they are created and leave it when they close, so its
+size follows the number of open auctions, not the whole history. It keeps:
+  - sorted (key, auction ID) indexes by end time, current price and bid count,
+    so a page in any of those orders is a short walk from one end;
+  - a sorted index of lower-cased item names, so a prefix search is a bisect;
+  - per item-name word, the auctions containing it ordered by end time, so a
+    keyword search walks the rarest word's list and stops after one page.
+Auctions update it from inside their own lock on each bid, extension and
+close; it never calls back into an auction.
+"""
+
+from bisect import bisect_left, insort
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Set, Tuple, TYPE_CHECKING
+import re
+import threading
+
+if TYPE_CHECKING:
+    from auction import Auction
+
+ORDER_BY_END_TIME = "end_time"
+ORDER_BY_PRICE = "price"
+ORDER_BY_BID_COUNT = "bid_count"
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> Set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+class _SortedIndex:
+    """
+    A sorted list split into buckets of at most 2 * LOAD entries, so an insert
+    or delete shifts one bucket instead of the whole list: O(log n + LOAD).
+    """
+
+    LOAD = 500
+
+    def __init__(self):
+        self._buckets: List[List[Any]] = []
+        self._maxes: List[Any] = []  # The last entry of each bucket
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, entry):
+        if not self._buckets:
+            self._buckets.append([entry])
+            self._maxes.append(entry)
+        else:
+            index = bisect_left(self._maxes, entry)
+            if index == len(self._maxes):
+                index -= 1
+            bucket = self._buckets[index]
+            insort(bucket, entry)
+            self._maxes[index] = bucket[-1]
+            if len(bucket) > 2 * self.LOAD:
+                self._buckets.insert(index + 1, bucket[self.LOAD :])
+                del bucket[self.LOAD :]
+                self._maxes.insert(index, bucket[-1])
+        self._len += 1
+
+    def remove(self, entry):
+        index = bisect_left(self._maxes, entry)
+        if index == len(self._maxes):
+            return
+        bucket = self._buckets[index]
+        position = bisect_left(bucket, entry)
+        if position == len(bucket) or bucket[position] != entry:
+            return
+        del bucket[position]
+        self._len -= 1
+        if bucket:
+            self._maxes[index] = bucket[-1]
+        else:
+            del self._buckets[index]
+            del self._maxes[index]
+
+    def bisect(self, entry) -> Iterator:
+        """Iterates the entries from the first one >= entry, in order."""
+        index = bisect_left(self._maxes, entry)
+        if index == len(self._maxes):
+            return
+        bucket = self._buckets[index]
+        yield from bucket[bisect_left(bucket, entry) :]
+        for bucket in self._buckets[index + 1 :]:
+            yield from bucket
+
+    def page(self, offset: int, limit: int, descending: bool = False) -> List:
+        """limit entries after skipping offset, from the low end or the high end."""
+        buckets = reversed(self._buckets) if descending else self._buckets
+        page: List = []
+        for bucket in buckets:
+            if offset >= len(bucket):
+                offset -= len(bucket)
+                continue
+            if descending:
+                end = len(bucket) - offset
+                page.extend(bucket[max(0, end - (limit - len(page))) : end][::-1])
+            else:
+                page.extend(bucket[offset : offset + limit - len(page)])
+            offset = 0
+            if len(page) >= limit:
+                break
+        return page
+
+    def __iter__(self) -> Iterator:
+        for bucket in self._buckets:
+            yield from bucket
+
+
+class ActiveAuctionCatalogue:
+    def __init__(self):
+        self._active: Dict[str, "Auction"] = {}  # In creation order
+        # Current sort keys per auction, to find its old entries when they change
+        self._keys: Dict[str, Tuple[float, Decimal, int]] = {}
+        self._by_end_time = _SortedIndex()  # (end timestamp, auction ID)
+        self._by_price = _SortedIndex()  # (price, auction ID)
+        self._by_bid_count = _SortedIndex()  # (bid count, auction ID)
+        self._names = _SortedIndex()  # (lower-cased item name, auction ID)
+        self._word_index: Dict[str, _SortedIndex] = {}  # word -> (end timestamp, auction ID)
+        self._auction_words: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    # ----- Updates -----
+
+    def add(self, auction: "Auction"):
+        """Indexes an open auction with its current end time, price and bid count."""
+        state, end_time, best_bid, count = auction.get_ledger_state()
+        price = auction.get_base_price() if best_bid is None else best_bid.get_amount()
+        auction_id = auction.get_id()
+        end_timestamp = end_time.timestamp()
+        name = auction.get_item_name().lower()
+        words = _words(name)
+        with self._lock:
+            if auction_id in self._active:
+                return
+            self._active[auction_id] = auction
+            self._keys[auction_id] = (end_timestamp, price, count)
+            self._by_end_time.add((end_timestamp, auction_id))
+            self._by_price.add((price, auction_id))
+            self._by_bid_count.add((count, auction_id))
+            self._names.add((name, auction_id))
+            self._auction_words[auction_id] = words
+            for word in words:
+                self._word_index.setdefault(word, _SortedIndex()).add((end_timestamp, auction_id))
+
+    def remove(self, auction: "Auction"):
+        """Drops an auction, e.g. when it closes."""
+        auction_id = auction.get_id()
+        with self._lock:
+            if self._active.pop(auction_id, None) is None:
+                return
+            end_timestamp, price, count = self._keys.pop(auction_id)
+            self._by_end_time.remove((end_timestamp, auction_id))
+            self._by_price.remove((price, auction_id))
+            self._by_bid_count.remove((count, auction_id))
+            self._names.remove((auction.get_item_name().lower(), auction_id))
+            for word in self._auction_words.pop(auction_id):
+                posting = self._word_index[word]
+                posting.remove((end_timestamp, auction_id))
+                if not len(posting):
+                    del self._word_index[word]
+
+    def on_bid(self, auction: "Auction", price: Decimal, bid_count: int):
+        """Moves an auction to its new price and bid count."""
+        auction_id = auction.get_id()
+        with self._lock:
+            keys = self._keys.get(auction_id)
+            if keys is None:
+                return
+            end_timestamp, old_price, old_count = keys
+            self._keys[auction_id] = (end_timestamp, price, bid_count)
+            self._by_price.remove((old_price, auction_id))
+            self._by_price.add((price, auction_id))
+            self._by_bid_count.remove((old_count, auction_id))
+            self._by_bid_count.add((bid_count, auction_id))
+
+    def on_extend(self, auction: "Auction", end_timestamp: float):
+        """Moves an auction to its new end time."""
+        auction_id = auction.get_id()
+        with self._lock:
+            keys = self._keys.get(auction_id)
+            if keys is None:
+                return
+            old_end_timestamp, price, count = keys
+            self._keys[auction_id] = (end_timestamp, price, count)
+            self._by_end_time.remove((old_end_timestamp, auction_id))
+            self._by_end_time.add((end_timestamp, auction_id))
+            for word in self._auction_words[auction_id]:
+                posting = self._word_index[word]
+                posting.remove((old_end_timestamp, auction_id))
+                posting.add((end_timestamp, auction_id))
+
+    # ----- Queries -----
+
+    def get_active_count(self) -> int:
+        return len(self._active)
+
+    def get_all(self) -> List["Auction"]:
+        """Every open auction, in creation order."""
+        with self._lock:
+            return list(self._active.values())
+
+    def browse(
+        self,
+        order_by: str = ORDER_BY_END_TIME,
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> List["Auction"]:
+        """One page of open auctions ordered by end time, price or bid count."""
+        index = {
+            ORDER_BY_END_TIME: self._by_end_time,
+            ORDER_BY_PRICE: self._by_price,
+            ORDER_BY_BID_COUNT: self._by_bid_count,
+        }.get(order_by)
+        if index is None:
+            raise ValueError(f"Cannot order auctions by {order_by}.")
+        with self._lock:
+            page = index.page(offset, limit, descending)
+            return [self._active[auction_id] for _, auction_id in page]
+
+    def search_prefix(self, prefix: str, limit: int = 20) -> List["Auction"]:
+        """Open auctions whose item name starts with prefix (case-insensitive), by name."""
+        prefix = prefix.lower()
+        matches = []
+        with self._lock:
+            for name, auction_id in self._names.bisect((prefix, "")):
+                if len(matches) >= limit or not name.startswith(prefix):
+                    break
+                matches.append(self._active[auction_id])
+        return matches
+
+    def search_keywords(self, text: str, limit: int = 20) -> List["Auction"]:
+        """Open auctions whose item name contains every word in text, ending soonest first."""
+        words = _words(text)
+        if not words:
+            return []
+        matches = []
+        with self._lock:
+            postings = [self._word_index.get(word) for word in words]
+            if any(posting is None for posting in postings):
+                return []
+            # Walk the rarest word's auctions in end-time order; stop after one page
+            for _, auction_id in min(postings, key=len):
+                if words <= self._auction_words[auction_id]:
+                    matches.append(self._active[auction_id])
+                    if len(matches) >= limit:
+                        break
+        return matches
@@ -4,35 +4,83 @@ handles thread-safe bid placements, and notifies observers (Users)
 of important events like being outbid or the auction ending.
 """
 
-from typing import List, Set, Optional, TYPE_CHECKING
+from typing import Callable, Iterable, List, Set, Optional, Tuple, TYPE_CHECKING
 from bid import Bid
+from bid_book import BidBook
+from compact_bid_book import CompactBidBook
 from auction_state import AuctionState
 from datetime import datetime
 from decimal import Decimal
 import uuid
 import threading
+import time
 
 if TYPE_CHECKING:
     from user import User
     from auction_observer import AuctionObserver
+    from notification_dispatcher import NotificationDispatcher
+    from bid_ledger import BidLedger
+    from active_auction_catalogue import ActiveAuctionCatalogue
 
 
 class Auction:
     def __init__(
-        self, item_name: str, description: str, base_price: Decimal, end_time: datetime
+        self,
+        item_name: str,
+        description: str,
+        base_price: Decimal,
+        end_time: datetime,
+        auction_id: Optional[str] = None,
+        compact_bids: bool = False,
     ):
-        self.id = str(uuid.uuid4())
+        self.id = auction_id or str(uuid.uuid4())  # An existing ID when restoring
         self.item_name = item_name
+        self.description = description
         self.base_price = base_price
         self.end_time = end_time
-        self.bids: List[Bid] = []
+        # Ordered bids; the best one is O(1) to read. The compact book stores
+        # them in int columns, for auctions expecting very many bids
+        self.bid_book = CompactBidBook() if compact_bids else BidBook()
         self.observers: Set[AuctionObserver] = set()
         self.state = AuctionState.ACTIVE
         self.winning_bid: Optional[Bid] = None
         self._lock = threading.RLock()  # Lock for thread-safe bid placement
+        # Queues notifications for background delivery; None delivers inline
+        self.dispatcher: Optional["NotificationDispatcher"] = None
+        # Durable record of bids and state changes; None keeps them in memory only
+        self.ledger: Optional["BidLedger"] = None
+        # Browse/search index of open auctions, kept current on every change
+        self.catalogue: Optional["ActiveAuctionCatalogue"] = None
+        # Reads the bids a restore left out (oldest first) back from the ledger
+        self._older_bids_loader: Optional[Callable[[int], List[Bid]]] = None
+        # (amount to beat, is active, end time as a Unix timestamp), replaced as a
+        # whole under the lock so place_bid can read it without taking the lock
+        self._snapshot: Tuple[Decimal, bool, float] = (
+            base_price, True, end_time.timestamp()
+        )
+
+    def _publish_snapshot(self):
+        """Called with the lock held whenever the high bid, state or end time changes."""
+        highest_bid = self.bid_book.get_best()
+        self._snapshot = (
+            self.base_price if highest_bid is None else highest_bid.get_amount(),
+            self.state == AuctionState.ACTIVE,
+            self.end_time.timestamp(),
+        )
 
     def place_bid(self, bidder: "User", amount: Decimal):
         """Places a new bid, validates it, and notifies the previous high bidder."""
+        # Fast reject without the lock: the high bid only rises and an auction
+        # never reopens, so a bid that loses against the snapshot loses for good.
+        # Bids that might win are re-checked under the lock below.
+        amount_to_beat, is_active, end_timestamp = self._snapshot
+        if not is_active:
+            raise Exception("Auction is not active.")
+        if time.time() > end_timestamp:
+            raise Exception("Auction has ended.")
+        if amount <= amount_to_beat:
+            raise ValueError("Bid must be higher than current highest bid.")
+
         with self._lock:
             if self.state != AuctionState.ACTIVE:
                 raise Exception("Auction is not active.")
@@ -51,7 +99,13 @@ class Auction:
             )
 
             new_bid = Bid(bidder, amount)
-            self.bids.append(new_bid)
+            self.bid_book.add(new_bid)
+            self._publish_snapshot()
+            if self.ledger is not None:
+                # Appended under the lock, so ledger order matches bid offsets
+                self.ledger.append_bid(self, len(self.bid_book) - 1, new_bid)
+            if self.catalogue is not None:
+                self.catalogue.on_bid(self, amount, len(self.bid_book))
             self.add_observer(bidder)  # Add this bidder to the notification list
             print(
                 f"SUCCESS: {bidder.get_name()} placed a bid of ${amount:.2f} on '{self.item_name}'."
@@ -65,6 +119,7 @@ class Auction:
                 self.notify_observer(
                     previous_highest_bidder,
                     f"You have been outbid on {self.item_name}! The new highest bid is ${amount:.2f}.",
+                    coalesce_key="outbid",  # Only the latest outbid message matters
                 )
 
     def end_auction(self):
@@ -74,6 +129,11 @@ class Auction:
                 return  # Already ended
 
             self.state = AuctionState.CLOSED
+            self._publish_snapshot()
+            if self.ledger is not None:
+                self.ledger.append({"op": "end", "a": self.id})
+            if self.catalogue is not None:
+                self.catalogue.remove(self)
             self.winning_bid = self.get_highest_bid()
 
             if self.winning_bid is not None:
@@ -86,11 +146,155 @@ class Auction:
             print(f"\n{end_message.upper()}")
             self.notify_all_observers(end_message)
 
+    def extend_end_time(self, new_end_time: datetime):
+        """Pushes the end time back, e.g. to stop last-second sniping."""
+        with self._lock:
+            if self.state != AuctionState.ACTIVE:
+                raise Exception("Auction is not active.")
+            if new_end_time <= self.end_time:
+                raise ValueError("An auction can only be extended to a later end time.")
+            self._set_end_time(new_end_time)
+
+    def extend_end_time_if_later(self, new_end_time: datetime) -> bool:
+        """
+        Extends the auction only if it is still active and new_end_time is
+        later than its end time (e.g. a bid that raced the close or another
+        extension). Returns whether it was extended.
+        """
+        with self._lock:
+            if self.state != AuctionState.ACTIVE or new_end_time <= self.end_time:
+                return False
+            self._set_end_time(new_end_time)
+            return True
+
+    def _set_end_time(self, new_end_time: datetime):
+        """Called with the lock held, once the extension has been validated."""
+        self.end_time = new_end_time
+        self._publish_snapshot()
+        if self.ledger is not None:
+            self.ledger.append(
+                {"op": "extend", "a": self.id, "end": new_end_time.timestamp()}
+            )
+        if self.catalogue is not None:
+            self.catalogue.on_extend(self, new_end_time.timestamp())
+
+    def set_ledger(self, ledger: Optional["BidLedger"]):
+        self.ledger = ledger
+
+    def set_older_bids_loader(self, loader: Optional[Callable[[int], List[Bid]]]):
+        """
+        After a restore, tells the auction how to read back the bids the
+        snapshot left out: loader(count) returns the first count bids, oldest
+        first. They are read once, the first time the full history or more top
+        bids than are held are asked for.
+        """
+        self._older_bids_loader = loader
+
+    def record_bids(self, ledger: "BidLedger"):
+        """
+        Starts recording to a newly attached ledger, after appending every bid
+        held so far, so the ledger holds the full history from the start.
+        """
+        with self._lock:
+            bids = self.bid_book.get_bids()
+            first_offset = len(self.bid_book) - len(bids)
+            for index, bid in enumerate(bids):
+                ledger.append_bid(self, first_offset + index, bid)
+            self.ledger = ledger
+
+    def set_catalogue(self, catalogue: Optional["ActiveAuctionCatalogue"]):
+        """Indexes this auction in the catalogue while it is open."""
+        self.catalogue = catalogue
+        if catalogue is not None and self.is_active():
+            catalogue.add(self)
+
+    def restore(
+        self,
+        state: AuctionState,
+        end_time: datetime,
+        recent_bids: List[Bid],
+        bid_count: int,
+        bidders: Iterable["AuctionObserver"] = (),
+    ):
+        """
+        Resets the auction to a ledger snapshot (no validation, no notifications).
+        recent_bids are its latest bids, lowest first; bidders are everyone who
+        had bid, so they are still told when it ends.
+        """
+        with self._lock:
+            self.state = state
+            self.end_time = end_time
+            self.bid_book.restore(recent_bids, bid_count)
+            for bidder in bidders:
+                self.add_observer(bidder)
+            for bid in recent_bids:
+                self.add_observer(bid.get_bidder())
+            if state != AuctionState.ACTIVE:
+                self.winning_bid = self.bid_book.get_best()
+            self._publish_snapshot()
+
+    def replay_bid(self, offset: int, bid: Bid):
+        """
+        Re-applies a bid from the ledger. Bids at offsets the auction already
+        holds (e.g. ones included in the snapshot) are skipped.
+        """
+        with self._lock:
+            if offset < len(self.bid_book):
+                return
+            self.bid_book.add(bid)
+            self.add_observer(bid.get_bidder())
+            self._publish_snapshot()
+
+    def replay_end(self):
+        """Re-applies a close from the ledger without notifying anyone."""
+        with self._lock:
+            if self.state == AuctionState.ACTIVE:
+                self.state = AuctionState.CLOSED
+                self.winning_bid = self.get_highest_bid()
+                self._publish_snapshot()
+
+    def replay_extension(self, end_time: datetime):
+        with self._lock:
+            if end_time > self.end_time:
+                self.end_time = end_time
+                self._publish_snapshot()
+
+    def get_ledger_state(self) -> Tuple[AuctionState, datetime, Optional[Bid], int]:
+        """Reads (state, end time, best bid, bid count) consistently, for a ledger snapshot."""
+        with self._lock:
+            return self.state, self.end_time, self.bid_book.get_best(), len(self.bid_book)
+
+    def get_snapshot_state(
+        self, recent: int
+    ) -> Tuple[AuctionState, datetime, List[Bid], int, List["AuctionObserver"]]:
+        """
+        Reads (state, end time, the latest `recent` bids lowest first, bid count,
+        observers) consistently, for a ledger snapshot.
+        """
+        with self._lock:
+            return (
+                self.state,
+                self.end_time,
+                self.bid_book.get_top(recent)[::-1],
+                len(self.bid_book),
+                list(self.observers),
+            )
+
     def get_highest_bid(self) -> Optional[Bid]:
-        """Finds the highest bid based on Bid's comparison logic."""
-        if not self.bids:
-            return None
-        return max(self.bids)
+        """Returns the highest bid based on Bid's comparison logic, in O(1)."""
+        return self.bid_book.get_best()
+
+    def get_top_bids(self, k: int) -> List[Bid]:
+        """Returns the k highest bids, highest first."""
+        with self._lock:
+            held = len(self.bid_book) - self.bid_book.get_dropped_count()
+        if k > held:
+            self._load_older_bids()
+        with self._lock:
+            return self.bid_book.get_top(k)
+
+    def get_bid_count(self) -> int:
+        return len(self.bid_book)
 
     def is_active(self) -> bool:
         return self.state == AuctionState.ACTIVE
@@ -98,12 +302,24 @@ class Auction:
     def add_observer(self, observer: "AuctionObserver"):
         self.observers.add(observer)
 
+    def set_dispatcher(self, dispatcher: Optional["NotificationDispatcher"]):
+        self.dispatcher = dispatcher
+
     def notify_all_observers(self, message: str):
         for observer in self.observers:
-            observer.on_update(self, message)
+            self.notify_observer(observer, message)
 
-    def notify_observer(self, observer: "AuctionObserver", message: str):
-        observer.on_update(self, message)
+    def notify_observer(
+        self, observer: "AuctionObserver", message: str, coalesce_key: Optional[str] = None
+    ):
+        """
+        Notifies one observer. With a dispatcher this only enqueues the message,
+        so the caller (usually holding the auction lock) never waits on delivery.
+        """
+        if self.dispatcher is None:
+            observer.on_update(self, message)
+        else:
+            self.dispatcher.notify(observer, self, message, coalesce_key)
 
     def get_id(self) -> str:
         return self.id
@@ -111,8 +327,38 @@ class Auction:
     def get_item_name(self) -> str:
         return self.item_name
 
+    def get_description(self) -> str:
+        return self.description
+
+    def get_end_time(self) -> datetime:
+        return self.end_time
+
+    def get_base_price(self) -> Decimal:
+        return self.base_price
+
     def get_bid_history(self) -> List[Bid]:
-        return self.bids.copy()
+        """
+        Every bid, oldest first. After a restart the older bids are read back
+        from the ledger on the first call; only bids the ledger no longer has
+        are missing, and then the history is shorter than get_bid_count().
+        """
+        self._load_older_bids()
+        with self._lock:
+            return self.bid_book.get_bids()
+
+    def _load_older_bids(self):
+        """Reads the bids a restore left out back into the book, at most once."""
+        loader = self._older_bids_loader
+        if loader is None:
+            return
+        with self._lock:
+            dropped = self.bid_book.get_dropped_count()
+        # Read without the lock, so bidders are not held up by the ledger scan
+        older = loader(dropped) if dropped else []
+        with self._lock:
+            if self._older_bids_loader is loader:
+                self._older_bids_loader = None
+                self.bid_book.restore_older(older)
 
     def get_state(self) -> AuctionState:
         return self.state
@@ -5,9 +5,18 @@ any implementing class to have an 'on_update' method.
 
 from abc import ABC, abstractmethod
 from auction import Auction
+from typing import List, Tuple
 
 
 class AuctionObserver(ABC):
     @abstractmethod
     def on_update(self, auction: "Auction", message: str):
         pass
+
+    def on_batch_update(self, updates: List[Tuple["Auction", str]]):
+        """
+        Receives every pending notification for this observer at once.
+        Observers with a batched channel (e.g. one email or push) can override it.
+        """
+        for auction, message in updates:
+            self.on_update(auction, message)
@@ -1,22 +1,31 @@
 """
 Singleton service class that acts as the main entry point for the system.
 It manages all users and auctions. It handles creating auctions and
-scheduling their end times using a thread pool.
+ending them on time through a single-threaded expiry scheduler, and can
+record everything in a durable BidLedger to survive restarts.
 """
 
 from user import User
 from auction import Auction
-from typing import Dict, List
+from auction_state import AuctionState
+from bid import Bid
+from bid_ledger import BidLedger
+from expiry_scheduler import ExpiryScheduler
+from notification_dispatcher import NotificationDispatcher
+from active_auction_catalogue import ActiveAuctionCatalogue, ORDER_BY_END_TIME
+from typing import Dict, List, Optional
 from decimal import Decimal
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import gc
 import threading
-import time
 
 
 class AuctionService:
     _instance = None
     _lock = threading.Lock()
+    # Latest bids per auction kept in a ledger snapshot; older ones stay in the
+    # segments and are read back when an auction's full history is asked for
+    SNAPSHOT_RECENT_BIDS = 20
 
     def __init__(self):
         if AuctionService._instance is not None:
@@ -24,9 +33,18 @@ class AuctionService:
 
         self.users: Dict[str, User] = {}
         self.auctions: Dict[str, Auction] = {}
-        # Scheduler to automatically end auctions
-        self.scheduler = ThreadPoolExecutor(max_workers=10)
+        # Scheduler to automatically end auctions, one heap entry per pending auction
+        self.scheduler = ExpiryScheduler(self._expire_auction)
+        # Background workers that deliver notifications off the bidding path
+        self.notifier = NotificationDispatcher()
         self._shutdown = False
+        # Bids this close to the end push it back to this far from now (None = off)
+        self.anti_sniping_window: Optional[timedelta] = None
+        # New auctions store their bids in a CompactBidBook (int columns)
+        self.compact_bids = False
+        self._ledger: Optional[BidLedger] = None  # Durable record, if attached
+        # Index of open auctions, so browsing never walks closed ones
+        self.catalogue = ActiveAuctionCatalogue()
 
     @staticmethod
     def get_instance():
@@ -37,48 +55,132 @@ class AuctionService:
                     AuctionService._instance = AuctionService()
         return AuctionService._instance
 
-    def create_user(self, name: str) -> User:
-        user = User(name)
+    def create_user(self, name: str, user_id: Optional[str] = None) -> User:
+        """Creates a user; user_id keeps an ID assigned elsewhere (e.g. by a router)."""
+        user = User(name, user_id)
         self.users[user.get_id()] = user
+        if self._ledger is not None:
+            self._ledger.append({"op": "user", "u": user.get_id(), "name": name})
+            self._sync_ledger()
         return user
 
     def get_user(self, user_id: str) -> User:
         return self.users[user_id]
 
     def create_auction(
-        self, item_name: str, description: str, base_price: Decimal, end_time: datetime
+        self,
+        item_name: str,
+        description: str,
+        base_price: Decimal,
+        end_time: datetime,
+        auction_id: Optional[str] = None,
     ) -> Auction:
-        """Creates an auction and schedules a task to end it at its end_time."""
-        auction = Auction(item_name, description, base_price, end_time)
+        """
+        Creates an auction and schedules a task to end it at its end_time.
+        auction_id keeps an ID assigned elsewhere (e.g. by a router).
+        """
+        auction = Auction(
+            item_name, description, base_price, end_time, auction_id, self.compact_bids
+        )
+        auction.set_dispatcher(self.notifier)
+        auction.set_ledger(self._ledger)
         self.auctions[auction.get_id()] = auction
+        auction.set_catalogue(self.catalogue)
+        if self._ledger is not None:
+            self._ledger.append(
+                {
+                    "op": "auction",
+                    "a": auction.get_id(),
+                    "item": item_name,
+                    "desc": description,
+                    "base": str(base_price),
+                    "end": end_time.timestamp(),
+                }
+            )
+            self._sync_ledger()
 
         # Schedule the auction to end automatically
-        delay = (end_time - datetime.now()).total_seconds()
-        if delay > 0:
-            self.scheduler.submit(self._scheduled_end_auction, auction.get_id(), delay)
+        self.scheduler.schedule(auction.get_id(), end_time)
 
         print(
             f"New auction created for '{item_name}' (ID: {auction.get_id()}), ending at {end_time}."
         )
         return auction
 
-    def _scheduled_end_auction(self, auction_id: str, delay: float):
-        """Internal task run by the scheduler to end an auction."""
-        time.sleep(delay)
-        if not self._shutdown:
+    def _expire_auction(self, auction_id: str):
+        """Called by the scheduler when an auction's end time arrives."""
+        if self._shutdown:
+            return
+        auction = self.get_auction(auction_id)
+        # An extension that raced this expiry has already rescheduled it
+        if datetime.now() >= auction.get_end_time():
             self.end_auction(auction_id)
 
+    def set_anti_sniping_window(self, window: Optional[timedelta]):
+        """
+        A bid placed less than window before the end extends the auction to
+        window after the bid. None turns it off.
+        """
+        self.anti_sniping_window = window
+
+    def set_compact_bids(self, enabled: bool):
+        """
+        Auctions created (or recovered) after this store bids as integer cents,
+        monotonic nanoseconds and bidder indexes in columns; amounts must be
+        whole cents. Existing auctions keep their bid books.
+        """
+        self.compact_bids = enabled
+
+    def extend_auction(self, auction_id: str, new_end_time: datetime):
+        """Moves an active auction's end time later and reschedules its expiry."""
+        auction = self.get_auction(auction_id)
+        auction.extend_end_time(new_end_time)
+        self.scheduler.reschedule(auction_id, new_end_time)
+        self._sync_ledger()
+
     def view_active_auctions(self) -> List[Auction]:
-        return [auction for auction in self.auctions.values() if auction.is_active()]
+        """Every open auction, read from the catalogue instead of scanning the history."""
+        return self.catalogue.get_all()
+
+    def browse_active_auctions(
+        self,
+        order_by: str = ORDER_BY_END_TIME,
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> List[Auction]:
+        """One page of open auctions ordered by "end_time", "price" or "bid_count"."""
+        return self.catalogue.browse(order_by, descending, offset, limit)
+
+    def search_active_auctions(self, prefix: str, limit: int = 20) -> List[Auction]:
+        """Open auctions whose item name starts with prefix."""
+        return self.catalogue.search_prefix(prefix, limit)
+
+    def search_active_auctions_by_keywords(self, text: str, limit: int = 20) -> List[Auction]:
+        """Open auctions whose item name contains every word in text, ending soonest first."""
+        return self.catalogue.search_keywords(text, limit)
 
     def place_bid(self, auction_id: str, bidder_id: str, amount: Decimal):
         """Facade method to place a bid. Delegates logic to the Auction."""
         auction = self.get_auction(auction_id)
         auction.place_bid(self.users[bidder_id], amount)
+        self._sync_ledger()  # The bid is durable before place_bid returns
+
+        window = self.anti_sniping_window
+        if window is not None:
+            new_end_time = datetime.now() + window
+            # Skipped if the auction ended (or was extended further) meanwhile;
+            # any other failure (e.g. the ledger) reaches the caller
+            if auction.extend_end_time_if_later(new_end_time):
+                self.scheduler.reschedule(auction_id, new_end_time)
+                self._sync_ledger()
 
     def end_auction(self, auction_id: str):
         """Facade method to end an auction. Delegates logic to the Auction."""
         auction = self.get_auction(auction_id)
+        self.scheduler.cancel(auction_id)
+        # Not waited on: if the "end" record is lost, the recovered auction is
+        # past its end time and the scheduler ends it again straight away
         auction.end_auction()
 
     def get_auction(self, auction_id: str) -> Auction:
@@ -87,7 +189,192 @@ class AuctionService:
             raise KeyError(f"Auction with ID {auction_id} not found.")
         return auction
 
+    # ----- Ledger and recovery -----
+
+    def get_ledger(self) -> Optional[BidLedger]:
+        return self._ledger
+
+    def attach_ledger(self, ledger: BidLedger):
+        """
+        Starts recording every user, auction, bid, extension and close in the
+        given (empty) ledger. An initial snapshot records the current state.
+        """
+        self._ledger = ledger
+        for auction in list(self.auctions.values()):
+            # Snapshots keep only the latest bids, so the earlier ones go in as records
+            auction.record_bids(ledger)
+        ledger.write_snapshot(self._capture_state)
+        ledger.snapshot_in_background(self._capture_state)
+
+    def snapshot_ledger(self):
+        """Takes a ledger snapshot now, e.g. before a planned restart."""
+        if self._ledger is not None:
+            self._ledger.write_snapshot(self._capture_state)
+
+    def recover_from_ledger(self, ledger: BidLedger):
+        """
+        Rebuilds users and auctions from the ledger's latest snapshot plus the
+        records after it, then keeps recording to it. Current users and
+        auctions are discarded. Auctions that are still active are rescheduled
+        to end; the ones whose end time passed while down end right away.
+        """
+        # Recovery allocates many long-lived objects; pausing the cyclic
+        # garbage collector avoids repeated full scans while doing so
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._recover(ledger)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _recover(self, ledger: BidLedger):
+        snapshot, records = ledger.load()
+        for auction_id in self.auctions:
+            self.scheduler.cancel(auction_id)
+        self.users = {}
+        self.auctions = {}
+        self.catalogue = ActiveAuctionCatalogue()
+        self._ledger = None  # Nothing below is re-recorded
+
+        if snapshot is not None:
+            for user_id, name in snapshot["users"]:
+                self.users[user_id] = User(name, user_id)
+            for row in snapshot["auctions"]:
+                auction_id, item, description, base, end, state, count, recent, bidders = row
+                auction = Auction(
+                    item,
+                    description,
+                    Decimal(base),
+                    datetime.fromtimestamp(end),
+                    auction_id,
+                    self.compact_bids,
+                )
+                recent_bids = [
+                    Bid.restore(
+                        self.users[user_id], Decimal(amount), datetime.fromtimestamp(timestamp)
+                    )
+                    for user_id, amount, timestamp in recent
+                ]
+                auction.restore(
+                    AuctionState(state),
+                    auction.get_end_time(),
+                    recent_bids,
+                    count,
+                    [self.users[user_id] for user_id in bidders],
+                )
+                self.auctions[auction_id] = auction
+
+        # Replay is idempotent: records may already be reflected in the snapshot
+        for record in records:
+            op = record["op"]
+            if op == "bid":
+                self.auctions[record["a"]].replay_bid(
+                    record["o"],
+                    Bid.restore(
+                        self.users[record["u"]],
+                        Decimal(record["amt"]),
+                        datetime.fromtimestamp(record["ts"]),
+                    ),
+                )
+            elif op == "end":
+                self.auctions[record["a"]].replay_end()
+            elif op == "extend":
+                self.auctions[record["a"]].replay_extension(
+                    datetime.fromtimestamp(record["end"])
+                )
+            elif op == "auction":
+                if record["a"] not in self.auctions:
+                    self.auctions[record["a"]] = Auction(
+                        record["item"],
+                        record["desc"],
+                        Decimal(record["base"]),
+                        datetime.fromtimestamp(record["end"]),
+                        record["a"],
+                        self.compact_bids,
+                    )
+            elif op == "user":
+                if record["u"] not in self.users:
+                    self.users[record["u"]] = User(record["name"], record["u"])
+
+        self._ledger = ledger
+        for auction_id, auction in self.auctions.items():
+            auction.set_dispatcher(self.notifier)
+            auction.set_ledger(ledger)
+            auction.set_older_bids_loader(self._older_bids_loader(ledger, auction_id))
+            auction.set_catalogue(self.catalogue)
+            if auction.is_active():
+                self.scheduler.schedule(auction_id, auction.get_end_time())
+        ledger.snapshot_in_background(self._capture_state)
+
+    def _older_bids_loader(self, ledger: BidLedger, auction_id: str):
+        """Reads an auction's first bids back from the ledger segments as Bids."""
+
+        def load(count: int) -> List[Bid]:
+            return [
+                Bid.restore(
+                    self.users[record["u"]],
+                    Decimal(record["amt"]),
+                    datetime.fromtimestamp(record["ts"]),
+                )
+                for record in ledger.read_bids(auction_id, count)
+            ]
+
+        return load
+
+    def _capture_state(self) -> dict:
+        """
+        Reads every user and, per auction, its state, latest bids and bidders
+        for a ledger snapshot.
+        """
+        auctions = []
+        for auction in list(self.auctions.values()):
+            state, end_time, recent_bids, count, observers = auction.get_snapshot_state(
+                self.SNAPSHOT_RECENT_BIDS
+            )
+            recent = [
+                [bid.get_bidder().get_id(), str(bid.get_amount()), bid.get_timestamp().timestamp()]
+                for bid in recent_bids
+            ]
+            # Bidders are the observers the service knows as users
+            bidders = [
+                observer.get_id()
+                for observer in observers
+                if isinstance(observer, User) and observer.get_id() in self.users
+            ]
+            auctions.append(
+                [
+                    auction.get_id(),
+                    auction.get_item_name(),
+                    auction.get_description(),
+                    str(auction.get_base_price()),
+                    end_time.timestamp(),
+                    state.value,
+                    count,
+                    recent,
+                    bidders,
+                ]
+            )
+        return {
+            "users": [[user.get_id(), user.get_name()] for user in list(self.users.values())],
+            "auctions": auctions,
+        }
+
+    def _sync_ledger(self):
+        """
+        Waits for the group commit that makes everything appended so far
+        durable. Only blocks when a ledger is attached; snapshots are taken by
+        the ledger's own background thread.
+        """
+        ledger = self._ledger
+        if ledger is not None:
+            ledger.wait_durable()
+
     def shutdown(self):
-        """Shuts down the thread pool scheduler."""
+        """
+        Stops the expiry scheduler (auctions still pending will not end
+        automatically), then delivers the queued notifications.
+        """
         self._shutdown = True
-        self.scheduler.shutdown(wait=True)
+        self.scheduler.shutdown()
+        self.notifier.shutdown()
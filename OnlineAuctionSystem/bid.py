@@ -12,11 +12,23 @@ if TYPE_CHECKING:
 
 
 class Bid:
+    # No per-instance __dict__: a hot auction holds hundreds of thousands of bids
+    __slots__ = ("bidder", "amount", "timestamp")
+
     def __init__(self, bidder: "User", amount: Decimal):
         self.bidder = bidder
         self.amount = amount
         self.timestamp = datetime.now()
 
+    @staticmethod
+    def restore(bidder: "User", amount: Decimal, timestamp: datetime) -> "Bid":
+        """Rebuilds a bid (e.g. from the ledger) with its original timestamp."""
+        bid = Bid.__new__(Bid)
+        bid.bidder = bidder
+        bid.amount = amount
+        bid.timestamp = timestamp
+        return bid
+
     def get_bidder(self) -> "User":
         return self.bidder
 
@@ -0,0 +1,66 @@
+"""
+An ordered book of an auction's bids.
+Keeps bids sorted from lowest to highest, so the best bid is always the last
+one (O(1)) and the top k are the last k. An auction only accepts a bid that
+beats the current best, so accepting one is a plain append; a bid that lands
+lower (e.g. when replaying history out of order) is inserted with bisect.
+"""
+
+from bisect import insort
+from bid import Bid
+from typing import List, Optional
+
+
+class BidBook:
+    def __init__(self):
+        self._bids: List[Bid] = []  # Ascending by Bid ordering; the best bid is last
+        self._dropped = 0  # Older bids not held in memory (e.g. after a restore)
+
+    def restore(self, recent: List[Bid], count: int):
+        """
+        Resets the book to a snapshot: only the most recent of count bids
+        (lowest first, so the best is last) are kept in memory; the rest live
+        in the ledger.
+        """
+        self._bids = list(recent)
+        self._dropped = count - len(self._bids)
+
+    def restore_older(self, older: List[Bid]):
+        """
+        Puts back older bids read from the ledger (lowest first). They all rank
+        below the held ones, since each accepted bid beat the best before it.
+        """
+        self._bids[:0] = older
+        self._dropped = max(self._dropped - len(older), 0)
+
+    def get_dropped_count(self) -> int:
+        """How many of the oldest bids are not held in memory."""
+        return self._dropped
+
+    def add(self, bid: Bid):
+        """Adds a bid in O(1) if it is the new best, otherwise in O(log n) + shift."""
+        if not self._bids or self._bids[-1] < bid:
+            self._bids.append(bid)
+        else:
+            insort(self._bids, bid)
+
+    def get_best(self) -> Optional[Bid]:
+        return self._bids[-1] if self._bids else None
+
+    def get_top(self, k: int) -> List[Bid]:
+        """Returns the k highest bids, highest first."""
+        if k <= 0:
+            return []
+        return self._bids[: -k - 1 : -1]
+
+    def get_bids(self) -> List[Bid]:
+        """
+        Returns every bid held in memory, lowest first (for accepted bids, that is
+        placement order). After a restore, that starts at the snapshot's oldest
+        recent bid until the older ones are put back with restore_older.
+        """
+        return self._bids.copy()
+
+    def __len__(self) -> int:
+        """The number of bids ever added, including ones no longer held in memory."""
+        return self._dropped + len(self._bids)
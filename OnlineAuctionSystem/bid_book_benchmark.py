@@ -0,0 +1,83 @@
+"""
+Benchmark for bid acceptance on a hot auction.
+Places 10^5 increasing bids through Auction.place_bid, then compares the cost
+of reading the highest bid from the BidBook with the old max() scan over the
+whole bid list at several auction sizes.
+"""
+
+import contextlib
+import os
+import sys
+import time
+from auction import Auction
+from user import User
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+BIDS = 100_000
+BIDDERS = 50
+SCAN_SIZES = (1_000, 10_000, 100_000)
+SCAN_REPEATS = 20
+
+
+class QuietUser(User):
+    """A bidder that ignores notifications, so printing does not dominate the timings."""
+
+    def on_update(self, auction: Auction, message: str):
+        pass
+
+
+def bench_place_bids() -> Auction:
+    auction = Auction(
+        "Hot Item", "A heavily contested item.", Decimal("1.00"),
+        datetime.now() + timedelta(hours=1),
+    )
+    bidders = [QuietUser(f"Bidder-{i}") for i in range(BIDDERS)]
+    amounts = [Decimal(2 + i) for i in range(BIDS)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        checkpoint = start
+        for i, amount in enumerate(amounts):
+            auction.place_bid(bidders[i % BIDDERS], amount)
+            if (i + 1) % (BIDS // 4) == 0:
+                now = time.perf_counter()
+                rate = (BIDS // 4) / (now - checkpoint)
+                checkpoint = now
+                print(f"  bids {i + 1 - BIDS // 4:>7,}-{i + 1:>7,}: {rate:>10,.0f} bids/s", file=sys.__stdout__)
+        elapsed = time.perf_counter() - start
+    print(f"Placed {BIDS:,} bids in {elapsed:.2f}s ({BIDS / elapsed:,.0f} bids/s)")
+    return auction
+
+
+def bench_highest_bid(auction: Auction):
+    bids = auction.get_bid_history()
+    for size in SCAN_SIZES:
+        prefix = bids[:size]
+        start = time.perf_counter()
+        for _ in range(SCAN_REPEATS):
+            max(prefix)
+        scan_us = (time.perf_counter() - start) / SCAN_REPEATS * 1e6
+        print(f"  max() over {size:>7,} bids: {scan_us:>10,.1f} us per bid")
+
+    start = time.perf_counter()
+    for _ in range(SCAN_REPEATS * 1000):
+        auction.get_highest_bid()
+    book_us = (time.perf_counter() - start) / (SCAN_REPEATS * 1000) * 1e6
+    print(f"  BidBook.get_best at {len(bids):,} bids: {book_us:.3f} us per bid")
+
+
+def main():
+    print(f"Placing {BIDS:,} increasing bids on one auction")
+    auction = bench_place_bids()
+    print("Reading the highest bid")
+    bench_highest_bid(auction)
+    top = auction.get_top_bids(3)
+    print("Top 3:", ", ".join(f"{bid.get_amount()}" for bid in top))
+    if auction.get_highest_bid() is not max(auction.get_bid_history()):
+        raise SystemExit("FAILED: BidBook disagrees with max()")
+    print("PASSED: BidBook agrees with max()")
+
+
+if __name__ == "__main__":
+    main()
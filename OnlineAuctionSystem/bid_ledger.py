@@ -0,0 +1,339 @@
+"""
+An append-only, crash-safe ledger of users, auctions and bids for AuctionService.
+
+Records are JSON lines tagged with a log sequence number (LSN); every bid also
+carries its offset within its auction (0 for the first bid, and so on). Appends
+only buffer the record; a background flusher thread writes and fsyncs whatever
+has queued up in one go (group commit), so concurrent bidders share one fsync.
+
+Periodic snapshots capture every user and, per auction, its state, end time,
+bid count and latest bids. The ledger segments themselves are kept as the full
+bid history, but recovery reads only the snapshot and the segments after it,
+so restart time depends on the tail, not on how many bids were ever placed;
+an auction's older bids are read back (read_bids) only when it is asked for them.
+
+On disk a ledger directory holds:
+  snapshot.json             - the latest snapshot and the LSN it covers
+  ledger-<first LSN>.log    - ledger segments, oldest first
+"""
+
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from auction import Auction
+    from bid import Bid
+
+SNAPSHOT_FILE = "snapshot.json"
+SEGMENT_PREFIX = "ledger-"
+SEGMENT_SUFFIX = ".log"
+
+
+class BidLedger:
+    # Default number of records after which the service takes a new snapshot
+    DEFAULT_SNAPSHOT_EVERY = 200_000
+
+    def __init__(
+        self,
+        directory: str,
+        commit_interval: float = 0.002,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+    ):
+        """
+        Opens (or creates) a ledger directory.
+        commit_interval is how long the flusher waits to gather more records
+        into one fsync; snapshot_every is the record count between snapshots.
+        """
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()  # Guards the pending buffer and LSN counters
+        self._io_lock = threading.Lock()  # Held while writing to a segment file
+        self._snapshot_lock = threading.Lock()  # Only one snapshot at a time
+        self._durable = threading.Condition(self._lock)
+        self._snapshot_due = threading.Condition(self._lock)  # Wakes the snapshot thread
+        self._capture: Optional[Callable[[], dict]] = None
+        self._snapshotter: Optional[threading.Thread] = None
+        self._pending: List[str] = []
+        self._next_lsn = self._find_last_lsn() + 1
+        self._durable_lsn = self._next_lsn - 1
+        self._records_since_snapshot = 0
+        self._closed = False
+
+        # New records always go to a fresh segment; older ones stay as history
+        self._segment = self._open_segment(self._next_lsn)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    # ----- Appending and group commit -----
+
+    def append(self, record: dict) -> int:
+        """Buffers a record for the next group commit and returns its LSN."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The ledger is closed.")
+            lsn = self._next_lsn
+            self._next_lsn += 1
+            record["lsn"] = lsn
+            self._pending.append(json.dumps(record, separators=(",", ":")) + "\n")
+            self._records_since_snapshot += 1
+            self._durable.notify_all()  # Wake the flusher
+            if self._capture is not None and self.needs_snapshot():
+                self._snapshot_due.notify()
+            return lsn
+
+    def append_bid(self, auction: "Auction", offset: int, bid: "Bid") -> int:
+        """Buffers an accepted bid; offset is its position in the auction's bid sequence."""
+        return self.append(
+            {
+                "op": "bid",
+                "a": auction.get_id(),
+                "o": offset,
+                "u": bid.get_bidder().get_id(),
+                "amt": str(bid.get_amount()),
+                "ts": bid.get_timestamp().timestamp(),
+            }
+        )
+
+    def wait_durable(self, lsn: Optional[int] = None):
+        """
+        Blocks until the record with this LSN (by default, every record appended
+        so far) has been fsynced.
+        """
+        with self._lock:
+            target = self._next_lsn - 1 if lsn is None else lsn
+            while self._durable_lsn < target and not self._closed:
+                self._durable.wait()
+
+    def needs_snapshot(self) -> bool:
+        return self._records_since_snapshot >= self.snapshot_every
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._durable.wait()
+                if self._closed and not self._pending:
+                    return
+            # Give other bidders a moment to join this commit
+            if self.commit_interval > 0:
+                time.sleep(self.commit_interval)
+            self._flush()
+
+    def _flush(self):
+        """Writes and fsyncs every pending record, then wakes the waiters."""
+        with self._io_lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        """The body of _flush; the caller must hold _io_lock."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            last_lsn = self._next_lsn - 1
+        if lines:
+            self._segment.writelines(lines)
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+        with self._lock:
+            self._durable_lsn = max(self._durable_lsn, last_lsn)
+            self._durable.notify_all()
+
+    # ----- Snapshots -----
+
+    def snapshot_in_background(self, capture: Callable[[], dict]):
+        """
+        Takes a snapshot with capture() on a background thread whenever
+        snapshot_every records have been appended, so no caller of append ever
+        pays for reading the whole state.
+        """
+        with self._lock:
+            self._capture = capture
+            if self._snapshotter is None:
+                self._snapshotter = threading.Thread(target=self._snapshot_loop, daemon=True)
+                self._snapshotter.start()
+            self._snapshot_due.notify()
+
+    def _snapshot_loop(self):
+        while True:
+            with self._lock:
+                while not self._closed and not self.needs_snapshot():
+                    self._snapshot_due.wait()
+                if self._closed:
+                    return
+                capture = self._capture
+            try:
+                self.maybe_snapshot(capture)
+            except Exception as e:
+                # Keep the thread alive; the records stay in the segments meanwhile
+                print(f"Ledger snapshot failed: {e}")
+
+    def maybe_snapshot(self, capture: Callable[[], dict]):
+        """
+        Takes a snapshot if snapshot_every records have been appended since the
+        last one. Returns immediately if another thread is already snapshotting.
+        """
+        if not self.needs_snapshot():
+            return
+        if not self._snapshot_lock.acquire(blocking=False):
+            return
+        try:
+            if self.needs_snapshot():
+                self._write_snapshot(capture)
+        finally:
+            self._snapshot_lock.release()
+
+    def write_snapshot(self, capture: Callable[[], dict]):
+        """
+        Takes a snapshot. The ledger first switches to a new segment; capture()
+        is then called to read the service's state, which already includes every
+        record in the older segments. Records written after the switch may or may
+        not be in the snapshot; replaying them is idempotent.
+        """
+        with self._snapshot_lock:
+            self._write_snapshot(capture)
+
+    def _write_snapshot(self, capture: Callable[[], dict]):
+        """The body of write_snapshot; the caller must hold _snapshot_lock."""
+        with self._io_lock:
+            self._write_pending()
+            with self._lock:
+                covered_lsn = self._next_lsn - 1
+                self._records_since_snapshot = 0
+            old_segment = self._segment
+            self._segment = self._open_segment(covered_lsn + 1)
+            old_segment.close()
+
+        state = capture()
+        state["lsn"] = covered_lsn
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as snapshot_file:
+            json.dump(state, snapshot_file, separators=(",", ":"))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, path)  # Atomic: readers see the old or the new snapshot
+        self._fsync_directory()
+
+    # ----- Recovery -----
+
+    def load(self) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Reads the latest snapshot (None if there is none) and every ledger
+        record after it, in LSN order. Segments that end before the snapshot
+        are not opened. A torn final line from a crash is ignored.
+        """
+        snapshot = self._read_snapshot()
+        covered_lsn = snapshot["lsn"] if snapshot is not None else 0
+        segments = self._segments()
+        records: List[dict] = []
+        for index, (_, segment_path) in enumerate(segments):
+            if index + 1 < len(segments) and segments[index + 1][0] <= covered_lsn + 1:
+                continue  # Every record in this segment is covered by the snapshot
+            with open(segment_path) as segment:
+                for line in segment:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of a segment
+                    if record["lsn"] > covered_lsn:
+                        records.append(record)
+        return snapshot, records
+
+    def read_bids(self, auction_id: str, before_offset: int) -> List[dict]:
+        """
+        Reads an auction's bid records with offsets below before_offset from
+        every segment, in offset order: the older bids a snapshot left out.
+        Scans the whole history, so callers do it at most once per auction.
+        """
+        bids = {}
+        for _, segment_path in self._segments():
+            with open(segment_path) as segment:
+                for line in segment:
+                    # Cheap filter before parsing: most lines belong to other auctions
+                    if auction_id not in line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of a segment
+                    if (
+                        record["op"] == "bid"
+                        and record["a"] == auction_id
+                        and record["o"] < before_offset
+                    ):
+                        bids[record["o"]] = record
+            if len(bids) == before_offset:
+                break
+        return [bids[offset] for offset in sorted(bids)]
+
+    def close(self):
+        """Flushes everything still pending and stops the flusher thread."""
+        with self._lock:
+            self._closed = True
+            self._durable.notify_all()
+            self._snapshot_due.notify_all()
+            snapshotter = self._snapshotter
+        if snapshotter is not None:
+            snapshotter.join()  # Lets a snapshot in progress finish
+        self._flusher.join()
+        self._flush()
+        self._segment.close()
+
+    # ----- File helpers -----
+
+    def _read_snapshot(self) -> Optional[dict]:
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as snapshot_file:
+            return json.load(snapshot_file)
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        """Returns (first LSN, path) for every segment, oldest first."""
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                first_lsn = int(name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+                segments.append((first_lsn, os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def _open_segment(self, first_lsn: int):
+        path = os.path.join(
+            self.directory, f"{SEGMENT_PREFIX}{first_lsn:012d}{SEGMENT_SUFFIX}"
+        )
+        segment = open(path, "a")
+        self._fsync_directory()
+        return segment
+
+    def _find_last_lsn(self) -> int:
+        """The highest LSN already on disk, so numbering continues after a restart."""
+        last_lsn = 0
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            last_lsn = snapshot["lsn"]
+        segments = self._segments()
+        if segments:
+            with open(segments[-1][1]) as segment:
+                for line in segment:
+                    try:
+                        last_lsn = max(last_lsn, json.loads(line)["lsn"])
+                    except ValueError:
+                        break
+            # An empty newest segment still tells us where numbering had reached
+            last_lsn = max(last_lsn, segments[-1][0] - 1)
+        return last_lsn
+
+    def _fsync_directory(self):
+        """Makes file creations and renames in the ledger directory durable."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return  # Not supported on this platform (e.g. Windows)
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,84 @@
+"""
+Benchmark for the last-minute bidding spike on one auction.
+Gate threads fire bids based on a high bid they refresh only every few
+attempts, so most bids already lose by the time they arrive, as in a real
+closing rush. Reports total and accepted bid throughput and the cost of a
+rejected bid.
+"""
+
+import contextlib
+import os
+import random
+import threading
+import time
+from auction import Auction
+from user import User
+from decimal import Decimal
+from datetime import datetime, timedelta
+from typing import List
+
+THREADS = 8
+ATTEMPTS_PER_THREAD = 50_000
+REFRESH_EVERY = 20  # Attempts between looks at the current high bid
+
+
+class QuietUser(User):
+    def on_update(self, auction: Auction, message: str):
+        pass
+
+
+def _bidder(auction: Auction, user: User, seed: int, counts: List[int]):
+    rng = random.Random(seed)
+    accepted = 0
+    seen = auction.get_highest_bid().get_amount()
+    for attempt in range(ATTEMPTS_PER_THREAD):
+        if attempt % REFRESH_EVERY == 0:
+            seen = auction.get_highest_bid().get_amount()
+        try:
+            auction.place_bid(user, seen + rng.randint(1, 10))
+            accepted += 1
+        except ValueError:
+            pass
+    counts.append(accepted)
+
+
+def main():
+    auction = Auction("Hot Item", "", Decimal("1"), datetime.now() + timedelta(hours=1))
+    users = [QuietUser(f"Bidder-{i}") for i in range(THREADS)]
+    counts: List[int] = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        auction.place_bid(users[0], Decimal("2"))
+        threads = [
+            threading.Thread(target=_bidder, args=(auction, users[i], i, counts))
+            for i in range(THREADS)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    attempts = THREADS * ATTEMPTS_PER_THREAD
+    accepted = sum(counts)
+    print(f"{THREADS} threads, {attempts:,} bids, {accepted:,} accepted ({accepted / attempts:.1%})")
+    print(f"  {attempts / elapsed:>12,.0f} bids/s")
+    print(f"  {accepted / elapsed:>12,.0f} accepted bids/s")
+
+    # The cost of one bid that obviously loses
+    low = Decimal("1")
+    rejects = 200_000
+    start = time.perf_counter()
+    for _ in range(rejects):
+        try:
+            auction.place_bid(users[0], low)
+        except ValueError:
+            pass
+    print(f"  {(time.perf_counter() - start) / rejects * 1e6:>12.2f} us per rejected bid")
+    if auction.get_highest_bid() is not max(auction.get_bid_history()):
+        raise SystemExit("FAILED: the highest bid is not the maximum of the history")
+    print("PASSED: history is consistent")
+
+
+if __name__ == "__main__":
+    main()
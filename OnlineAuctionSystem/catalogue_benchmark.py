@@ -0,0 +1,101 @@
+"""
+Benchmark for browsing and searching open auctions.
+Creates HISTORY auctions, closing the oldest as new ones open so that at most
+ACTIVE are open at once (as on a live site), then times the catalogue's browse pages, prefix and keyword searches against the
+old approach of scanning every auction ever created.
+
+    python catalogue_benchmark.py [--history N] [--active N]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import time
+from auction import Auction
+from active_auction_catalogue import (
+    ActiveAuctionCatalogue,
+    ORDER_BY_END_TIME,
+    ORDER_BY_PRICE,
+    ORDER_BY_BID_COUNT,
+)
+from user import User
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+WORDS = ["vintage", "signed", "manga", "poster", "card", "rare", "first", "edition",
+         "comic", "figure", "lego", "watch", "camera", "vinyl", "record", "sealed"]
+REPEATS = 200
+SCAN_REPEATS = 5  # The scans take tens of milliseconds each
+
+
+class QuietUser(User):
+    def on_update(self, auction: Auction, message: str):
+        pass
+
+
+def _time_us(query, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--history", type=int, default=300_000)
+    parser.add_argument("--active", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(3)
+    catalogue = ActiveAuctionCatalogue()
+    auctions = []
+    bidders = [QuietUser(f"Bidder-{i}") for i in range(100)]
+    now = datetime.now()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(args.history):
+            name = " ".join(rng.sample(WORDS, 3)) + f" #{i}"
+            auction = Auction(name, "", Decimal(rng.randint(1, 500)),
+                              now + timedelta(seconds=rng.randint(3_600, 86_400)))
+            auction.set_catalogue(catalogue)
+            for amount in range(rng.randint(0, 3)):
+                auction.place_bid(rng.choice(bidders), auction.get_base_price() + 1 + amount)
+            auctions.append(auction)
+            if i >= args.active:  # Keep the newest ACTIVE auctions open
+                auctions[i - args.active].end_auction()
+    print(
+        f"Built {args.history:,} auctions ({catalogue.get_active_count():,} open) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    scan = lambda: [auction for auction in auctions if auction.is_active()]
+    scans = {
+        "scan every auction (old view_active_auctions)": scan,
+        "scan + sort by end time, first page": lambda: sorted(scan(), key=Auction.get_end_time)[:20],
+    }
+    for label, query in scans.items():
+        print(f"  {label:<48} {_time_us(query, SCAN_REPEATS):>10,.1f} us")
+    queries = {
+        "browse by end time, first page": lambda: catalogue.browse(ORDER_BY_END_TIME),
+        "browse by price desc, page 50": lambda: catalogue.browse(ORDER_BY_PRICE, True, 1_000),
+        "browse by bid count desc, first page": lambda: catalogue.browse(ORDER_BY_BID_COUNT, True),
+        "prefix 'vintage s'": lambda: catalogue.search_prefix("vintage s"),
+        "keywords 'rare signed manga'": lambda: catalogue.search_keywords("rare signed manga"),
+        "keywords 'card'": lambda: catalogue.search_keywords("card"),
+    }
+    for label, query in queries.items():
+        print(f"  {label:<48} {_time_us(query):>10,.1f} us")
+
+    by_end_time = sorted(scan(), key=lambda a: (a.get_end_time().timestamp(), a.get_id()))
+    if catalogue.browse(ORDER_BY_END_TIME) != by_end_time[:20]:
+        raise SystemExit("FAILED: the catalogue's first page differs from a full scan")
+    words = {"rare", "signed", "manga"}
+    expected = [a for a in by_end_time if words <= set(a.get_item_name().split())][:20]
+    if catalogue.search_keywords("rare signed manga") != expected:
+        raise SystemExit("FAILED: the keyword search differs from a full scan")
+    print("PASSED: catalogue pages and searches match a full scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+A BidBook for hot auctions that stores bids in columns instead of one Bid
+object each. Per bid it keeps:
+  - the amount in integer cents (array of int64),
+  - the time in monotonic nanoseconds (array of int64),
+  - the bidder as an int index into the book's own table of users.
+That is 24 bytes per bid instead of a Bid, a Decimal and a datetime, and
+ordering compares plain ints instead of Decimals. Only the best bid is kept
+as an object; every other Bid is rebuilt on demand, e.g. for
+get_bid_history. Amounts must be whole cents.
+"""
+
+from array import array
+from bid import Bid
+from bid_book import BidBook
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+import time
+
+if TYPE_CHECKING:
+    from user import User
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class CompactBidBook(BidBook):
+    def __init__(self):
+        # Deliberately skips BidBook.__init__: no per-bid objects are held
+        # Ascending by (cents, -time): the best bid is last, as in BidBook
+        self._cents = array("q")
+        self._times = array("q")  # Monotonic nanoseconds
+        self._bidders = array("q")  # Indexes into _users
+        self._users: List["User"] = []
+        self._user_index: Dict[str, int] = {}  # user ID -> index in _users
+        self._best: Optional[Bid] = None  # The last row, as an object
+        self._dropped = 0  # Older bids not held in memory (e.g. after a restore)
+        # Converts between bid datetimes (wall clock) and monotonic nanoseconds
+        self._wall_anchor = datetime.now()
+        self._monotonic_anchor_ns = time.monotonic_ns()
+
+    def restore(self, recent: List[Bid], count: int):
+        """Resets the book to a snapshot: only the most recent of count bids are kept."""
+        self._cents = array("q")
+        self._times = array("q")
+        self._bidders = array("q")
+        self._best = None
+        for bid in recent:
+            self.add(bid)
+        self._dropped = count - len(recent)
+
+    def restore_older(self, older: List[Bid]):
+        """Puts back older bids read from the ledger (lowest first, all below the held ones)."""
+        cents, times, bidders = array("q"), array("q"), array("q")
+        for bid in older:
+            bid_cents, monotonic_ns = self._key(bid)
+            cents.append(bid_cents)
+            times.append(monotonic_ns)
+            bidders.append(self._bidder_index(bid.get_bidder()))
+        self._cents = cents + self._cents
+        self._times = times + self._times
+        self._bidders = bidders + self._bidders
+        if self._best is None and older:
+            self._best = older[-1]
+        self._dropped = max(self._dropped - len(older), 0)
+
+    def add(self, bid: Bid):
+        """Appends in O(1) if the bid is the new best, otherwise inserts at its position."""
+        cents, monotonic_ns = self._key(bid)
+        bidder = self._bidder_index(bid.get_bidder())
+        if not self._cents or (self._cents[-1], -self._times[-1]) < (cents, -monotonic_ns):
+            self._cents.append(cents)
+            self._times.append(monotonic_ns)
+            self._bidders.append(bidder)
+            self._best = bid
+        else:
+            position = self._position(cents, monotonic_ns)
+            self._cents.insert(position, cents)
+            self._times.insert(position, monotonic_ns)
+            self._bidders.insert(position, bidder)
+
+    def get_best(self) -> Optional[Bid]:
+        return self._best
+
+    def get_top(self, k: int) -> List[Bid]:
+        """Returns the k highest bids, highest first."""
+        count = len(self._cents)
+        return [self._bid_at(i) for i in range(count - 1, max(count - k, 0) - 1, -1)]
+
+    def get_bids(self) -> List[Bid]:
+        """Rebuilds every bid held in memory as a Bid, lowest first."""
+        return [self._bid_at(i) for i in range(len(self._cents))]
+
+    def __len__(self) -> int:
+        return self._dropped + len(self._cents)
+
+    # ----- Column helpers -----
+
+    def _key(self, bid: Bid) -> Tuple[int, int]:
+        """(cents, monotonic ns) of a bid."""
+        amount = bid.get_amount().scaleb(2)
+        cents = int(amount)
+        if cents != amount:
+            raise ValueError("A compact bid book only holds whole cents.")
+        # Exact: datetimes hold whole microseconds
+        micros = (bid.get_timestamp() - self._wall_anchor) // _MICROSECOND
+        return cents, self._monotonic_anchor_ns + micros * 1_000
+
+    def _bidder_index(self, user: "User") -> int:
+        index = self._user_index.get(user.get_id())
+        if index is None:
+            index = len(self._users)
+            self._users.append(user)
+            self._user_index[user.get_id()] = index
+        return index
+
+    def _position(self, cents: int, monotonic_ns: int) -> int:
+        """Binary search for where (cents, -monotonic_ns) goes in the ascending rows."""
+        low, high = 0, len(self._cents)
+        while low < high:
+            middle = (low + high) // 2
+            if (self._cents[middle], -self._times[middle]) < (cents, -monotonic_ns):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _bid_at(self, index: int) -> Bid:
+        if index == len(self._cents) - 1:
+            return self._best
+        micros = (self._times[index] - self._monotonic_anchor_ns) // 1_000
+        return Bid.restore(
+            self._users[self._bidders[index]],
+            Decimal(self._cents[index]).scaleb(-2),
+            self._wall_anchor + timedelta(microseconds=micros),
+        )
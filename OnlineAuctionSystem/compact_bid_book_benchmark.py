@@ -0,0 +1,137 @@
+"""
+Compares the regular BidBook (one Bid object per bid) with CompactBidBook
+(int columns) on a hot auction:
+  - memory held by 10^4, 10^5 and 5 * 10^5 bids, measured with tracemalloc;
+  - comparison speed: finding the best of, and sorting, 10^5 shuffled bids;
+  - place_bid throughput, and the cost of rebuilding the history as Bids.
+It finally checks that both books return the same bid history.
+"""
+
+import contextlib
+import gc
+import os
+import random
+import time
+import tracemalloc
+from auction import Auction
+from bid import Bid
+from bid_book import BidBook
+from compact_bid_book import CompactBidBook
+from user import User
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+MEMORY_SIZES = (10**4, 10**5, 5 * 10**5)
+COMPARE_SIZE = 10**5
+PLACE_BIDS = 10**5
+BIDDERS = 50
+
+
+class QuietUser(User):
+    def on_update(self, auction: Auction, message: str):
+        pass
+
+
+BIDDER_POOL = [QuietUser(f"Bidder-{i}") for i in range(BIDDERS)]
+
+
+def _build(book_class, bid_count: int):
+    book = book_class()
+    for i in range(bid_count):
+        book.add(Bid(BIDDER_POOL[i % BIDDERS], Decimal(i + 1).scaleb(-2) + 1))
+    return book
+
+
+def bench_memory():
+    print(f"{'bids':>10} {'book':>8} {'total MB':>10} {'bytes/bid':>10} {'build s':>8}")
+    for bid_count in MEMORY_SIZES:
+        for name, book_class in (("regular", BidBook), ("compact", CompactBidBook)):
+            gc.collect()
+            tracemalloc.start()
+            start = time.perf_counter()
+            book = _build(book_class, bid_count)
+            elapsed = time.perf_counter() - start
+            used, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del book
+            print(
+                f"{bid_count:>10,} {name:>8} {used / 2**20:>10.1f} "
+                f"{used / bid_count:>10.1f} {elapsed:>8.2f}"
+            )
+
+
+def bench_comparisons():
+    rng = random.Random(7)
+    bids = [
+        Bid(BIDDER_POOL[i % BIDDERS], Decimal(rng.randint(100, 10**6)).scaleb(-2))
+        for i in range(COMPARE_SIZE)
+    ]
+    book = CompactBidBook()
+    # The compact book orders rows by (cents, -monotonic ns)
+    keys = [(cents, -monotonic_ns) for cents, monotonic_ns in map(book._key, bids)]
+
+    cases = (
+        ("max(): Bid.__lt__ (Decimal)", lambda: max(bids)),
+        ("max(): (cents, -ns) ints", lambda: max(keys)),
+        ("sorted(): Bid.__lt__ (Decimal)", lambda: sorted(bids)),
+        ("sorted(): (cents, -ns) ints", lambda: sorted(keys)),
+    )
+    print(f"Comparing {COMPARE_SIZE:,} shuffled bids")
+    for label, run in cases:
+        start = time.perf_counter()
+        run()
+        print(f"  {label:<34} {(time.perf_counter() - start) * 1e3:>8.1f} ms")
+
+
+def bench_place_bids():
+    print(f"Placing {PLACE_BIDS:,} increasing bids on one auction")
+    auctions = {}
+    for name, compact in (("regular", False), ("compact", True)):
+        auction = Auction(
+            "Hot Item", "", Decimal("1.00"), datetime.now() + timedelta(hours=1),
+            compact_bids=compact,
+        )
+        amounts = [Decimal(2 + i) for i in range(PLACE_BIDS)]
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for i, amount in enumerate(amounts):
+                auction.place_bid(BIDDER_POOL[i % BIDDERS], amount)
+            elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        auction.get_bid_history()
+        history_ms = (time.perf_counter() - start) * 1e3
+        print(
+            f"  {name:>8}: {PLACE_BIDS / elapsed:>10,.0f} bids/s, "
+            f"get_bid_history {history_ms:,.1f} ms"
+        )
+        auctions[name] = auction
+    return auctions
+
+
+def main():
+    bench_memory()
+    bench_comparisons()
+    auctions = bench_place_bids()
+
+    regular = auctions["regular"].get_bid_history()
+    compact = auctions["compact"].get_bid_history()
+    same = len(regular) == len(compact) and all(
+        a.get_amount() == b.get_amount()
+        and a.get_bidder() is b.get_bidder()
+        and a.get_timestamp() - b.get_timestamp() < timedelta(seconds=1)
+        for a, b in zip(regular, compact)
+    )
+    round_trip = _build(CompactBidBook, 1_000)
+    rebuilt = round_trip.get_bids()
+    same = same and all(a < b for a, b in zip(rebuilt, rebuilt[1:]))
+    same = same and all(
+        round_trip._key(bid) == (round_trip._cents[i], round_trip._times[i])
+        for i, bid in enumerate(rebuilt)
+    )
+    if not same:
+        raise SystemExit("FAILED: the compact book's history differs from the regular one")
+    print("PASSED: both books return the same bid history")
+
+
+if __name__ == "__main__":
+    main()
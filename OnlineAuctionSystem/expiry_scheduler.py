@@ -0,0 +1,108 @@
+"""
+A single-threaded expiry scheduler for auctions.
+Pending expiries live in a min-heap of monotonic deadlines; one thread sleeps
+until the earliest one is due (or until an earlier one is scheduled) and then
+fires every expiry that has come due. Cancelling or rescheduling only marks the
+old heap entry stale, so both are O(log n) and a million pending auctions cost
+one heap entry each instead of one blocked thread each.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+import heapq
+import itertools
+import threading
+import time
+
+
+class ExpiryScheduler:
+    # Rebuild the heap once stale entries outnumber live ones (and there are this many)
+    COMPACT_MIN_STALE = 1024
+
+    def __init__(self, on_expire: Callable[[str], None]):
+        """on_expire(key) runs on the scheduler thread, so it should return quickly."""
+        self._on_expire = on_expire
+        self._heap: List[Tuple[float, int, str]] = []  # (monotonic deadline, seq, key)
+        self._live: Dict[str, int] = {}  # key -> seq of its current heap entry
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, key: str, end_time: datetime):
+        """Schedules key to expire at end_time, replacing any earlier schedule for it."""
+        # Read the wall clock first, so a pause in between can only make it late
+        remaining = (end_time - datetime.now()).total_seconds()
+        deadline = time.monotonic() + remaining
+        with self._condition:
+            seq = next(self._seq)
+            self._live[key] = seq
+            heapq.heappush(self._heap, (deadline, seq, key))
+            self._compact_if_needed()
+            if self._heap[0][1] == seq:
+                self._condition.notify()  # The new entry is the next one due
+
+    def reschedule(self, key: str, end_time: datetime):
+        """Moves an expiry, e.g. when a late bid extends an auction."""
+        self.schedule(key, end_time)
+
+    def cancel(self, key: str) -> bool:
+        """Cancels a pending expiry; returns False if there was none."""
+        with self._condition:
+            if self._live.pop(key, None) is None:
+                return False
+            self._compact_if_needed()
+            return True
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._live
+
+    def get_pending_count(self) -> int:
+        return len(self._live)
+
+    def shutdown(self):
+        """Stops the scheduler thread; pending expiries are dropped."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _compact_if_needed(self):
+        stale = len(self._heap) - len(self._live)
+        if stale > self.COMPACT_MIN_STALE and stale > len(self._live):
+            self._heap = [
+                entry for entry in self._heap if self._live.get(entry[2]) == entry[1]
+            ]
+            heapq.heapify(self._heap)
+
+    def _run(self):
+        while True:
+            due: List[str] = []
+            with self._condition:
+                while not self._shutdown:
+                    # Drop entries that were cancelled or rescheduled
+                    while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][1]:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._shutdown:
+                    return
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    _, seq, key = heapq.heappop(self._heap)
+                    if self._live.get(key) == seq:
+                        del self._live[key]
+                        due.append(key)
+            # Fire outside the lock, so callbacks can schedule or cancel
+            for key in due:
+                try:
+                    self._on_expire(key)
+                except Exception as e:
+                    # One failing expiry must not stop the thread that ends all the others
+                    print(f"Expiry of {key} failed: {e}")
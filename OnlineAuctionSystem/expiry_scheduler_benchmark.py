@@ -0,0 +1,78 @@
+"""
+Benchmark for the auction expiry scheduler.
+Schedules a million pending expiries, reschedules and cancels a slice of them
+(as anti-sniping extensions and manual ends would), then lets them all fire
+and reports how late each one was relative to its end time.
+"""
+
+from expiry_scheduler import ExpiryScheduler
+from datetime import datetime, timedelta
+from typing import Dict, List
+import threading
+import time
+
+PENDING = 1_000_000
+RESCHEDULED = 100_000
+CANCELLED = 100_000
+SPREAD_S = 10.0  # End times are spread evenly over this window
+LEAD_S = 8.0  # Time before the first end time, to finish scheduling
+
+
+def main():
+    fired: List[tuple] = []
+    done = threading.Event()
+    expected = PENDING - CANCELLED
+
+    def on_expire(key: str):
+        fired.append((key, datetime.now()))
+        if len(fired) == expected:
+            done.set()
+
+    scheduler = ExpiryScheduler(on_expire)
+    start_at = datetime.now() + timedelta(seconds=LEAD_S)
+    end_times: Dict[str, datetime] = {
+        f"A{i}": start_at + timedelta(seconds=SPREAD_S * i / PENDING) for i in range(PENDING)
+    }
+
+    start = time.perf_counter()
+    for key, end_time in end_times.items():
+        scheduler.schedule(key, end_time)
+    elapsed = time.perf_counter() - start
+    print(f"Scheduled {PENDING:,} expiries in {elapsed:.2f}s ({PENDING / elapsed:,.0f}/s)")
+
+    start = time.perf_counter()
+    for i in range(0, RESCHEDULED * 2, 2):
+        key = f"A{i}"
+        end_times[key] += timedelta(seconds=1)  # An anti-sniping extension
+        scheduler.reschedule(key, end_times[key])
+    elapsed = time.perf_counter() - start
+    print(f"Rescheduled {RESCHEDULED:,} in {elapsed:.2f}s ({RESCHEDULED / elapsed:,.0f}/s)")
+
+    start = time.perf_counter()
+    for i in range(1, CANCELLED * 2, 2):
+        scheduler.cancel(f"A{i}")
+    elapsed = time.perf_counter() - start
+    print(f"Cancelled {CANCELLED:,} in {elapsed:.2f}s ({CANCELLED / elapsed:,.0f}/s)")
+    if datetime.now() >= start_at:
+        print("WARNING: setup overran the lead time; lateness below includes setup")
+
+    print(f"Waiting for {expected:,} expiries to fire...")
+    done.wait(LEAD_S + SPREAD_S + 60)
+    scheduler.shutdown()
+
+    lateness_ms = sorted(
+        (fired_at - end_times[key]).total_seconds() * 1000 for key, fired_at in fired
+    )
+    p = lambda fraction: lateness_ms[min(len(lateness_ms) - 1, int(len(lateness_ms) * fraction))]
+    print(
+        f"Fired {len(fired):,}; lateness p50 {p(0.50):.2f} ms, p99 {p(0.99):.2f} ms, "
+        f"max {lateness_ms[-1]:.2f} ms"
+    )
+    early = sum(1 for value in lateness_ms if value < -1)
+    if len(fired) != expected or early:
+        raise SystemExit(f"FAILED: {len(fired):,} fired, {early:,} more than 1 ms early")
+    print("PASSED: every live expiry fired once, none early")
+
+
+if __name__ == "__main__":
+    main()
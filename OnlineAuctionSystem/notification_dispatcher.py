@@ -0,0 +1,97 @@
+"""
+Delivers auction notifications off the bidding path.
+Auctions only enqueue (observer, message) pairs; background workers drain them
+and call the observers. Messages are batched per observer, so a user gets
+everything pending for them in one on_batch_update call, and messages with a
+coalesce key (e.g. "outbid") replace the older pending message with the same
+key for the same auction, so only the latest one is delivered.
+A given observer is only ever served by one worker at a time, so its messages
+arrive in the order they were sent.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Set, Tuple, TYPE_CHECKING
+import itertools
+import threading
+
+if TYPE_CHECKING:
+    from auction import Auction
+    from auction_observer import AuctionObserver
+
+
+class NotificationDispatcher:
+    DEFAULT_WORKERS = 4
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        # Pending messages per observer, oldest first, keyed so they can be coalesced
+        self._pending: Dict["AuctionObserver", Dict[Hashable, Tuple["Auction", str]]] = {}
+        self._ready: Deque["AuctionObserver"] = deque()  # Observers with pending messages
+        self._in_flight: Set["AuctionObserver"] = set()  # Observers a worker is serving
+        self._unique = itertools.count()  # Keys for messages that never coalesce
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def notify(
+        self,
+        observer: "AuctionObserver",
+        auction: "Auction",
+        message: str,
+        coalesce_key: Optional[str] = None,
+    ):
+        """Queues a message for an observer; never waits on the observer."""
+        if coalesce_key is None:
+            key: Hashable = next(self._unique)
+        else:
+            key = (coalesce_key, auction.get_id())
+        with self._condition:
+            messages = self._pending.get(observer)
+            if messages is None:
+                messages = self._pending[observer] = {}
+                if observer not in self._in_flight:
+                    self._ready.append(observer)
+                    self._condition.notify()
+            messages.pop(key, None)  # A coalesced message moves to the back as the latest
+            messages[key] = (auction, message)
+
+    def flush(self):
+        """Waits until every queued message has been delivered."""
+        with self._condition:
+            while self._pending or self._in_flight:
+                self._condition.wait()
+
+    def shutdown(self):
+        """Delivers what is queued, then stops the workers."""
+        self.flush()
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._ready and not self._shutdown:
+                    self._condition.wait()
+                if not self._ready:
+                    return
+                observer = self._ready.popleft()
+                batch = list(self._pending.pop(observer).values())
+                self._in_flight.add(observer)
+
+            try:
+                observer.on_batch_update(batch)
+            except Exception as e:
+                # A failing channel must not stop delivery to everyone else
+                print(f"Notification delivery failed: {e}")
+
+            with self._condition:
+                self._in_flight.discard(observer)
+                if observer in self._pending:
+                    self._ready.append(observer)  # More arrived while we were delivering
+                self._condition.notify_all()
@@ -0,0 +1,73 @@
+"""
+Benchmark for notification delivery on the bidding path.
+A bidding war between users whose notification channel takes SLOW_MS per
+message is run twice: with inline notification (the auction calls on_update
+under its lock) and through the NotificationDispatcher. Reports bid latency
+and how many outbid messages coalescing saved.
+"""
+
+import contextlib
+import os
+import time
+from auction import Auction
+from user import User
+from notification_dispatcher import NotificationDispatcher
+from decimal import Decimal
+from datetime import datetime, timedelta
+from typing import Optional
+
+BIDDERS = 20
+BIDS = 2_000
+SLOW_MS = 2
+
+
+class SlowUser(User):
+    """A bidder behind a slow channel (think SMTP or a push gateway)."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.received = 0
+
+    def on_update(self, auction: Auction, message: str):
+        time.sleep(SLOW_MS / 1000)
+        self.received += 1
+
+
+def run(dispatcher: Optional[NotificationDispatcher]) -> dict:
+    auction = Auction("Hot Item", "", Decimal("1"), datetime.now() + timedelta(hours=1))
+    auction.set_dispatcher(dispatcher)
+    bidders = [SlowUser(f"Bidder-{i}") for i in range(BIDDERS)]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for i in range(BIDS):
+            auction.place_bid(bidders[i % BIDDERS], Decimal(2 + i))
+        bid_s = time.perf_counter() - start
+        if dispatcher is not None:
+            dispatcher.flush()
+        total_s = time.perf_counter() - start
+    return {
+        "bid_us": bid_s / BIDS * 1e6,
+        "total_s": total_s,
+        "delivered": sum(bidder.received for bidder in bidders),
+    }
+
+
+def main():
+    print(f"{BIDS:,} bids from {BIDDERS} bidders, {SLOW_MS} ms per notification")
+    inline = run(None)
+    print(
+        f"  inline:     {inline['bid_us']:>9,.1f} us per bid, "
+        f"{inline['delivered']:,} messages delivered, {inline['total_s']:.2f}s total"
+    )
+    dispatcher = NotificationDispatcher()
+    queued = run(dispatcher)
+    dispatcher.shutdown()
+    print(
+        f"  dispatcher: {queued['bid_us']:>9,.1f} us per bid, "
+        f"{queued['delivered']:,} messages delivered, {queued['total_s']:.2f}s total"
+    )
+    print(f"Bid path speedup: {inline['bid_us'] / queued['bid_us']:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
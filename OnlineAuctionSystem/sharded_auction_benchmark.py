@@ -0,0 +1,77 @@
+"""
+Benchmark for the sharded auction service.
+For 1, 2, 4, ... shards (up to --max-shards, by default the CPU count, at
+least 2), creates AUCTIONS auctions and places BIDS winning bids through the
+router in batches, then reports bid throughput and the speedup over 1 shard.
+Throughput can only scale with shards up to the number of free cores.
+
+    python sharded_auction_benchmark.py [--max-shards N]
+"""
+
+import argparse
+import os
+import random
+import time
+from sharded_auction_service import ShardedAuctionService
+from decimal import Decimal
+from datetime import datetime, timedelta
+from typing import Dict
+
+AUCTIONS = 2_000
+BIDDERS = 500
+BIDS = 200_000
+BATCH = 2_000
+
+
+def run(shards: int) -> float:
+    service = ShardedAuctionService(shards, quiet=True)
+    try:
+        end_time = datetime.now() + timedelta(hours=1)
+        auction_ids = [
+            service.create_auction(f"Item-{i}", "", Decimal("1"), end_time) for i in range(AUCTIONS)
+        ]
+        bidder_ids = [service.create_user(f"Bidder-{i}") for i in range(BIDDERS)]
+        rng = random.Random(1)
+        next_amount: Dict[str, int] = {auction_id: 2 for auction_id in auction_ids}
+        batches = []
+        for start in range(0, BIDS, BATCH):
+            batch = []
+            for _ in range(BATCH):
+                auction_id = rng.choice(auction_ids)
+                batch.append((auction_id, rng.choice(bidder_ids), Decimal(next_amount[auction_id])))
+                next_amount[auction_id] += 1
+            batches.append(batch)
+
+        start = time.perf_counter()
+        rejected = 0
+        for batch in batches:
+            rejected += sum(error is not None for error in service.place_bids(batch))
+        elapsed = time.perf_counter() - start
+        if rejected:
+            raise SystemExit(f"FAILED: {rejected} bids were rejected")
+        summaries = [service.get_auction_summary(auction_id) for auction_id in auction_ids[:50]]
+        if any(s["highest_amount"] != next_amount[s["auction_id"]] - 1 for s in summaries):
+            raise SystemExit("FAILED: a shard's highest bid differs from the last bid sent")
+        return BIDS / elapsed
+    finally:
+        service.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-shards", type=int, default=max(2, os.cpu_count() or 1))
+    args = parser.parse_args(argv)
+
+    print(f"{BIDS:,} bids on {AUCTIONS:,} auctions in batches of {BATCH:,} ({os.cpu_count()} CPUs)")
+    baseline = None
+    shards = 1
+    while shards <= args.max_shards:
+        rate = run(shards)
+        baseline = baseline or rate
+        print(f"  {shards:>3} shard(s): {rate:>10,.0f} bids/s  ({rate / baseline:.2f}x)")
+        shards *= 2
+    print("PASSED: every bid accepted and highest bids verified")
+
+
+if __name__ == "__main__":
+    main()
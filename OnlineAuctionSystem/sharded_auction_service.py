@@ -0,0 +1,268 @@
+"""
+A sharded auction service: auctions are partitioned by ID across worker
+processes, so bidding scales with cores instead of being capped by one
+interpreter.
+
+Each worker process runs its own AuctionService (the singleton is per
+process), with its own auctions, bid books, expiry scheduler and notification
+workers. ShardedAuctionService is a thin router: it assigns auction IDs, maps
+each ID to a shard on a consistent-hash ring and forwards calls over one pipe
+per shard. Users are registered with the router and created on a shard the
+first time they bid there. Only IDs, amounts and plain summaries cross the
+process boundary.
+"""
+
+from bisect import bisect
+from decimal import Decimal
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import threading
+import uuid
+
+# A bid sent in a batch: (auction ID, bidder ID, amount)
+BidRequest = Tuple[str, str, Decimal]
+
+
+# ----- Worker process side -----
+
+
+def _bidder(service, user_id: str, name: str):
+    """Returns the shard's copy of a user, creating it on the user's first bid here."""
+    user = service.users.get(user_id)
+    if user is None:
+        user = service.create_user(name, user_id)
+    return user
+
+
+def _create_auction(service, auction_id, item_name, description, base_price, end_time):
+    service.create_auction(item_name, description, base_price, end_time, auction_id)
+
+
+def _place_bids(service, bids):
+    """Places a batch of (auction ID, bidder ID, name, amount); returns None or the error per bid."""
+    results = []
+    for auction_id, user_id, name, amount in bids:
+        try:
+            _bidder(service, user_id, name)
+            # Through the service, so anti-sniping and the bid ledger apply as on one process
+            service.place_bid(auction_id, user_id, amount)
+            results.append(None)
+        except Exception as error:
+            results.append(error)
+    return results
+
+
+def _summary(service, auction_id):
+    auction = service.get_auction(auction_id)
+    state, end_time, best_bid, count = auction.get_ledger_state()
+    return {
+        "auction_id": auction_id,
+        "item_name": auction.get_item_name(),
+        "state": state.value,
+        "end_time": end_time,
+        "bid_count": count,
+        "highest_bidder_id": None if best_bid is None else best_bid.get_bidder().get_id(),
+        "highest_amount": None if best_bid is None else best_bid.get_amount(),
+    }
+
+
+_HANDLERS = {
+    "create_auction": _create_auction,
+    "place_bids": _place_bids,
+    "end_auction": lambda service, auction_id: service.end_auction(auction_id),
+    "extend_auction": lambda service, auction_id, end_time: service.extend_auction(auction_id, end_time),
+    "set_anti_sniping_window": lambda service, window: service.set_anti_sniping_window(window),
+    "summary": _summary,
+    "active_count": lambda service: len(service.view_active_auctions()),
+}
+
+
+def _serve(connection, quiet: bool):
+    """Worker loop: runs commands against this process's AuctionService until told to stop."""
+    from auction_service import AuctionService
+
+    with contextlib.ExitStack() as stack:
+        if quiet:  # Keep the per-bid console output out of the parent's terminal
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        service = AuctionService.get_instance()
+        while True:
+            command = connection.recv()
+            if command is None:
+                break
+            op, args = command
+            try:
+                connection.send((True, _HANDLERS[op](service, *args)))
+            except Exception as error:
+                connection.send((False, error))
+        service.shutdown()
+    connection.close()
+
+
+# ----- Router side -----
+
+
+class ConsistentHashRing:
+    """
+    Maps keys to shards. Each shard owns many points (virtual nodes) on a hash
+    ring, and a key belongs to the shard owning the first point after the key's
+    hash, which spreads keys evenly. With a different shard count, only about
+    1/n of the keys would move.
+    """
+
+    def __init__(self, shards: int, virtual_nodes: int = 128):
+        points = sorted(
+            (self._hash(f"shard-{shard}#{node}"), shard)
+            for shard in range(shards)
+            for node in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def get_shard(self, key: str) -> int:
+        index = bisect(self._hashes, self._hash(key))
+        return self._shards[index % len(self._shards)]
+
+
+class ShardedAuctionService:
+    """
+    Routes auction calls to the shard that owns the auction. Calls for
+    auctions on different shards run in parallel; calls for the same shard
+    are served one at a time. The shard count is fixed for the service's
+    lifetime, because auctions live in their shard's memory.
+    """
+
+    def __init__(self, shards: Optional[int] = None, quiet: bool = False):
+        shards = shards or os.cpu_count() or 1
+        # spawn: workers start from a clean interpreter, not a fork of our threads
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        for _ in range(shards):
+            parent_end, worker_end = context.Pipe()
+            process = context.Process(target=_serve, args=(worker_end, quiet), daemon=True)
+            process.start()
+            worker_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+        self._shard_locks = [threading.Lock() for _ in range(shards)]
+        self._ring = ConsistentHashRing(shards)
+        self.users: Dict[str, str] = {}  # user ID -> name
+
+    def get_shard_count(self) -> int:
+        return len(self._processes)
+
+    def get_shard_for(self, auction_id: str) -> int:
+        return self._ring.get_shard(auction_id)
+
+    def create_user(self, name: str) -> str:
+        """Registers a user and returns their ID."""
+        user_id = str(uuid.uuid4())
+        self.users[user_id] = name
+        return user_id
+
+    def create_auction(
+        self, item_name: str, description: str, base_price: Decimal, end_time: datetime
+    ) -> str:
+        """Creates an auction on its shard and returns its ID."""
+        auction_id = str(uuid.uuid4())
+        self._call(
+            self.get_shard_for(auction_id),
+            "create_auction",
+            auction_id, item_name, description, base_price, end_time,
+        )
+        return auction_id
+
+    def place_bid(self, auction_id: str, bidder_id: str, amount: Decimal):
+        """Places one bid; raises the shard's error if it is rejected."""
+        error = self.place_bids([(auction_id, bidder_id, amount)])[0]
+        if error is not None:
+            raise error
+
+    def place_bids(self, bids: List[BidRequest]) -> List[Optional[Exception]]:
+        """
+        Places a batch of bids with one round trip per shard involved, all shards
+        working at once. Returns None for each accepted bid and the error for
+        each rejected one, in input order.
+        """
+        by_shard: Dict[int, List[int]] = {}
+        for position, (auction_id, _, _) in enumerate(bids):
+            by_shard.setdefault(self.get_shard_for(auction_id), []).append(position)
+        requests = {
+            shard: [
+                (bids[p][0], bids[p][1], self._user_name(bids[p][1]), bids[p][2])
+                for p in positions
+            ]
+            for shard, positions in by_shard.items()
+        }
+        results: List[Optional[Exception]] = [None] * len(bids)
+        replies = self._call_many({shard: ("place_bids", (batch,)) for shard, batch in requests.items()})
+        for shard, errors in replies.items():
+            for position, error in zip(by_shard[shard], errors):
+                results[position] = error
+        return results
+
+    def end_auction(self, auction_id: str):
+        self._call(self.get_shard_for(auction_id), "end_auction", auction_id)
+
+    def extend_auction(self, auction_id: str, new_end_time: datetime):
+        self._call(self.get_shard_for(auction_id), "extend_auction", auction_id, new_end_time)
+
+    def set_anti_sniping_window(self, window: Optional[timedelta]):
+        """Sets the anti-sniping window on every shard (see AuctionService)."""
+        self._call_many(
+            {shard: ("set_anti_sniping_window", (window,)) for shard in range(self.get_shard_count())}
+        )
+
+    def get_auction_summary(self, auction_id: str) -> dict:
+        """State, end time, bid count and highest bid of an auction."""
+        return self._call(self.get_shard_for(auction_id), "summary", auction_id)
+
+    def get_active_count(self) -> int:
+        replies = self._call_many(
+            {shard: ("active_count", ()) for shard in range(self.get_shard_count())}
+        )
+        return sum(replies.values())
+
+    def shutdown(self):
+        """Stops every shard (each shuts down its own scheduler and notifier)."""
+        for shard, connection in enumerate(self._connections):
+            with self._shard_locks[shard]:
+                connection.send(None)
+                connection.close()
+        for process in self._processes:
+            process.join()
+
+    def _user_name(self, user_id: str) -> str:
+        name = self.users.get(user_id)
+        if name is None:
+            raise KeyError(f"User with ID {user_id} not found.")
+        return name
+
+    def _call(self, shard: int, op: str, *args):
+        return self._call_many({shard: (op, args)})[shard]
+
+    def _call_many(self, calls: Dict[int, Tuple[str, tuple]]) -> dict:
+        """Sends one command to each shard, then collects the replies, so shards work in parallel."""
+        shards = sorted(calls)  # A fixed lock order, so concurrent callers can't deadlock
+        for shard in shards:
+            self._shard_locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._connections[shard].send(calls[shard])
+            replies = {shard: self._connections[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self._shard_locks[shard].release()
+        for ok, result in replies.values():
+            if not ok:
+                raise result
+        return {shard: result for shard, (_, result) in replies.items()}
@@ -7,11 +7,12 @@ from auctions they participate in.
 import uuid
 from auction_observer import AuctionObserver
 from auction import Auction
+from typing import Optional
 
 
 class User(AuctionObserver):
-    def __init__(self, name: str):
-        self.id = str(uuid.uuid4())
+    def __init__(self, name: str, user_id: Optional[str] = None):
+        self.id = user_id or str(uuid.uuid4())  # An existing ID when restoring
         self.name = name
 
     def get_id(self) -> str:
@@ -22,7 +23,11 @@ class User(AuctionObserver):
 
     def on_update(self, auction: Auction, message: str):
         """Called by an Auction (Subject) to notify this User (Observer)."""
-        print(f"--- Notification for {self.name} ---")
-        print(f"Auction: {auction.get_item_name()}")
-        print(f"Message: {message}")
-        print("----------------------------------\n")
+        # One write (end=""), so notifications from different workers never interleave
+        print(
+            f"--- Notification for {self.name} ---\n"
+            f"Auction: {auction.get_item_name()}\n"
+            f"Message: {message}\n"
+            "----------------------------------\n\n",
+            end="",
+        )
@@ -0,0 +1,102 @@
+"""
+Thousands of simulated async gate connections on one event loop, each parking
+and unparking cars in a loop, while one consumer reads the occupancy stream.
+Compares the native AsyncParkingLot with wrapping every blocking call in
+run_in_executor.
+"""
+
+import asyncio
+import time
+from async_parking_lot import AsyncParkingLot
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor
+from parking_spot import ParkingSpot
+from concurrency_mode import ConcurrencyMode
+from event_sink import NullEventSink
+from vehicle_size import VehicleSize
+from bike import Bike
+from car import Car
+from truck import Truck
+
+GATES = 2000
+CYCLES_PER_GATE = 10
+FLOORS = 10
+SPOTS_PER_SIZE = 300
+
+
+def _setup_parking_lot() -> ParkingLot:
+    parking_lot = ParkingLot.get_instance()
+    parking_lot.clear()
+    parking_lot.set_concurrency_mode(ConcurrencyMode.FINE_GRAINED)
+    parking_lot.set_event_sink(NullEventSink())
+    for floor_number in range(1, FLOORS + 1):
+        floor = ParkingFloor(floor_number)
+        floor.add_spots(
+            ParkingSpot(f"F{floor_number}-{size.name[0]}{i}", size)
+            for size in VehicleSize
+            for i in range(SPOTS_PER_SIZE)
+        )
+        parking_lot.add_floor(floor)
+    return parking_lot
+
+
+def _vehicle(gate: int, cycle: int):
+    return (Bike, Car, Truck)[gate % 3](f"G{gate}-{cycle}")
+
+
+async def _native_gate(lot: AsyncParkingLot, gate: int):
+    for cycle in range(CYCLES_PER_GATE):
+        vehicle = _vehicle(gate, cycle)
+        if await lot.park(vehicle) is not None:
+            await lot.unpark(vehicle.get_license_number())
+
+
+async def _executor_gate(parking_lot: ParkingLot, gate: int):
+    loop = asyncio.get_running_loop()
+    for cycle in range(CYCLES_PER_GATE):
+        vehicle = _vehicle(gate, cycle)
+        if await loop.run_in_executor(None, parking_lot.park_vehicle, vehicle) is not None:
+            await loop.run_in_executor(
+                None, parking_lot.unpark_vehicle, vehicle.get_license_number()
+            )
+
+
+async def _count_changes(subscription, counter: list):
+    async for _ in subscription:
+        counter[0] += 1
+
+
+async def _run_native() -> float:
+    lot = AsyncParkingLot(_setup_parking_lot())
+    changes = [0]
+    consumer = asyncio.create_task(_count_changes(lot.subscribe_occupancy(), changes))
+    start = time.perf_counter()
+    await asyncio.gather(*(_native_gate(lot, gate) for gate in range(GATES)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0)  # Let the consumer drain what is already queued
+    lot.close()
+    await consumer
+    print(f"Occupancy stream delivered {changes[0]} changes")
+    return elapsed
+
+
+async def _run_executor() -> float:
+    parking_lot = _setup_parking_lot()
+    start = time.perf_counter()
+    await asyncio.gather(*(_executor_gate(parking_lot, gate) for gate in range(GATES)))
+    return time.perf_counter() - start
+
+
+def main():
+    operations = GATES * CYCLES_PER_GATE * 2
+    print(f"{GATES} gates x {CYCLES_PER_GATE} park/unpark cycles")
+    for label, run in (("native asyncio", _run_native), ("run_in_executor", _run_executor)):
+        elapsed = asyncio.run(run())
+        print(f"{label:>16}: {operations / elapsed:>10,.0f} operations/s")
+    if ParkingLot.get_instance().activeTickets:
+        raise SystemExit("FAILED: vehicles left behind")
+    print("PASSED: every vehicle parked and left")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+A native asyncio front-end for ParkingLot, for gate controllers that are async
+network clients.
+
+Allocation itself takes microseconds and never waits on I/O, so in
+FINE_GRAINED mode it runs on the event loop thread instead of hopping to an
+executor. Requests made during one loop iteration are coalesced: every gate
+that awaited park()/unpark() in that iteration is served by one
+park_vehicles_deferred/unpark_vehicles_deferred call. Only the journal's
+durability wait can block, so it is moved off the loop, once per batch, and
+only when a journal is attached.
+
+In GLOBAL_LOCK mode every batch call waits for the lot-wide lock, which threads
+outside the loop may be holding, so each batch is served (and published) on a
+worker thread instead. Requests keep coalescing meanwhile, and the next batch
+starts when the previous one is done, so batches are still served in order.
+
+Occupancy changes (a floor's free count for a size) can be consumed as an async
+stream through subscribe_occupancy().
+"""
+
+import asyncio
+from availability_observer import AvailabilityObserver
+from coalescing_buffer import CoalescingBuffer
+from concurrency_mode import ConcurrencyMode
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor
+from parking_ticket import ParkingTicket
+from parking_event import ParkingEvent
+from vehicle import Vehicle
+from vehicle_size import VehicleSize
+from typing import List, Optional, Tuple
+
+
+class OccupancyChange:
+    """The new number of free spots of one size on one floor."""
+
+    __slots__ = ("floor_number", "size", "free_count")
+
+    def __init__(self, floor_number: int, size: VehicleSize, free_count: int):
+        self.floor_number = floor_number
+        self.size = size
+        self.free_count = free_count
+
+    def __str__(self) -> str:
+        return f"Floor {self.floor_number} {self.size.name}: {self.free_count} free"
+
+
+class OccupancySubscription:
+    """
+    An async iterator of OccupancyChange. Pending changes are coalesced per
+    floor and size: a consumer that falls behind gets the latest count of each
+    one that changed, oldest first, so it never loses a floor's last update
+    and never holds more than one pending change per floor and size.
+    """
+
+    def __init__(self, feed: "_OccupancyFeed"):
+        self._feed = feed
+        self._changes = CoalescingBuffer()  # (floor number, size) -> free count
+        self._wake = asyncio.Event()
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> OccupancyChange:
+        while True:
+            taken = self._changes.take(1)
+            if taken:
+                (floor_number, size), free_count = taken[0]
+                return OccupancyChange(floor_number, size, free_count)
+            if self._closed:
+                raise StopAsyncIteration
+            self._wake.clear()
+            await self._wake.wait()
+
+    def close(self):
+        """Stops the subscription; the iteration ends after the changes already pending."""
+        if not self._closed:
+            self._closed = True
+            self._feed.remove(self)
+            self._wake.set()
+
+    def _offer(self, change: OccupancyChange):
+        """Runs on the event loop thread."""
+        self._changes.put((change.floor_number, change.size), change.free_count)
+        self._wake.set()
+
+
+class _OccupancyFeed(AvailabilityObserver):
+    """
+    Observes the lot's floors (as a floor observer of the lot, so floors added
+    later are covered too) and fans each change out to every subscription.
+    Floors may notify from any thread; changes are handed to the event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._subscriptions: List[OccupancySubscription] = []
+
+    def add(self, subscription: OccupancySubscription):
+        self._subscriptions = self._subscriptions + [subscription]
+
+    def remove(self, subscription: OccupancySubscription):
+        self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    def on_availability_changed(self, floor: ParkingFloor, size: VehicleSize, free_count: int):
+        if not self._subscriptions:
+            return
+        change = OccupancyChange(floor.floor_number, size, free_count)
+        if self._loop_is_current():
+            self._fan_out(change)
+        else:
+            self._loop.call_soon_threadsafe(self._fan_out, change)
+
+    def _fan_out(self, change: OccupancyChange):
+        for subscription in self._subscriptions:
+            subscription._offer(change)
+
+    def _loop_is_current(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+
+class AsyncParkingLot:
+    """
+    Async facade over a ParkingLot (the singleton by default).
+    Create it from inside the event loop that will use it.
+    """
+
+    def __init__(self, parking_lot: Optional[ParkingLot] = None):
+        self.parking_lot = parking_lot or ParkingLot.get_instance()
+        self._loop = asyncio.get_running_loop()
+        self._parks: List[Tuple[Vehicle, asyncio.Future]] = []
+        self._unparks: List[Tuple[str, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._serving = False  # A batch is being served on a worker thread
+        self._feed = _OccupancyFeed(self._loop)
+        self._feed_attached = False
+
+    async def park(self, vehicle: Vehicle) -> Optional[ParkingTicket]:
+        """Parks a vehicle; returns its ticket, or None if no spot was available."""
+        future = self._loop.create_future()
+        self._parks.append((vehicle, future))
+        self._schedule_flush()
+        return await future
+
+    async def unpark(self, license_number: str) -> Optional[float]:
+        """Unparks a vehicle; returns the fee, or None if there was no ticket."""
+        future = self._loop.create_future()
+        self._unparks.append((license_number, future))
+        self._schedule_flush()
+        return await future
+
+    def subscribe_occupancy(self) -> OccupancySubscription:
+        """
+        Opens a stream of occupancy changes for every floor in the lot, now
+        and added later:
+            async for change in lot.subscribe_occupancy(): ...
+        """
+        if not self._feed_attached:
+            self.parking_lot.add_floor_observer(self._feed)
+            self._feed_attached = True
+        subscription = OccupancySubscription(self._feed)
+        self._feed.add(subscription)
+        return subscription
+
+    def close(self):
+        """Ends every occupancy stream and stops observing the lot's floors."""
+        for subscription in list(self._feed._subscriptions):
+            subscription.close()
+        if self._feed_attached:
+            self.parking_lot.remove_floor_observer(self._feed)
+            self._feed_attached = False
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        """Serves every request made since the last flush in two batch calls."""
+        self._flush_scheduled = False
+        if self._serving:
+            return  # The batch on the worker thread flushes again when it is done
+        unparks, self._unparks = self._unparks, []
+        parks, self._parks = self._parks, []
+
+        if self.parking_lot.concurrency_mode == ConcurrencyMode.GLOBAL_LOCK:
+            # Waiting for the lot-wide lock would block the loop
+            self._serving = True
+            self._loop.create_task(self._serve_off_loop(unparks, parks))
+            return
+
+        events, results, failures = self._serve(unparks, parks)
+        for futures, error in failures:
+            self._fail(futures, error)
+        if not results:
+            return
+
+        if self.parking_lot.get_journal() is None:
+            try:
+                self.parking_lot.publish(events)
+            except Exception as error:
+                self._fail([future for future, _ in results], error)
+                return
+            self._resolve(results)
+        else:
+            # Waiting for the group commit would block the loop; do it on a thread
+            self._loop.create_task(self._publish_durably(events, results))
+
+    def _serve(self, unparks: list, parks: list) -> Tuple[List[ParkingEvent], list, list]:
+        """
+        Makes the batch calls. Returns the events, the (future, ticket or fee)
+        results and the (futures, error) failures; futures are left untouched,
+        since this may run on a worker thread.
+        """
+        events: List[ParkingEvent] = []
+        results = []
+        failures = []
+        # Departures first, so their spots are free for this batch's arrivals.
+        # Each batch fails on its own: a park that raises must not fail (or
+        # hide the events of) the unparks already done.
+        if unparks:
+            try:
+                unpark_events = self.parking_lot.unpark_vehicles_deferred(
+                    [license_number for license_number, _ in unparks]
+                )
+            except Exception as error:
+                failures.append(([future for _, future in unparks], error))
+            else:
+                events.extend(unpark_events)
+                results.extend(
+                    (future, event.get_fee()) for (_, future), event in zip(unparks, unpark_events)
+                )
+        if parks:
+            try:
+                tickets, park_events = self.parking_lot.park_vehicles_deferred(
+                    [vehicle for vehicle, _ in parks]
+                )
+            except Exception as error:
+                failures.append(([future for _, future in parks], error))
+            else:
+                events.extend(park_events)
+                results.extend((future, ticket) for (_, future), ticket in zip(parks, tickets))
+        return events, results, failures
+
+    def _serve_and_publish(self, unparks: list, parks: list) -> Tuple[list, list]:
+        """_serve followed by publish, for a worker thread; returns results and failures."""
+        events, results, failures = self._serve(unparks, parks)
+        if results:
+            try:
+                self.parking_lot.publish(events)
+            except Exception as error:
+                failures.append(([future for future, _ in results], error))
+                results = []
+        return results, failures
+
+    async def _serve_off_loop(self, unparks: list, parks: list):
+        try:
+            results, failures = await asyncio.to_thread(self._serve_and_publish, unparks, parks)
+        except Exception as error:
+            results = []
+            failures = [([future for _, future in unparks + parks], error)]
+        finally:
+            self._serving = False
+            if self._parks or self._unparks:
+                self._schedule_flush()
+        for futures, error in failures:
+            self._fail(futures, error)
+        self._resolve(results)
+
+    async def _publish_durably(self, events: List[ParkingEvent], results: list):
+        try:
+            await asyncio.to_thread(self.parking_lot.publish, events)
+        except Exception as error:
+            self._fail([future for future, _ in results], error)
+            return
+        self._resolve(results)
+
+    @staticmethod
+    def _fail(futures: List[asyncio.Future], error: Exception):
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    @staticmethod
+    def _resolve(results: list):
+        for future, result in results:
+            if not future.done():  # The gate may have given up (cancelled)
+                future.set_result(result)
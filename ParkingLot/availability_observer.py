@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from vehicle_size import VehicleSize
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from parking_floor import ParkingFloor
+
+
+class AvailabilityObserver(ABC):
+    """
+    Observer interface for anything that tracks a floor's free-spot counters.
+    A ParkingFloor (the Subject) calls on_availability_changed whenever the
+    number of free spots of a given size changes.
+    """
+
+    @abstractmethod
+    def on_availability_changed(
+        self, floor: "ParkingFloor", size: VehicleSize, free_count: int
+    ):
+        pass
@@ -0,0 +1,112 @@
+"""
+Compares parking and unparking a batch of vehicles one call at a time
+(park_vehicle / unpark_vehicle) with the batch API (park_vehicles /
+unpark_vehicles), for bus-sized and fleet-sized batches, in both concurrency
+modes. Each round parks a batch into a lot that is already half full, then
+unparks it again.
+
+    python batch_parking_benchmark.py [--floors N] [--spots-per-size N] [--rounds N]
+"""
+
+import argparse
+import time
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor
+from parking_spot import ParkingSpot
+from concurrency_mode import ConcurrencyMode
+from event_sink import NullEventSink
+from vehicle_size import VehicleSize
+from bike import Bike
+from car import Car
+from truck import Truck
+
+BATCH_SIZES = (50, 1_000)
+
+
+def _setup_parking_lot(mode: ConcurrencyMode, floors: int, spots_per_size: int) -> ParkingLot:
+    parking_lot = ParkingLot.get_instance()
+    parking_lot.clear()
+    parking_lot.set_concurrency_mode(mode)
+    parking_lot.set_event_sink(NullEventSink())
+    for floor_number in range(1, floors + 1):
+        floor = ParkingFloor(floor_number)
+        floor.add_spots(
+            ParkingSpot(f"F{floor_number}-{size.name[0]}{i}", size)
+            for size in VehicleSize
+            for i in range(spots_per_size)
+        )
+        parking_lot.add_floor(floor)
+    # Half full, so the searches skip occupied spots as they would in a busy lot
+    parking_lot.park_vehicles(
+        _vehicle(f"resident-{i}", i) for i in range(floors * spots_per_size * len(VehicleSize) // 2)
+    )
+    return parking_lot
+
+
+def _vehicle(license_number: str, index: int):
+    return (Bike, Car, Truck)[index % 3](license_number)
+
+
+def _run_single(parking_lot: ParkingLot, vehicles: list) -> tuple:
+    start = time.perf_counter()
+    tickets = [parking_lot.park_vehicle(vehicle) for vehicle in vehicles]
+    parked = time.perf_counter()
+    fees = [parking_lot.unpark_vehicle(vehicle.get_license_number()) for vehicle in vehicles]
+    return parked - start, time.perf_counter() - parked, tickets, fees
+
+
+def _run_batch(parking_lot: ParkingLot, vehicles: list) -> tuple:
+    start = time.perf_counter()
+    tickets = parking_lot.park_vehicles(vehicles)
+    parked = time.perf_counter()
+    fees = parking_lot.unpark_vehicles([vehicle.get_license_number() for vehicle in vehicles])
+    return parked - start, time.perf_counter() - parked, tickets, fees
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--floors", type=int, default=10)
+    parser.add_argument("--spots-per-size", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{args.floors} floors x {args.spots_per_size} spots per size, half full; "
+        f"{args.rounds} rounds per case"
+    )
+    print(f"{'mode':>13} {'batch':>6} {'api':>7} {'park veh/s':>12} {'unpark veh/s':>13} {'speed-up':>9}")
+    failures = []
+    for mode in ConcurrencyMode:
+        parking_lot = _setup_parking_lot(mode, args.floors, args.spots_per_size)
+        for batch_size in BATCH_SIZES:
+            rates = {}
+            for name, run in (("single", _run_single), ("batch", _run_batch)):
+                park_s = unpark_s = 0.0
+                for round_number in range(args.rounds):
+                    vehicles = [
+                        _vehicle(f"{name}-{round_number}-{i}", i) for i in range(batch_size)
+                    ]
+                    park_time, unpark_time, tickets, fees = run(parking_lot, vehicles)
+                    park_s += park_time
+                    unpark_s += unpark_time
+                    if None in tickets or None in fees:
+                        failures.append((mode.name, batch_size, name, round_number))
+                total = batch_size * args.rounds
+                rates[name] = (total / park_s, total / unpark_s)
+                speed_up = "" if name == "single" else (
+                    f"{rates['batch'][0] / rates['single'][0]:>4.1f}x/"
+                    f"{rates['batch'][1] / rates['single'][1]:.1f}x"
+                )
+                print(
+                    f"{mode.name:>13} {batch_size:>6} {name:>7} {rates[name][0]:>12,.0f} "
+                    f"{rates[name][1]:>13,.0f} {speed_up:>9}"
+                )
+    parking_lot.clear()
+
+    if failures:
+        raise SystemExit(f"FAILED: vehicles left unparked or without a fee in {failures[:5]}")
+    print("PASSED: every vehicle parked and left in both APIs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Import necessary classes and type hints
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """
+    Abstract source of the current time for tickets, fees and events.
+    Timestamps are integer Unix times in milliseconds, the unit the fee
+    strategies work in. Injecting a clock makes runs deterministic and lets a
+    simulation replay a day of traffic faster than real time.
+    """
+
+    @abstractmethod
+    def now(self) -> int:
+        """Returns the current time in milliseconds since the Unix epoch."""
+        pass
+
+
+class SystemClock(Clock):
+    """The real wall-clock time."""
+
+    def now(self) -> int:
+        return time.time_ns() // 1_000_000
+
+
+class ManualClock(Clock):
+    """A clock that only moves when told to, for tests and simulations."""
+
+    def __init__(self, start_ms: int = 0):
+        self._now = start_ms
+
+    def now(self) -> int:
+        return self._now
+
+    def set(self, timestamp_ms: int):
+        self._now = timestamp_ms
+
+    def advance(self, delta_ms: int):
+        self._now += delta_ms
+
+
+# Shared default used wherever no clock is injected
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,53 @@
+# Import necessary classes and type hints
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class CoalescingBuffer:
+    """
+    Pending updates keyed by what they describe, e.g. (floor number, size).
+    A newer value for a key replaces the pending one in place, so a slow
+    consumer only ever sees the latest value per key, and the buffer never
+    holds more than one entry per key. A value equal to the last one taken for
+    its key is skipped, so a change undone before delivery delivers nothing.
+    Shared by the occupancy feeds for signs and for asyncio streams.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Hashable, object] = {}  # In the order keys became pending
+        self._taken: Dict[Hashable, object] = {}  # The last value taken per key
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, value) -> bool:
+        """Records the latest value for a key; True if the buffer was empty (wake the consumer)."""
+        with self._lock:
+            was_empty = not self._pending
+            self._pending[key] = value
+            return was_empty
+
+    def take(self, limit: Optional[int] = None) -> List[Tuple[Hashable, object]]:
+        """
+        Removes and returns up to limit pending (key, value) pairs, oldest key
+        first, skipping values that did not change since last taken.
+        """
+        taken: List[Tuple[Hashable, object]] = []
+        with self._lock:
+            while self._pending and (limit is None or len(taken) < limit):
+                key = next(iter(self._pending))
+                value = self._pending.pop(key)
+                if self._taken.get(key, _MISSING) == value:
+                    continue
+                self._taken[key] = value
+                taken.append((key, value))
+        return taken
+
+    def clear(self):
+        """Drops every pending value and forgets what was taken."""
+        with self._lock:
+            self._pending.clear()
+            self._taken.clear()
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,279 @@
+# Import necessary classes and type hints
+import base64
+from array import array
+from collections.abc import Mapping
+from parking_floor import ParkingFloor, SpotFilter, TimedSpotFilter
+from parking_spot import ParkingSpot
+from vehicle import Vehicle
+from vehicle_size import VehicleSize
+from typing import Dict, Iterable, Iterator, Optional
+
+# Bit flags stored per spot in CompactParkingFloor._flags
+_OCCUPIED = 1
+_INDEXED = 2  # The spot's index is currently sitting in a free stack
+
+
+class CompactParkingSpot(ParkingSpot):
+    """
+    A lightweight view of one spot in a CompactParkingFloor.
+    It holds only the floor and the spot's index; all state lives in the floor's
+    arrays, so views can be created on demand and thrown away freely.
+    """
+
+    __slots__ = ("_compact_floor", "_index")
+
+    def __init__(self, floor: "CompactParkingFloor", index: int):
+        # Deliberately skips ParkingSpot.__init__: a view owns no state of its own
+        self._compact_floor = floor
+        self._index = index
+
+    @property
+    def spot_id(self) -> str:
+        return self._compact_floor.spot_id_for(self._index)
+
+    @property
+    def spot_size(self) -> VehicleSize:
+        return VehicleSize(self._compact_floor._sizes[self._index])
+
+    @property
+    def is_occupied(self) -> bool:
+        return bool(self._compact_floor._flags[self._index] & _OCCUPIED)
+
+    @property
+    def parked_vehicle(self) -> Optional[Vehicle]:
+        return self._compact_floor._vehicles.get(self._index)
+
+    def get_index(self) -> int:
+        return self._index
+
+    def get_spot_id(self) -> str:
+        return self.spot_id
+
+    def get_spot_size(self) -> VehicleSize:
+        return self.spot_size
+
+    def get_floor(self) -> "CompactParkingFloor":
+        return self._compact_floor
+
+    def set_floor(self, floor: "ParkingFloor"):
+        raise TypeError("A compact spot always belongs to the floor that created it.")
+
+    def is_available(self) -> bool:
+        return not self.is_occupied
+
+    def is_occupied_spot(self) -> bool:
+        return self.is_occupied
+
+    def park_vehicle(self, vehicle: Vehicle):
+        self._compact_floor._occupy(self._index, vehicle, only_if_free=False)
+
+    def try_claim(self, vehicle: Vehicle, notify_floor: bool = True) -> bool:
+        return self._compact_floor._occupy(
+            self._index, vehicle, only_if_free=True, notify=notify_floor
+        )
+
+    def unpark_vehicle(self, notify_floor: bool = True) -> bool:
+        return self._compact_floor._release(self._index, notify=notify_floor)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, CompactParkingSpot)
+            and other._compact_floor is self._compact_floor
+            and other._index == self._index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self._compact_floor), self._index))
+
+
+class _CompactSpotMap(Mapping):
+    """Read-only 'spots' dictionary for a compact floor, producing views on demand."""
+
+    def __init__(self, floor: "CompactParkingFloor"):
+        self._floor = floor
+
+    def __getitem__(self, spot_id: str) -> CompactParkingSpot:
+        index = self._floor.index_for(spot_id)
+        if index is None:
+            raise KeyError(spot_id)
+        return CompactParkingSpot(self._floor, index)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self._floor._sizes)):
+            yield self._floor.spot_id_for(index)
+
+    def __len__(self) -> int:
+        return len(self._floor._sizes)
+
+    def values(self) -> Iterator[CompactParkingSpot]:
+        for index in range(len(self._floor._sizes)):
+            yield CompactParkingSpot(self._floor, index)
+
+
+class CompactParkingFloor(ParkingFloor):
+    """
+    A memory-compact ParkingFloor for very large lots.
+    Instead of one ParkingSpot object (with its own lock and __dict__) per spot,
+    it stores spot sizes and occupancy flags in parallel bytearrays and keeps
+    one array of free spot indexes per size. Spot IDs are derived from the index
+    ("F<floor>-<index>"), and spots are exposed as CompactParkingSpot views, so
+    strategies and the lot use it exactly like a regular floor.
+
+    Free spots are handed out from per-size stacks, lowest index first until
+    spots start being returned; after that a freed spot is reused first.
+    """
+
+    def __init__(self, floor_number: int, spot_sizes: Iterable[VehicleSize] = ()):
+        super().__init__(floor_number)
+        self._sizes = bytearray()  # VehicleSize value per spot
+        self._flags = bytearray()  # _OCCUPIED / _INDEXED bits per spot
+        self._free_stacks: Dict[VehicleSize, array] = {
+            size: array("i") for size in VehicleSize
+        }
+        self._vehicles: Dict[int, Vehicle] = {}  # Only occupied spots have an entry
+        self.spots = _CompactSpotMap(self)
+        self._id_prefix = f"F{floor_number}-"
+        self.add_spot_sizes(spot_sizes)
+
+    def spot_id_for(self, index: int) -> str:
+        return f"{self._id_prefix}{index}"
+
+    def index_for(self, spot_id: str) -> Optional[int]:
+        """Parses a spot ID produced by spot_id_for, returning None if it isn't ours."""
+        if not spot_id.startswith(self._id_prefix):
+            return None
+        digits = spot_id[len(self._id_prefix) :]
+        if not digits.isdigit():
+            return None
+        index = int(digits)
+        return index if index < len(self._sizes) else None
+
+    def add_spot_sizes(self, spot_sizes: Iterable[VehicleSize]):
+        """Appends spots of the given sizes; their IDs follow from their positions."""
+        with self._lock:
+            first = len(self._sizes)
+            self._sizes.extend(size.value for size in spot_sizes)
+            # Every new spot starts free and sitting in its size's stack
+            self._flags.extend(bytes([_INDEXED]) * (len(self._sizes) - first))
+            added = {size.value: array("i") for size in VehicleSize}
+            for index, value in enumerate(self._sizes[first:], first):
+                added[value].append(index)
+            for size in VehicleSize:
+                indexes = added[size.value]
+                if not indexes:
+                    continue
+                # Stacks pop from the end, so keep the lowest index on top
+                self._free_counts[size] += len(indexes)
+                indexes.reverse()
+                indexes.extend(self._free_stacks[size])
+                self._free_stacks[size] = indexes
+                self._notify_observers(size)
+
+    def add_spot(self, spot: ParkingSpot):
+        """
+        Adds a spot of the given spot's size.
+        Only the size is kept; the new spot's ID is derived from its index.
+        """
+        self.add_spot_sizes([spot.get_spot_size()])
+
+    def add_spots(self, spots: Iterable[ParkingSpot]):
+        """Adds spots of the given spots' sizes; see add_spot."""
+        self.add_spot_sizes(spot.get_spot_size() for spot in spots)
+
+    def to_layout(self) -> dict:
+        """Describes the floor compactly: the size bytes, base64-encoded."""
+        with self._lock:
+            return {
+                "floor_number": self.floor_number,
+                "compact": True,
+                "sizes": base64.b64encode(bytes(self._sizes)).decode("ascii"),
+            }
+
+    @classmethod
+    def from_layout(
+        cls, layout: dict, parked: Optional[Dict[str, Vehicle]] = None
+    ) -> "CompactParkingFloor":
+        sizes = base64.b64decode(layout["sizes"])
+        by_value = {size.value: size for size in VehicleSize}
+        floor = cls(layout["floor_number"], (by_value[value] for value in sizes))
+        if parked:
+            floor._restore_occupancy(parked)
+        return floor
+
+    def _restore_occupancy(self, parked: Dict[str, Vehicle]):
+        """Marks spots occupied in bulk, notifying observers once per size."""
+        with self._lock:
+            taken = {size.value: 0 for size in VehicleSize}
+            for spot_id, vehicle in parked.items():
+                index = self.index_for(spot_id)
+                if index is None or self._flags[index] & _OCCUPIED:
+                    continue
+                # The free-stack entry is left behind and skipped lazily
+                self._flags[index] |= _OCCUPIED
+                self._vehicles[index] = vehicle
+                taken[self._sizes[index]] += 1
+            for size in VehicleSize:
+                if taken[size.value]:
+                    self._free_counts[size] -= taken[size.value]
+                    self._notify_observers(size)
+
+    def get_spot(self, index: int) -> CompactParkingSpot:
+        return CompactParkingSpot(self, index)
+
+    def _occupy(
+        self, index: int, vehicle: Vehicle, only_if_free: bool, notify: bool = True
+    ) -> bool:
+        with self._lock:
+            if self._flags[index] & _OCCUPIED:
+                if only_if_free:
+                    return False
+                self._vehicles[index] = vehicle
+                return True
+            self._flags[index] |= _OCCUPIED
+            self._vehicles[index] = vehicle
+            if notify:
+                self.on_spot_parked(CompactParkingSpot(self, index))
+            return True
+
+    def _release(self, index: int, notify: bool = True) -> bool:
+        with self._lock:
+            if not self._flags[index] & _OCCUPIED:
+                return False
+            self._flags[index] &= ~_OCCUPIED
+            self._vehicles.pop(index, None)
+            if notify:
+                self.on_spot_unparked(CompactParkingSpot(self, index))
+            return True
+
+    def _index_free_spot(self, spot: ParkingSpot):
+        index = spot.get_index()
+        if not self._flags[index] & _INDEXED:
+            self._flags[index] |= _INDEXED
+            self._free_stacks[spot.get_spot_size()].append(index)
+
+    def _peek_free_spot(
+        self, size: VehicleSize, spot_filter: Optional[SpotFilter] = None
+    ) -> Optional[ParkingSpot]:
+        self._release_held_spots(size, spot_filter)
+        stack = self._free_stacks[size]
+        skipped = []  # Free indexes a plain filter rejected; restored in the same order
+        found = None
+        while stack:
+            index = stack[-1]
+            if self._flags[index] & _OCCUPIED:
+                stack.pop()
+                self._flags[index] &= ~_INDEXED
+                continue
+            spot = CompactParkingSpot(self, index)
+            if spot_filter is None or spot_filter(spot):
+                found = spot
+                break
+            if isinstance(spot_filter, TimedSpotFilter):
+                # Out of the index until it may pass again (see ParkingFloor)
+                stack.pop()
+                self._flags[index] &= ~_INDEXED
+                self._hold_spot(spot, spot_filter)
+            else:
+                skipped.append(stack.pop())
+        stack.extend(reversed(skipped))
+        return found
@@ -0,0 +1,15 @@
+# Import the Enum class
+from enum import Enum
+
+
+class ConcurrencyMode(Enum):
+    """
+    Controls how the ParkingLot serializes park and unpark requests.
+
+    GLOBAL_LOCK: every request holds one lot-wide lock (simple, fully serialized).
+    FINE_GRAINED: requests only take per-floor locks and a striped ticket-map lock,
+    and claim the chosen spot optimistically, retrying if another gate got there first.
+    """
+
+    GLOBAL_LOCK = 1
+    FINE_GRAINED = 2
@@ -0,0 +1,139 @@
+import json
+import queue
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from parking_event import ParkingEvent
+from typing import Iterable, List, Optional, TextIO
+
+
+class EventSink(ABC):
+    """
+    Abstract destination for ParkingLot events.
+    The lot emits events only after releasing its locks, so a sink's I/O never
+    adds to lock hold time on the admission path.
+    """
+
+    @abstractmethod
+    def emit(self, event: ParkingEvent):
+        pass
+
+    def emit_all(self, events: Iterable[ParkingEvent]):
+        """Emits a batch of events; sinks may override this to do it more cheaply."""
+        for event in events:
+            self.emit(event)
+
+    def close(self):
+        """Releases any resources held by the sink."""
+        pass
+
+
+class NullEventSink(EventSink):
+    """Discards every event."""
+
+    def emit(self, event: ParkingEvent):
+        pass
+
+    def emit_all(self, events: Iterable[ParkingEvent]):
+        pass
+
+
+class ConsoleEventSink(EventSink):
+    """Prints each event as a human-readable line (the lot's original behaviour)."""
+
+    def emit(self, event: ParkingEvent):
+        print(event)
+
+
+class CompositeEventSink(EventSink):
+    """Forwards every event to several sinks, e.g. the console and an analytics sink."""
+
+    def __init__(self, sinks: Iterable[EventSink]):
+        self._sinks = list(sinks)
+
+    def emit(self, event: ParkingEvent):
+        for sink in self._sinks:
+            sink.emit(event)
+
+    def emit_all(self, events: Iterable[ParkingEvent]):
+        events = list(events)
+        for sink in self._sinks:
+            sink.emit_all(events)
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
+
+
+class BufferedEventSink(EventSink):
+    """Keeps events in memory, optionally only the most recent max_events of them."""
+
+    def __init__(self, max_events: Optional[int] = None):
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def emit(self, event: ParkingEvent):
+        with self._lock:
+            self._events.append(event)
+
+    def emit_all(self, events: Iterable[ParkingEvent]):
+        with self._lock:
+            self._events.extend(events)
+
+    def get_events(self) -> List[ParkingEvent]:
+        with self._lock:
+            return list(self._events)
+
+    def drain(self) -> List[ParkingEvent]:
+        """Returns and removes every buffered event."""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+
+class JsonLinesEventSink(EventSink):
+    """
+    Writes each event as one JSON object per line from a background thread.
+    emit only enqueues, so callers never wait on the stream; the writer thread
+    drains whatever has queued up and flushes once per batch.
+    The caller owns the stream and closes it after calling close().
+    """
+
+    _STOP = object()  # Sentinel telling the writer thread to finish
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def emit(self, event: ParkingEvent):
+        self._queue.put(event)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Pick up everything else that is already waiting
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(event is self._STOP for event in batch)
+            lines = [
+                json.dumps(event.to_dict()) + "\n"
+                for event in batch
+                if event is not self._STOP
+            ]
+            if lines:
+                self._stream.writelines(lines)
+                self._stream.flush()
+            if stop:
+                return
+
+    def close(self):
+        """Writes out every queued event and stops the writer thread."""
+        self._queue.put(self._STOP)
+        self._writer.join()
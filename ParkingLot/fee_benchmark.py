@@ -0,0 +1,65 @@
+"""
+Benchmarks end-of-day fee settlement: the scalar calculate_fee loop against the
+batch calculate_fees API, for each fee strategy. Also checks that both paths
+produce identical fees.
+"""
+
+import random
+import time
+import fee_strategy
+from fee_strategy import FlatRateFeeStrategy, VehicleBasedFeeStrategy
+from parking_ticket import ParkingTicket
+from parking_spot import ParkingSpot
+from vehicle_size import VehicleSize
+from bike import Bike
+from car import Car
+from truck import Truck
+
+TICKET_COUNT = 200_000
+
+
+def make_closed_tickets(count: int, seed: int = 7):
+    """Builds closed tickets with random dwell times of up to two days."""
+    rng = random.Random(seed)
+    vehicle_types = [(Bike, VehicleSize.SMALL), (Car, VehicleSize.MEDIUM), (Truck, VehicleSize.LARGE)]
+    spots = {size: ParkingSpot(f"S-{size.name}", size) for size in VehicleSize}
+    tickets = []
+    for index in range(count):
+        vehicle_type, size = rng.choice(vehicle_types)
+        ticket = ParkingTicket(vehicle_type(f"P{index}"), spots[size])
+        ticket.entry_timestamp = rng.randrange(0, 10**9)
+        ticket.exit_timestamp = ticket.entry_timestamp + rng.randrange(0, 2 * 86_400_000)
+        tickets.append(ticket)
+    return tickets
+
+
+def main():
+    backend = "numpy" if fee_strategy.np is not None else "pure Python (numpy not installed)"
+    print(f"Settling {TICKET_COUNT} tickets, batch backend: {backend}")
+    tickets = make_closed_tickets(TICKET_COUNT)
+
+    for strategy in (FlatRateFeeStrategy(), VehicleBasedFeeStrategy()):
+        start = time.perf_counter()
+        scalar = [strategy.calculate_fee(ticket) for ticket in tickets]
+        scalar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = strategy.calculate_fees(tickets)
+        batch_s = time.perf_counter() - start
+
+        columns = strategy.to_columns(tickets)
+        start = time.perf_counter()
+        strategy.calculate_fees_from_columns(*columns)
+        columns_s = time.perf_counter() - start
+
+        if list(batch) != scalar:
+            raise SystemExit(f"{type(strategy).__name__}: batch fees differ from scalar fees")
+        print(
+            f"{type(strategy).__name__:>24}: scalar {TICKET_COUNT / scalar_s:>12,.0f} tickets/s, "
+            f"batch {TICKET_COUNT / batch_s:>12,.0f} tickets/s, "
+            f"pre-columnar {TICKET_COUNT / columns_s:>14,.0f} tickets/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
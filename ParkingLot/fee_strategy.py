@@ -1,7 +1,27 @@
 # Import necessary classes and type hints
 from abc import ABC, abstractmethod
+from array import array
+from operator import attrgetter
 from parking_ticket import ParkingTicket
+from vehicle import Vehicle
 from vehicle_size import VehicleSize
+from clock import Clock, SYSTEM_CLOCK
+from typing import List, Optional, Sequence, Tuple
+
+# NumPy is optional: batch fee computation is vectorized when it is installed
+# and falls back to a plain Python loop otherwise.
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# One hour in the units the fee strategies assume for ticket timestamps
+MS_PER_HOUR = 1000 * 60 * 60
+
+# Column readers for to_columns (plain attribute reads, much cheaper than getters)
+_entry_timestamp = attrgetter("entry_timestamp")
+_exit_timestamp = attrgetter("exit_timestamp")
+_vehicle_size = attrgetter("vehicle.size")
 
 
 class FeeStrategy(ABC):
@@ -11,11 +31,131 @@ class FeeStrategy(ABC):
     changed at runtime in the ParkingLot.
     """
 
+    def __init__(self, clock: Optional[Clock] = None):
+        """The clock prices tickets that are still open (no exit timestamp yet)."""
+        self.clock = clock or SYSTEM_CLOCK
+
+    def _exit_timestamp(self, parking_ticket: ParkingTicket) -> int:
+        """The ticket's exit time, or the clock's current time if it is still open."""
+        return parking_ticket.get_exit_timestamp() or self._clock().now()
+
+    def _clock(self) -> Clock:
+        """The strategy's clock; the system clock for subclasses that skip __init__."""
+        return getattr(self, "clock", SYSTEM_CLOCK)
+
     @abstractmethod
     def calculate_fee(self, parking_ticket: ParkingTicket) -> float:
         """Calculates the parking fee based on the ticket details."""
         pass
 
+    def calculate_fees(self, parking_tickets: Sequence[ParkingTicket]):
+        """
+        Batch version of calculate_fee for end-of-day settlement.
+        Converts the tickets to columns once and computes every fee in one go.
+        Returns a NumPy float array (or an array('d') without NumPy), one fee per
+        ticket, equal to what calculate_fee gives for each ticket.
+        """
+        if not self._has_columnar_fees():
+            # No columnar version that matches calculate_fee: price the real tickets one by one
+            return self._as_fee_array([self.calculate_fee(ticket) for ticket in parking_tickets])
+        entry, exit, size_codes = self.to_columns(parking_tickets)
+        return self.calculate_fees_from_columns(entry, exit, size_codes)
+
+    def _has_columnar_fees(self) -> bool:
+        """
+        True if calculate_fees_from_columns prices exactly like calculate_fee,
+        i.e. both come from the same class. A subclass of a built-in strategy
+        that only overrides calculate_fee would otherwise inherit columns that
+        no longer match it.
+        """
+        for cls in type(self).__mro__:
+            if "calculate_fees_from_columns" in cls.__dict__:
+                return cls is not FeeStrategy and cls.__dict__.get("calculate_fee") is type(
+                    self
+                ).calculate_fee
+        return False
+
+    def calculate_fees_from_columns(self, entry_timestamps, exit_timestamps, size_codes):
+        """
+        Computes fees from columnar data: entry and exit timestamps plus the
+        VehicleSize value of each ticket's vehicle, as equal-length sequences.
+        By default each row is priced by calling calculate_fee on a stand-in
+        ticket, so strategies that only implement calculate_fee keep working;
+        the built-in strategies override it with vectorized code.
+        """
+        return self._as_fee_array(
+            [
+                self.calculate_fee(self._column_ticket(entry, exit, code))
+                for entry, exit, code in zip(entry_timestamps, exit_timestamps, size_codes)
+            ]
+        )
+
+    @staticmethod
+    def _column_ticket(entry_timestamp, exit_timestamp, size_code) -> ParkingTicket:
+        """A closed ticket with just the fields the columns carry (no spot, no plate)."""
+        ticket = ParkingTicket.restore(
+            "", Vehicle("", VehicleSize(int(size_code))), None, int(entry_timestamp)
+        )
+        ticket.exit_timestamp = int(exit_timestamp)
+        return ticket
+
+    @staticmethod
+    def _as_fee_array(fees: List[float]):
+        if np is not None:
+            return np.asarray(fees, dtype=np.float64)
+        return array("d", fees)
+
+    def to_columns(self, parking_tickets: Sequence[ParkingTicket]) -> Tuple:
+        """
+        Splits tickets into entry-timestamp, exit-timestamp and size-code columns
+        in one cheap pass per column: attributes are read directly, and open
+        tickets get the clock's time in one step instead of one read each.
+        """
+        if type(self)._exit_timestamp is not FeeStrategy._exit_timestamp:
+            # A strategy with its own exit rule is asked ticket by ticket
+            exits = [self._exit_timestamp(ticket) for ticket in parking_tickets]
+        else:
+            exits = None
+        if np is not None:
+            count = len(parking_tickets)
+            entry = np.fromiter(map(_entry_timestamp, parking_tickets), dtype=np.int64, count=count)
+            if exits is None:
+                exit = np.fromiter(map(_exit_timestamp, parking_tickets), dtype=np.int64, count=count)
+                still_open = exit == 0
+                if still_open.any():
+                    exit[still_open] = self._clock().now()
+            else:
+                exit = np.asarray(exits, dtype=np.int64)
+            # Compare the sizes by identity: hashing or reading .value per ticket is slow
+            size_ids = np.fromiter(
+                map(id, map(_vehicle_size, parking_tickets)), dtype=np.int64, count=count
+            )
+            size_codes = np.zeros(count, dtype=np.int8)
+            for size in VehicleSize:
+                size_codes[size_ids == id(size)] = size.value
+            return entry, exit, size_codes
+
+        entry = array("q", map(_entry_timestamp, parking_tickets))
+        if exits is None:
+            now = self._clock().now()
+            exits = [timestamp or now for timestamp in map(_exit_timestamp, parking_tickets)]
+        exit = array("q", exits)
+        size_codes = array("b", (size.value for size in map(_vehicle_size, parking_tickets)))
+        return entry, exit, size_codes
+
+    @staticmethod
+    def _billable_hours(entry_timestamps, exit_timestamps):
+        """Hours parked, always rounded up to the next hour (same rule as calculate_fee)."""
+        if np is not None:
+            duration_ms = np.asarray(exit_timestamps, dtype=np.int64) - np.asarray(
+                entry_timestamps, dtype=np.int64
+            )
+            return duration_ms // MS_PER_HOUR + 1
+        return [
+            (exit - entry) // MS_PER_HOUR + 1
+            for entry, exit in zip(entry_timestamps, exit_timestamps)
+        ]
+
 
 class FlatRateFeeStrategy(FeeStrategy):
     """A concrete strategy that charges a single flat rate per hour for all vehicles."""
@@ -30,12 +170,18 @@ class FlatRateFeeStrategy(FeeStrategy):
         """
         # Calculate duration in milliseconds
         duration_ms = (
-            parking_ticket.get_exit_timestamp() - parking_ticket.get_entry_timestamp()
+            self._exit_timestamp(parking_ticket) - parking_ticket.get_entry_timestamp()
         )
         # Convert duration to hours, always rounding up to the next hour
-        hours = (duration_ms // (1000 * 60 * 60)) + 1
+        hours = (duration_ms // MS_PER_HOUR) + 1
         return hours * self.RATE_PER_HOUR
 
+    def calculate_fees_from_columns(self, entry_timestamps, exit_timestamps, size_codes):
+        hours = self._billable_hours(entry_timestamps, exit_timestamps)
+        if np is not None:
+            return hours * self.RATE_PER_HOUR
+        return array("d", (hour * self.RATE_PER_HOUR for hour in hours))
+
 
 class VehicleBasedFeeStrategy(FeeStrategy):
     """A concrete strategy that charges different hourly rates based on vehicle size."""
@@ -54,11 +200,24 @@ class VehicleBasedFeeStrategy(FeeStrategy):
         """
         # Calculate duration in milliseconds
         duration_ms = (
-            parking_ticket.get_exit_timestamp() - parking_ticket.get_entry_timestamp()
+            self._exit_timestamp(parking_ticket) - parking_ticket.get_entry_timestamp()
         )
         # Convert duration to hours, always rounding up
-        hours = (duration_ms // (1000 * 60 * 60)) + 1
+        hours = (duration_ms // MS_PER_HOUR) + 1
 
         # Get the vehicle from the ticket, then its size, and use it to look up the correct rate
         vehicle_size = parking_ticket.get_vehicle().get_size()
         return hours * self.HOURLY_RATES[vehicle_size]
+
+    def calculate_fees_from_columns(self, entry_timestamps, exit_timestamps, size_codes):
+        hours = self._billable_hours(entry_timestamps, exit_timestamps)
+        # Rate lookup table indexed by VehicleSize value
+        rate_table = [0.0] * (max(size.value for size in VehicleSize) + 1)
+        for size, rate in self.HOURLY_RATES.items():
+            rate_table[size.value] = rate
+
+        if np is not None:
+            return hours * np.asarray(rate_table)[np.asarray(size_codes)]
+        return array(
+            "d", (hour * rate_table[code] for hour, code in zip(hours, size_codes))
+        )
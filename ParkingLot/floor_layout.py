@@ -0,0 +1,36 @@
+"""
+Helpers for describing a parking lot's physical layout as plain data, so it can
+be written to disk (journal snapshots) or sent to another process.
+"""
+
+from parking_floor import ParkingFloor
+from compact_parking_floor import CompactParkingFloor
+from vehicle import Vehicle
+from bike import Bike
+from car import Car
+from truck import Truck
+from vehicle_size import VehicleSize
+from typing import Dict, Optional
+
+# Concrete vehicle classes by name, used to rebuild vehicles from stored records
+VEHICLE_TYPES = {cls.__name__: cls for cls in (Bike, Car, Truck)}
+
+
+def build_floor(
+    layout: dict, parked: Optional[Dict[str, Vehicle]] = None
+) -> ParkingFloor:
+    """
+    Builds a floor of the right kind from ParkingFloor.to_layout output,
+    optionally with vehicles already parked in the given spots.
+    """
+    if layout.get("compact"):
+        return CompactParkingFloor.from_layout(layout, parked)
+    return ParkingFloor.from_layout(layout, parked)
+
+
+def build_vehicle(type_name: str, license_number: str, size_value: int) -> Vehicle:
+    """Rebuilds a vehicle from its class name, falling back to a plain Vehicle of that size."""
+    vehicle_type = VEHICLE_TYPES.get(type_name)
+    if vehicle_type is not None:
+        return vehicle_type(license_number)
+    return Vehicle(license_number, VehicleSize(size_value))
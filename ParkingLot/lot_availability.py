@@ -0,0 +1,69 @@
+import threading
+from availability_observer import AvailabilityObserver
+from vehicle_size import VehicleSize
+from typing import Dict, Iterable, Iterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from parking_floor import ParkingFloor
+
+
+class LotAvailability(AvailabilityObserver):
+    """
+    A compact lot-wide availability summary.
+    For every VehicleSize it keeps an integer bitmask where bit i is set when
+    floor i (in the order floors were added) has at least one free spot of that size.
+    Strategies use it to jump straight to a qualifying floor instead of probing each one.
+    """
+
+    def __init__(self):
+        self._masks: Dict[VehicleSize, int] = {size: 0 for size in VehicleSize}
+        self._floor_index: Dict[int, int] = {}  # id(floor) -> bit position
+        self._lock = threading.Lock()
+
+    def add_floor(self, floor: "ParkingFloor"):
+        """Assigns the next bit position to a floor and starts observing it."""
+        with self._lock:
+            self._floor_index[id(floor)] = len(self._floor_index)
+        floor.add_observer(self)
+        for size in VehicleSize:
+            self.on_availability_changed(floor, size, floor.get_free_count(size))
+
+    def get_floor_count(self) -> int:
+        return len(self._floor_index)
+
+    def on_availability_changed(
+        self, floor: "ParkingFloor", size: VehicleSize, free_count: int
+    ):
+        bit = 1 << self._floor_index[id(floor)]
+        with self._lock:
+            if free_count > 0:
+                self._masks[size] |= bit
+            else:
+                self._masks[size] &= ~bit
+
+    def has_free(self, size: VehicleSize) -> bool:
+        return self._masks[size] != 0
+
+    def floors_with(self, size: VehicleSize, descending: bool = False) -> Iterator[int]:
+        """Yields the indexes of floors with a free spot of this size, nearest first by default."""
+        return self._floors_in(self._masks[size], descending)
+
+    def floors_with_any(
+        self, sizes: Iterable[VehicleSize], descending: bool = False
+    ) -> Iterator[int]:
+        """Yields the indexes of floors with a free spot of at least one of these sizes."""
+        mask = 0
+        for size in sizes:
+            mask |= self._masks[size]
+        return self._floors_in(mask, descending)
+
+    @staticmethod
+    def _floors_in(mask: int, descending: bool) -> Iterator[int]:
+        # mask is a snapshot; callers re-check the floor itself
+        while mask:
+            if descending:
+                index = mask.bit_length() - 1
+            else:
+                index = (mask & -mask).bit_length() - 1
+            mask &= ~(1 << index)
+            yield index
@@ -0,0 +1,178 @@
+"""
+Occupancy analytics over closed parking tickets.
+
+OccupancyAnalytics is an EventSink: every UNPARKED event adds the closed
+ticket to a columnar ring buffer (TicketHistory) and folds it into per-hour
+aggregates, so dashboards can ask for hourly occupancy, turnover and average
+dwell per floor and size without rescanning raw tickets.
+"""
+
+import threading
+from array import array
+from event_sink import EventSink
+from parking_event import ParkingEvent, ParkingEventType
+from vehicle_size import VehicleSize
+from typing import Dict, List, Optional, Tuple
+
+MS_PER_HOUR = 60 * 60 * 1000
+
+# Aggregate key: (floor number or None, VehicleSize value or None); None means "all"
+AggregateKey = Tuple[Optional[int], Optional[int]]
+
+
+class TicketHistory:
+    """
+    A fixed-capacity ring buffer of closed tickets, stored column by column
+    (entry time, exit time, floor, size, fee) in typed arrays.
+    Once full, each new ticket overwrites the oldest one.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entry = array("q", bytes(8 * capacity))
+        self._exit = array("q", bytes(8 * capacity))
+        self._floor = array("i", bytes(4 * capacity))
+        self._size = array("b", bytes(capacity))
+        self._fee = array("d", bytes(8 * capacity))
+        self._next = 0  # Slot the next ticket is written to
+        self._count = 0
+
+    def append(self, entry: int, exit: int, floor: int, size: int, fee: float):
+        slot = self._next
+        self._entry[slot] = entry
+        self._exit[slot] = exit
+        self._floor[slot] = floor
+        self._size[slot] = size
+        self._fee[slot] = fee
+        self._next = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def columns(self) -> Dict[str, array]:
+        """Returns copies of the columns, oldest ticket first."""
+        start = (self._next - self._count) % self.capacity
+        order = list(range(start, self.capacity)) + list(range(0, start))
+        order = order[: self._count]
+        return {
+            "entry": array("q", (self._entry[i] for i in order)),
+            "exit": array("q", (self._exit[i] for i in order)),
+            "floor": array("i", (self._floor[i] for i in order)),
+            "size": array("b", (self._size[i] for i in order)),
+            "fee": array("d", (self._fee[i] for i in order)),
+        }
+
+
+class HourlyStats:
+    """Aggregated figures for one hour, for one floor/size selection."""
+
+    def __init__(self, hour_start: int, departures: int, dwell_ms: int, occupied_ms: int):
+        self.hour_start = hour_start  # Timestamp (ms) of the start of the hour
+        self.departures = departures  # Turnover: tickets closed during the hour
+        self.dwell_ms = dwell_ms  # Total dwell of those tickets
+        self.occupied_ms = occupied_ms  # Spot-milliseconds occupied during the hour
+
+    def get_average_dwell(self) -> float:
+        """Average dwell, in milliseconds, of the tickets closed during the hour."""
+        return self.dwell_ms / self.departures if self.departures else 0.0
+
+    def get_average_occupancy(self) -> float:
+        """Average number of occupied spots over the hour (closed tickets only)."""
+        return self.occupied_ms / MS_PER_HOUR
+
+
+class OccupancyAnalytics(EventSink):
+    """
+    Incrementally maintained occupancy statistics, bucketed by hour.
+    For each hour it keeps [departures, dwell ms, occupied spot-ms] for
+    every (floor, size) pair and also pre-rolled totals per floor, per size and
+    for the whole lot, so any query reads one entry per hour.
+    Hours older than retention_hours (counted back from the newest hour seen)
+    are dropped.
+    """
+
+    DEFAULT_RETENTION_HOURS = 35 * 24
+    DEFAULT_HISTORY_CAPACITY = 1_000_000
+
+    def __init__(
+        self,
+        retention_hours: int = DEFAULT_RETENTION_HOURS,
+        history_capacity: int = DEFAULT_HISTORY_CAPACITY,
+    ):
+        self.retention_hours = retention_hours
+        self.history = TicketHistory(history_capacity)
+        self._buckets: Dict[int, Dict[AggregateKey, List[int]]] = {}
+        self._newest_hour = 0
+        self._lock = threading.Lock()
+
+    def emit(self, event: ParkingEvent):
+        if event.get_event_type() != ParkingEventType.UNPARKED:
+            return
+        ticket = event.get_ticket()
+        floor = ticket.get_spot().get_floor()
+        self.record(
+            ticket.get_entry_timestamp(),
+            ticket.get_exit_timestamp(),
+            floor.floor_number if floor is not None else -1,
+            ticket.get_vehicle().get_size(),
+            event.get_fee() or 0.0,
+        )
+
+    def record(self, entry: int, exit: int, floor: int, size: VehicleSize, fee: float):
+        """Adds one closed ticket to the history and the hourly aggregates."""
+        keys = ((floor, size.value), (floor, None), (None, size.value), (None, None))
+        with self._lock:
+            self.history.append(entry, exit, floor, size.value, fee)
+
+            # The departure (turnover and dwell) counts in the hour the car left
+            exit_hour = exit // MS_PER_HOUR
+            for key in keys:
+                totals = self._bucket(exit_hour, key)
+                totals[0] += 1
+                totals[1] += exit - entry
+
+            # Occupied time is spread over every hour the stay overlaps
+            for hour in range(entry // MS_PER_HOUR, exit_hour + 1):
+                hour_start = hour * MS_PER_HOUR
+                overlap = min(exit, hour_start + MS_PER_HOUR) - max(entry, hour_start)
+                if overlap > 0:
+                    for key in keys:
+                        self._bucket(hour, key)[2] += overlap
+
+            if exit_hour > self._newest_hour:
+                self._newest_hour = exit_hour
+                self._evict()
+
+    def query(
+        self,
+        start: int,
+        end: int,
+        floor: Optional[int] = None,
+        size: Optional[VehicleSize] = None,
+    ) -> List[HourlyStats]:
+        """
+        Returns one HourlyStats per hour in [start, end) (timestamps in ms),
+        optionally restricted to one floor and/or one vehicle size.
+        """
+        key = (floor, size.value if size is not None else None)
+        stats = []
+        with self._lock:
+            for hour in range(start // MS_PER_HOUR, -(-end // MS_PER_HOUR)):
+                totals = self._buckets.get(hour, {}).get(key, (0, 0, 0))
+                stats.append(HourlyStats(hour * MS_PER_HOUR, *totals))
+        return stats
+
+    def _bucket(self, hour: int, key: AggregateKey) -> List[int]:
+        per_key = self._buckets.get(hour)
+        if per_key is None:
+            per_key = self._buckets[hour] = {}
+        totals = per_key.get(key)
+        if totals is None:
+            totals = per_key[key] = [0, 0, 0]
+        return totals
+
+    def _evict(self):
+        oldest_kept = self._newest_hour - self.retention_hours
+        for hour in [hour for hour in self._buckets if hour < oldest_kept]:
+            del self._buckets[hour]
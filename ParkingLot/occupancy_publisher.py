@@ -0,0 +1,148 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from availability_observer import AvailabilityObserver
+from coalescing_buffer import CoalescingBuffer
+from vehicle_size import VehicleSize
+from typing import Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from parking_floor import ParkingFloor
+
+logger = logging.getLogger(__name__)
+
+
+class OccupancyListener(ABC):
+    """
+    Interface for anything that shows live free counts, e.g. a floor sign.
+    Called from the publisher's thread, never from the park/unpark path.
+    """
+
+    @abstractmethod
+    def on_occupancy(self, floor_number: int, free_counts: Dict[VehicleSize, int]):
+        pass
+
+
+class OccupancyPublisher(AvailabilityObserver):
+    """
+    Pushes per-floor free counts to listeners, at most once per floor every
+    interval_ms. The park path only records its new count in a CoalescingBuffer
+    (O(1), no scan, no listener calls); a background thread takes the latest
+    counts and fans them out, so a burst of parks becomes one push, and a park
+    undone by an unpark before the push pushes nothing.
+    """
+
+    DEFAULT_INTERVAL_MS = 250
+
+    def __init__(self, interval_ms: int = DEFAULT_INTERVAL_MS):
+        self._interval_s = interval_ms / 1000
+        self._listeners: List[OccupancyListener] = []  # Replaced, never mutated
+        self._floors: List["ParkingFloor"] = []
+        self._changes = CoalescingBuffer()  # (floor number, size) -> free count
+        # Counts each floor last pushed, i.e. what every listener is showing
+        self._shown: Dict[int, Dict[VehicleSize, int]] = {}
+        # Subscribed but not yet sent the current counts; the publisher thread
+        # welcomes them right after its next push
+        self._joining: List[OccupancyListener] = []
+        self._lock = threading.Lock()
+        # Held while pushing (and by detach), so the shown counts are never
+        # cleared in the middle of a push
+        self._push_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._pusher = threading.Thread(target=self._run, daemon=True)
+        self._pusher.start()
+
+    def observe(self, floor: "ParkingFloor"):
+        """Starts publishing a floor's counts; current listeners get them on the next push."""
+        with self._lock:
+            self._floors.append(floor)
+        floor.add_observer(self, replay=True)
+
+    def detach(self):
+        """Stops observing every floor (listeners stay subscribed)."""
+        with self._lock:
+            floors, self._floors = self._floors, []
+        for floor in floors:
+            floor.remove_observer(self)
+        with self._push_lock:
+            self._changes.clear()
+            self._shown.clear()
+
+    def subscribe(self, listener: OccupancyListener):
+        """
+        Adds a listener. Like every other call it gets, its first one (the
+        current counts of every floor) comes from the publisher thread: right
+        after the next push, so it starts from exactly what the others show.
+        """
+        with self._lock:
+            self._joining = self._joining + [listener]
+        self._wake.set()
+
+    def unsubscribe(self, listener: OccupancyListener):
+        with self._lock:
+            self._listeners = [l for l in self._listeners if l is not listener]
+            self._joining = [l for l in self._joining if l is not listener]
+
+    def get_listener_count(self) -> int:
+        with self._lock:
+            return len(self._listeners) + len(self._joining)
+
+    def on_availability_changed(
+        self, floor: "ParkingFloor", size: VehicleSize, free_count: int
+    ):
+        # Recorded even with no listeners, so a later subscriber starts from the live counts
+        if self._changes.put((floor.floor_number, size), free_count):
+            self._wake.set()
+
+    def close(self):
+        """Stops the publisher thread and stops observing the floors."""
+        self._stopped.set()
+        self._wake.set()
+        self._pusher.join()
+        self.detach()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if self._stopped.is_set():
+                return
+            self._wake.clear()
+            with self._push_lock:
+                self._push()
+                self._welcome()
+            # Changes made while waiting out the interval are coalesced into the next push
+            if self._stopped.wait(self._interval_s):
+                return
+
+    def _push(self):
+        """Pushes every floor whose counts changed since its last push. Holds the push lock."""
+        changed: Dict[int, None] = {}  # Floor numbers, in the order they changed
+        for (floor_number, size), free_count in self._changes.take():
+            self._shown.setdefault(floor_number, {})[size] = free_count
+            changed[floor_number] = None
+        listeners = self._listeners
+        for floor_number in changed:
+            counts = dict(self._shown[floor_number])
+            for listener in listeners:
+                self._deliver(listener, floor_number, counts)
+
+    def _welcome(self):
+        """Sends new listeners every floor's shown counts, then adds them. Holds the push lock."""
+        with self._lock:
+            joining, self._joining = self._joining, []
+        if not joining:
+            return
+        for listener in joining:
+            for floor_number, counts in self._shown.items():
+                self._deliver(listener, floor_number, dict(counts))
+        with self._lock:
+            self._listeners = self._listeners + joining
+
+    @staticmethod
+    def _deliver(listener: OccupancyListener, floor_number: int, counts: Dict[VehicleSize, int]):
+        # A failing sign must not stop the others, nor the publisher thread
+        try:
+            listener.on_occupancy(floor_number, counts)
+        except Exception:
+            logger.exception("Occupancy listener %r failed on floor %s", listener, floor_number)
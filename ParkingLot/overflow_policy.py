@@ -0,0 +1,57 @@
+# Import necessary classes and type hints
+from vehicle_size import VehicleSize
+from typing import Dict, List, Optional, Tuple
+
+
+class OverflowPolicy:
+    """
+    Lets a vehicle take a larger spot when no spot of its own size is free.
+    Each allowed (vehicle size, spot size) pair has a cost; an exact match costs
+    nothing, and strategies prefer the cheapest spot that fits.
+    With rebalance on, the lot moves an overflowed vehicle back to a spot of
+    its own size as soon as one frees up, so the larger spot is available again.
+    """
+
+    def __init__(
+        self,
+        costs: Optional[Dict[Tuple[VehicleSize, VehicleSize], float]] = None,
+        rebalance: bool = True,
+    ):
+        """
+        costs maps (vehicle size, larger spot size) to the cost of that
+        assignment; pairs that are missing are not allowed. By default every
+        larger spot is allowed at one unit per size step.
+        """
+        if costs is None:
+            costs = {
+                (vehicle_size, spot_size): spot_size.value - vehicle_size.value
+                for vehicle_size in VehicleSize
+                for spot_size in VehicleSize
+                if spot_size.value > vehicle_size.value
+            }
+        for (vehicle_size, spot_size), cost in costs.items():
+            if spot_size.value <= vehicle_size.value:
+                raise ValueError("Overflow is only allowed into larger spots.")
+            if cost < 0:
+                raise ValueError("Overflow costs cannot be negative.")
+        self._costs = dict(costs)
+        self.rebalance = rebalance
+        # Spot sizes each vehicle size may use, own size first, then cheapest first
+        self._candidates: Dict[VehicleSize, List[VehicleSize]] = {
+            vehicle_size: [vehicle_size]
+            + sorted(
+                (spot_size for (v, spot_size) in self._costs if v == vehicle_size),
+                key=lambda spot_size: (self._costs[(vehicle_size, spot_size)], spot_size.value),
+            )
+            for vehicle_size in VehicleSize
+        }
+
+    def get_candidate_sizes(self, vehicle_size: VehicleSize) -> List[VehicleSize]:
+        """The spot sizes a vehicle may use, cheapest first (its own size is always first)."""
+        return self._candidates[vehicle_size]
+
+    def get_cost(self, vehicle_size: VehicleSize, spot_size: VehicleSize) -> Optional[float]:
+        """The cost of putting a vehicle in a spot, or None if it is not allowed."""
+        if vehicle_size == spot_size:
+            return 0
+        return self._costs.get((vehicle_size, spot_size))
@@ -0,0 +1,77 @@
+from enum import Enum
+from parking_ticket import ParkingTicket
+from clock import SYSTEM_CLOCK
+from typing import Optional
+
+
+class ParkingEventType(Enum):
+    """The kinds of events a ParkingLot reports to its event sink."""
+
+    PARKED = "PARKED"
+    UNPARKED = "UNPARKED"
+    NO_SPOT = "NO_SPOT"
+    TICKET_NOT_FOUND = "TICKET_NOT_FOUND"
+    MOVED = "MOVED"  # An overflowed vehicle was reassigned to a spot of its own size
+
+
+class ParkingEvent:
+    """A single structured event from the parking lot's park/unpark path."""
+
+    def __init__(
+        self,
+        event_type: ParkingEventType,
+        license_number: str,
+        ticket: Optional[ParkingTicket] = None,
+        fee: Optional[float] = None,
+        timestamp: Optional[int] = None,
+    ):
+        self.event_type = event_type
+        self.license_number = license_number
+        self.ticket = ticket  # Set for PARKED, UNPARKED and MOVED events
+        self.fee = fee  # Set for UNPARKED events
+        # When the event happened, in ms since the epoch
+        self.timestamp = SYSTEM_CLOCK.now() if timestamp is None else timestamp
+
+    def get_event_type(self) -> ParkingEventType:
+        return self.event_type
+
+    def get_license_number(self) -> str:
+        return self.license_number
+
+    def get_ticket(self) -> Optional[ParkingTicket]:
+        return self.ticket
+
+    def get_fee(self) -> Optional[float]:
+        return self.fee
+
+    def get_timestamp(self) -> int:
+        return self.timestamp
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable representation of the event."""
+        data = {
+            "event": self.event_type.value,
+            "license_number": self.license_number,
+            "timestamp": self.timestamp,
+        }
+        if self.ticket is not None:
+            spot = self.ticket.get_spot()
+            data["ticket_id"] = self.ticket.get_ticket_id()
+            data["spot_id"] = spot.get_spot_id()
+            if spot.get_floor() is not None:
+                data["floor"] = spot.get_floor().floor_number
+        if self.fee is not None:
+            data["fee"] = self.fee
+        return data
+
+    def __str__(self) -> str:
+        """The human-readable message the lot used to print for this event."""
+        if self.event_type == ParkingEventType.PARKED:
+            return f"Vehicle {self.license_number} parked at spot {self.ticket.get_spot().get_spot_id()}"
+        if self.event_type == ParkingEventType.UNPARKED:
+            return f"Vehicle {self.license_number} unparked from spot {self.ticket.get_spot().get_spot_id()}"
+        if self.event_type == ParkingEventType.MOVED:
+            return f"Vehicle {self.license_number} moved to spot {self.ticket.get_spot().get_spot_id()}"
+        if self.event_type == ParkingEventType.NO_SPOT:
+            return f"No available spot for vehicle {self.license_number}"
+        return f"Ticket not found for vehicle {self.license_number}"
@@ -1,10 +1,43 @@
 # Import necessary classes and type hints
+import heapq
+import itertools
 import threading
+from abc import ABC, abstractmethod
+from availability_observer import AvailabilityObserver
 from parking_spot import ParkingSpot
 from vehicle import Vehicle
 from vehicle_size import VehicleSize
-from typing import Dict, Optional, List
-from collections import defaultdict
+from typing import Callable, Dict, Iterable, Optional, List, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from overflow_policy import OverflowPolicy
+
+# Optional predicate a free spot must also pass, e.g. to skip spots reserved soon
+SpotFilter = Callable[[ParkingSpot], bool]
+
+_OPEN_END = float("inf")
+
+
+class TimedSpotFilter(ABC):
+    """
+    A spot filter whose verdict on a spot only changes as time passes (or when
+    the floor is told otherwise), e.g. "no booking starts within the hour" for
+    walk-ins. A floor moves the spots it rejects out of its free-spot index
+    until available_from(spot), instead of skipping them on every lookup;
+    ParkingFloor.recheck_spot puts one back early (e.g. a booking was cancelled).
+    """
+
+    def __init__(self, now_ms: int):
+        self.now_ms = now_ms
+
+    @abstractmethod
+    def __call__(self, spot: ParkingSpot) -> bool:
+        pass
+
+    @abstractmethod
+    def available_from(self, spot: ParkingSpot) -> float:
+        """The earliest time (ms) at which the spot could pass this kind of filter."""
+        pass
 
 
 class ParkingFloor:
@@ -16,42 +49,292 @@ class ParkingFloor:
         self.spots: Dict[str, ParkingSpot] = (
             {}
         )  # A dictionary to hold spots, keyed by spot ID
-        self._lock = threading.Lock()
+        # Free-spot index: one min-heap per size, keyed by the order spots were added.
+        # Occupied spots are dropped lazily when they reach the top of a heap.
+        self._free_spots: Dict[VehicleSize, List[Tuple[int, ParkingSpot]]] = {
+            size: [] for size in VehicleSize
+        }
+        self._indexed_spot_ids: Set[str] = set()  # Spot IDs currently held in a heap
+        self._free_counts: Dict[VehicleSize, int] = {size: 0 for size in VehicleSize}
+        self._spot_order: Dict[str, int] = {}
+        # Free spots a TimedSpotFilter rejected, kept out of the index until
+        # they may pass again: one min-heap of (available from, seq, spot) per size
+        self._held_spots: Dict[VehicleSize, List[Tuple[float, int, ParkingSpot]]] = {
+            size: [] for size in VehicleSize
+        }
+        self._hold_order = itertools.count()
+        self._observers: List[AvailabilityObserver] = []
+        # Re-entrant, because parking a spot from inside the floor calls back into it
+        self._lock = threading.RLock()
 
     def add_spot(self, spot: ParkingSpot):
         """Adds a parking spot to this floor."""
-        self.spots[spot.get_spot_id()] = spot
+        with self._lock:
+            spot_id = spot.get_spot_id()
+            self.spots[spot_id] = spot
+            self._spot_order.setdefault(spot_id, len(self._spot_order))
+            spot.set_floor(self)
+            if not spot.is_occupied_spot():
+                self._free_counts[spot.get_spot_size()] += 1
+                self._index_free_spot(spot)
+                self._notify_observers(spot.get_spot_size())
 
-    def find_available_spot(self, vehicle: Vehicle) -> Optional[ParkingSpot]:
+    def add_spots(self, spots: Iterable[ParkingSpot]):
+        """
+        Adds many spots at once (e.g. when rebuilding a floor), building the
+        free-spot heaps in one pass instead of pushing spot by spot.
+        """
+        with self._lock:
+            touched: Set[VehicleSize] = set()
+            for spot in spots:
+                spot_id = spot.get_spot_id()
+                self.spots[spot_id] = spot
+                self._spot_order.setdefault(spot_id, len(self._spot_order))
+                spot.set_floor(self)
+                if not spot.is_occupied_spot() and spot_id not in self._indexed_spot_ids:
+                    size = spot.get_spot_size()
+                    self._free_counts[size] += 1
+                    self._indexed_spot_ids.add(spot_id)
+                    self._free_spots[size].append((self._spot_order[spot_id], spot))
+                    touched.add(size)
+            for size in touched:
+                heapq.heapify(self._free_spots[size])
+                self._notify_observers(size)
+
+    def add_observer(self, observer: AvailabilityObserver, replay: bool = False):
+        """
+        Subscribes an observer to changes in this floor's free-spot counters.
+        With replay, the observer is first told every size's current count, in
+        order with any change made concurrently.
+        """
+        with self._lock:
+            self._observers.append(observer)
+            if replay:
+                for size in VehicleSize:
+                    observer.on_availability_changed(self, size, self._free_counts[size])
+
+    def remove_observer(self, observer: AvailabilityObserver):
+        with self._lock:
+            self._observers.remove(observer)
+
+    def find_available_spot(
+        self,
+        vehicle: Vehicle,
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional["OverflowPolicy"] = None,
+    ) -> Optional[ParkingSpot]:
         """
         Finds the best-fitting available spot for a vehicle on this floor.
         It prioritizes the smallest possible spot that the vehicle can fit in.
+        If spot_filter is given, only spots it accepts are considered.
+        With an overflow policy, larger spots are tried cheapest first when no
+        spot of the vehicle's own size is free: one heap peek per size.
         """
-        # Filter for spots that are not occupied and can fit the vehicle
         with self._lock:
-            available_spots = [
-                spot
-                for spot in self.spots.values()
-                if not spot.is_occupied_spot() and spot.can_fit_vehicle(vehicle)
-            ]
+            if overflow is None:
+                # Spots only fit vehicles of their own size, so one heap holds every candidate
+                return self._peek_free_spot(vehicle.get_size(), spot_filter)
+            for size in overflow.get_candidate_sizes(vehicle.get_size()):
+                spot = self._peek_free_spot(size, spot_filter)
+                if spot is not None:
+                    return spot
+            return None
 
-            if available_spots:
-                # Sort the fitting spots by size (SMALL -> MEDIUM -> LARGE) to find the "best fit"
-                available_spots.sort(key=lambda x: x.get_spot_size().value)
-                return available_spots[0]  # Return the smallest fitting spot
+    def find_free_spot_of_size(
+        self, size: VehicleSize, spot_filter: Optional[SpotFilter] = None
+    ) -> Optional[ParkingSpot]:
+        """Returns the first free spot of exactly this size, or None."""
+        with self._lock:
+            return self._peek_free_spot(size, spot_filter)
 
-            return None  # Return None if no suitable spot is found on this floor
+    def claim_available_spots(
+        self,
+        vehicles: List[Vehicle],
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional["OverflowPolicy"] = None,
+        spot_size: Optional[VehicleSize] = None,
+    ) -> List[ParkingSpot]:
+        """
+        Claims free spots for a batch of vehicles under one lock acquisition.
+        Vehicles are served in order until the floor runs out of fitting spots;
+        returns the claimed spots, one per served vehicle.
+        With spot_size (e.g. the size a strategy picked lot-wide), only spots of
+        exactly that size are claimed, so the floor never hands out a costlier
+        size that is still free elsewhere.
+        The counters are updated, and observers told, once per size per batch.
+        """
+        claimed: List[ParkingSpot] = []
+        taken: Dict[VehicleSize, int] = {}
+        with self._lock:
+            while len(claimed) < len(vehicles):
+                vehicle = vehicles[len(claimed)]
+                if spot_size is not None:
+                    spot = self._peek_free_spot(spot_size, spot_filter)
+                else:
+                    spot = self.find_available_spot(vehicle, spot_filter, overflow)
+                if spot is None:
+                    break
+                # Only fails if a single-vehicle park raced us; just look again
+                if self._occupy_quietly(spot, vehicle):
+                    claimed.append(spot)
+                    size = spot.get_spot_size()
+                    taken[size] = taken.get(size, 0) + 1
+            for size, count in taken.items():
+                self._free_counts[size] -= count
+                self._notify_observers(size)
+        return claimed
 
-    def display_availability(self):
-        """Prints a summary of available spots on this floor, grouped by size."""
-        print(f"--- Floor {self.floor_number} Availability ---")
-        # Use defaultdict to easily count available spots of each size
-        available_counts = defaultdict(int)
+    def release_spots(self, spots: Iterable[ParkingSpot]):
+        """
+        Frees a batch of this floor's spots under one lock acquisition,
+        updating the counters and telling observers once per size.
+        """
+        freed: Dict[VehicleSize, int] = {}
+        with self._lock:
+            for spot in spots:
+                if self._release_quietly(spot):
+                    self._index_free_spot(spot)
+                    size = spot.get_spot_size()
+                    freed[size] = freed.get(size, 0) + 1
+            for size, count in freed.items():
+                self._free_counts[size] += count
+                self._notify_observers(size)
+
+    def _occupy_quietly(self, spot: ParkingSpot, vehicle: Vehicle) -> bool:
+        """Claims a spot without the per-spot floor callback; the caller holds the lock."""
+        return spot.try_claim(vehicle, notify_floor=False)
+
+    def _release_quietly(self, spot: ParkingSpot) -> bool:
+        """Frees a spot without the per-spot floor callback; the caller holds the lock."""
+        return spot.unpark_vehicle(notify_floor=False)
+
+    def get_free_count(self, size: VehicleSize) -> int:
+        """Returns the number of free spots of the given size on this floor."""
+        return self._free_counts[size]
+
+    def on_spot_parked(self, spot: ParkingSpot):
+        """Called by a spot on this floor when it becomes occupied."""
+        with self._lock:
+            self._free_counts[spot.get_spot_size()] -= 1
+            self._notify_observers(spot.get_spot_size())
+
+    def on_spot_unparked(self, spot: ParkingSpot):
+        """Called by a spot on this floor when it becomes free again."""
+        with self._lock:
+            self._free_counts[spot.get_spot_size()] += 1
+            self._index_free_spot(spot)
+            self._notify_observers(spot.get_spot_size())
+
+    def _notify_observers(self, size: VehicleSize):
+        for observer in self._observers:
+            observer.on_availability_changed(self, size, self._free_counts[size])
+
+    def _index_free_spot(self, spot: ParkingSpot):
+        """Pushes a free spot onto its size heap unless a stale entry is still there."""
+        spot_id = spot.get_spot_id()
+        if spot_id not in self._indexed_spot_ids:
+            self._indexed_spot_ids.add(spot_id)
+            heapq.heappush(
+                self._free_spots[spot.get_spot_size()],
+                (self._spot_order[spot_id], spot),
+            )
+
+    def _peek_free_spot(
+        self, size: VehicleSize, spot_filter: Optional[SpotFilter] = None
+    ) -> Optional[ParkingSpot]:
+        """
+        Returns the first free spot of a size, discarding occupied entries on the
+        way. Spots a TimedSpotFilter rejects leave the index until they may pass
+        again, so later lookups do not walk past them.
+        """
+        self._release_held_spots(size, spot_filter)
+        heap = self._free_spots[size]
+        skipped = []  # Free spots a plain filter rejected; they go back on the heap
+        found = None
+        while heap:
+            spot = heap[0][1]
+            if spot.is_occupied_spot():
+                heapq.heappop(heap)
+                self._indexed_spot_ids.discard(spot.get_spot_id())
+            elif spot_filter is None or spot_filter(spot):
+                found = spot
+                break
+            elif isinstance(spot_filter, TimedSpotFilter):
+                heapq.heappop(heap)
+                self._indexed_spot_ids.discard(spot.get_spot_id())
+                self._hold_spot(spot, spot_filter)
+            else:
+                skipped.append(heapq.heappop(heap))
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return found
+
+    def recheck_spot(self, spot_id: str):
+        """
+        Puts a free spot held back by a TimedSpotFilter into the index again now,
+        e.g. once the booking that kept walk-ins away is cancelled.
+        """
+        with self._lock:
+            spot = self.spots.get(spot_id)
+            if spot is not None and not spot.is_occupied_spot():
+                self._index_free_spot(spot)
+
+    def _hold_spot(self, spot: ParkingSpot, spot_filter: TimedSpotFilter):
+        """Keeps a free spot out of the index until the filter may accept it."""
+        heapq.heappush(
+            self._held_spots[spot.get_spot_size()],
+            (spot_filter.available_from(spot), next(self._hold_order), spot),
+        )
 
-        for spot in self.spots.values():
+    def _release_held_spots(self, size: VehicleSize, spot_filter: Optional[SpotFilter]):
+        """
+        Re-indexes the held spots of a size that a lookup must see: the ones due
+        by a TimedSpotFilter's time, and all of them for any other filter, which
+        judges spots by other rules.
+        """
+        held = self._held_spots[size]
+        due = spot_filter.now_ms if isinstance(spot_filter, TimedSpotFilter) else _OPEN_END
+        while held and held[0][0] <= due:
+            spot = heapq.heappop(held)[2]
             if not spot.is_occupied_spot():
-                available_counts[spot.get_spot_size()] += 1
+                self._index_free_spot(spot)  # No-op if it is indexed again already
+
+    def to_layout(self) -> dict:
+        """Returns a JSON-serializable description of this floor's spots (not their occupancy)."""
+        with self._lock:
+            return {
+                "floor_number": self.floor_number,
+                "spots": [
+                    [spot.get_spot_id(), spot.get_spot_size().value]
+                    for spot in self.spots.values()
+                ],
+            }
+
+    @classmethod
+    def from_layout(
+        cls, layout: dict, parked: Optional[Dict[str, Vehicle]] = None
+    ) -> "ParkingFloor":
+        """
+        Builds a floor from a description produced by to_layout.
+        parked optionally maps spot IDs to the vehicles occupying them, so a
+        recovered floor starts out with the right occupancy.
+        """
+        parked = parked or {}
+        sizes = {size.value: size for size in VehicleSize}
+        spots = []
+        for spot_id, size_value in layout["spots"]:
+            spot = ParkingSpot(spot_id, sizes[size_value])
+            vehicle = parked.get(spot_id)
+            if vehicle is not None:
+                spot.park_vehicle(vehicle)  # Not on a floor yet, so no callbacks
+            spots.append(spot)
+        floor = cls(layout["floor_number"])
+        floor.add_spots(spots)
+        return floor
 
-        # Print the count for each vehicle size
+    def display_availability(self):
+        """Prints a summary of available spots on this floor, grouped by size."""
+        print(f"--- Floor {self.floor_number} Availability ---")
+        # Print the count for each vehicle size straight from the free-spot counters
         for size in VehicleSize:
-            print(f"  {size.name} spots: {available_counts[size]}")
+            print(f"  {size.name} spots: {self._free_counts[size]}")
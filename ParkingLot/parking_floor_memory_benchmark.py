@@ -0,0 +1,55 @@
+"""
+Compares the memory used by a regular ParkingFloor (one ParkingSpot object per
+spot) with a CompactParkingFloor (parallel arrays) at 10^4, 10^5 and 10^6 spots.
+Memory is measured with tracemalloc while building each floor.
+"""
+
+import gc
+import time
+import tracemalloc
+from parking_floor import ParkingFloor
+from compact_parking_floor import CompactParkingFloor
+from parking_spot import ParkingSpot
+from vehicle_size import VehicleSize
+
+SIZES = list(VehicleSize)
+
+
+def _build_regular(spot_count: int) -> ParkingFloor:
+    floor = ParkingFloor(1)
+    for index in range(spot_count):
+        floor.add_spot(ParkingSpot(f"F1-{index}", SIZES[index % len(SIZES)]))
+    return floor
+
+
+def _build_compact(spot_count: int) -> CompactParkingFloor:
+    return CompactParkingFloor(
+        1, (SIZES[index % len(SIZES)] for index in range(spot_count))
+    )
+
+
+def _measure(builder, spot_count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    floor = builder(spot_count)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del floor
+    return current, elapsed
+
+
+def main():
+    print(f"{'spots':>10} {'layout':>8} {'total MB':>10} {'bytes/spot':>11} {'build s':>8}")
+    for spot_count in (10**4, 10**5, 10**6):
+        for name, builder in (("regular", _build_regular), ("compact", _build_compact)):
+            used, elapsed = _measure(builder, spot_count)
+            print(
+                f"{spot_count:>10} {name:>8} {used / 2**20:>10.1f} "
+                f"{used / spot_count:>11.1f} {elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
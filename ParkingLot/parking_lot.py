@@ -1,10 +1,28 @@
 # Import necessary classes from other modules
-from parking_floor import ParkingFloor
+from parking_floor import ParkingFloor, SpotFilter
 from parking_ticket import ParkingTicket
 from fee_strategy import FeeStrategy, FlatRateFeeStrategy
-from parking_strategy import ParkingStrategy, NearestFirstStrategy
+from parking_strategy import ParkingStrategy, NearestFirstStrategy, call_find_spot
+from lot_availability import LotAvailability
+from striped_ticket_map import StripedTicketMap
+from concurrency_mode import ConcurrencyMode
+from parking_event import ParkingEvent, ParkingEventType
+from event_sink import EventSink, ConsoleEventSink
+from ticket_journal import TicketJournal
+from reservation_book import ReservationBook
+from plate_index import PlateIndex, VehicleLocation
+from overflow_policy import OverflowPolicy
+from occupancy_publisher import OccupancyPublisher, OccupancyListener
+from availability_observer import AvailabilityObserver
+from floor_layout import build_floor, build_vehicle
+from clock import Clock, SYSTEM_CLOCK
+from parking_spot import ParkingSpot
 from vehicle import Vehicle
-from typing import List, Dict, Optional
+from vehicle_size import VehicleSize
+from typing import List, Dict, Iterable, Optional, Tuple
+from collections import defaultdict
+from contextlib import nullcontext
+import gc
 import threading
 
 
@@ -12,11 +30,15 @@ class ParkingLot:
     """
     A Singleton class representing the entire parking lot.
     It manages floors, active tickets, and strategies for parking and fees.
+    Services that run many garages in one process create independent lots
+    with ParkingLot.create(lot_id) instead (see ParkingLotRegistry).
     """
 
     # Private class variable to hold the single instance
     _instance = None
     _lock = threading.Lock()
+    # Lost claim races _claim_spot tolerates before it claims under the floor's lock
+    MAX_CLAIM_RETRIES = 8
 
     def __init__(self):
         """
@@ -27,16 +49,41 @@ class ParkingLot:
             raise Exception(
                 "This class is a Singleton. Use get_instance() to get the object."
             )
+        self._initialize(None)
+
+    def _initialize(self, lot_id: Optional[str]):
+        """Sets up an empty lot with default strategies and its own locks."""
+        self.lot_id = lot_id  # None for the process-wide singleton
         self.floors: List[ParkingFloor] = []  # A list to hold all the parking floors
         self.activeTickets: Dict[str, ParkingTicket] = (
-            {}
-        )  # A dictionary to track active tickets by license number
+            StripedTicketMap()
+        )  # A lock-striped dictionary to track active tickets by license number
         self.fee_strategy: FeeStrategy = (
             FlatRateFeeStrategy()
         )  # Default fee calculation strategy
         self.parking_strategy: ParkingStrategy = (
             NearestFirstStrategy()
         )  # Default spot-finding strategy
+        self._availability = (
+            LotAvailability()
+        )  # Per-floor x per-size free-spot summary used by the strategies
+        self.concurrency_mode = ConcurrencyMode.GLOBAL_LOCK
+        self.event_sink: EventSink = (
+            ConsoleEventSink()
+        )  # Where park/unpark events are reported
+        self._journal: Optional[TicketJournal] = None  # Write-ahead journal, if attached
+        self.clock: Clock = SYSTEM_CLOCK  # Time source for tickets and events
+        self._reservation_book: Optional[ReservationBook] = None  # Future bookings, if enabled
+        self._plate_index: Optional[PlateIndex] = None  # Partial-plate search, if enabled
+        self.overflow_policy: Optional[OverflowPolicy] = None  # Exact sizes only if None
+        # Plates of vehicles parked in a larger spot, by vehicle size, oldest first
+        self._overflowed: Dict[VehicleSize, Dict[str, None]] = {
+            size: {} for size in VehicleSize
+        }
+        self._overflow_lock = threading.Lock()
+        self._occupancy: Optional[OccupancyPublisher] = None  # Started by the first subscriber
+        # Availability observers attached to every floor, including floors added later
+        self._floor_observers: List[AvailabilityObserver] = []
         self._main_lock = threading.Lock()
 
     @staticmethod
@@ -51,9 +98,65 @@ class ParkingLot:
                     ParkingLot._instance = ParkingLot()
         return ParkingLot._instance
 
+    @classmethod
+    def create(cls, lot_id: str) -> "ParkingLot":
+        """
+        Creates an independent lot, separate from the singleton, with its own
+        floors, tickets, strategies and locks.
+        """
+        lot = cls.__new__(cls)
+        lot._initialize(lot_id)
+        return lot
+
+    def get_lot_id(self) -> Optional[str]:
+        return self.lot_id
+
     def add_floor(self, floor: ParkingFloor):
         """Adds a new parking floor to the lot."""
+        with self._main_lock:
+            self._add_floor_locked(floor)
+            if self._journal is not None:
+                self._journal.append({"op": "floor", "layout": floor.to_layout()})
+        self._sync_journal()
+
+    def _add_floor_locked(self, floor: ParkingFloor):
         self.floors.append(floor)
+        self._availability.add_floor(floor)
+        if self._reservation_book is not None:
+            self._reservation_book.add_floor(floor)
+        if self._occupancy is not None:
+            self._occupancy.observe(floor)
+        for observer in self._floor_observers:
+            floor.add_observer(observer)
+
+    def clear(self):
+        """
+        Removes every floor and active ticket, e.g. to set up a fresh layout.
+        Also detaches the reservation book, and detaches and closes the
+        journal, since the old layout no longer applies.
+        """
+        with self._main_lock:
+            journal, self._journal = self._journal, None
+            for floor in self.floors:
+                floor.remove_observer(self._availability)
+                for observer in self._floor_observers:
+                    floor.remove_observer(observer)  # They stay on for the next layout
+            self.floors.clear()
+            self.activeTickets.clear()
+            self._availability = LotAvailability()
+            self._reservation_book = None
+            if self._plate_index is not None:
+                self._plate_index.clear()
+            for plates in self._overflowed.values():
+                plates.clear()
+            if self._occupancy is not None:
+                self._occupancy.detach()  # Signs stay subscribed for the next layout
+        if journal is not None:
+            journal.close()  # Flushes what is pending and stops its flusher thread
+
+    def get_availability(self) -> LotAvailability:
+        """Returns the lot-wide availability summary."""
+        return self._availability
 
     def set_fee_strategy(self, fee_strategy: FeeStrategy):
         """Allows changing the fee calculation strategy at runtime."""
@@ -63,29 +166,386 @@ class ParkingLot:
         """Allows changing the spot-finding strategy at runtime."""
         self.parking_strategy = parking_strategy
 
+    def set_event_sink(self, event_sink: EventSink):
+        """Allows changing where park/unpark events are reported at runtime."""
+        self.event_sink = event_sink
+
+    def set_clock(self, clock: Clock):
+        """Injects the time source used for new tickets and events (e.g. a ManualClock)."""
+        self.clock = clock
+
+    def set_reservation_book(self, reservation_book: ReservationBook):
+        """
+        Enables reservations: every current and future floor is registered with
+        the book, and walk-in vehicles are kept off spots that are booked soon.
+        """
+        with self._main_lock:
+            for floor in self.floors:
+                reservation_book.add_floor(floor)
+            self._reservation_book = reservation_book
+
+    def get_reservation_book(self) -> Optional[ReservationBook]:
+        return self._reservation_book
+
+    def subscribe_occupancy(
+        self,
+        listener: OccupancyListener,
+        interval_ms: int = OccupancyPublisher.DEFAULT_INTERVAL_MS,
+    ):
+        """
+        Pushes per-floor free counts to the listener from the publisher's
+        thread: the current counts first (after the next push), then at most
+        one update per floor every interval_ms. The first subscriber sets the
+        interval for all of them.
+        """
+        with self._main_lock:
+            if self._occupancy is None:
+                self._occupancy = OccupancyPublisher(interval_ms)
+                for floor in self.floors:
+                    self._occupancy.observe(floor)
+            publisher = self._occupancy
+        publisher.subscribe(listener)
+
+    def unsubscribe_occupancy(self, listener: OccupancyListener):
+        if self._occupancy is not None:
+            self._occupancy.unsubscribe(listener)
+
+    def add_floor_observer(self, observer: AvailabilityObserver):
+        """
+        Attaches an availability observer to every floor in the lot, and to
+        every floor added from now on (also across clear()).
+        """
+        with self._main_lock:
+            self._floor_observers.append(observer)
+            for floor in self.floors:
+                floor.add_observer(observer)
+
+    def remove_floor_observer(self, observer: AvailabilityObserver):
+        with self._main_lock:
+            if observer in self._floor_observers:
+                self._floor_observers.remove(observer)
+                for floor in self.floors:
+                    floor.remove_observer(observer)
+
+    def set_overflow_policy(self, overflow_policy: Optional[OverflowPolicy]):
+        """
+        Lets vehicles take larger spots at the policy's cost when their own size
+        is full (None restores exact-size matching).
+        """
+        self.overflow_policy = overflow_policy
+
+    def set_plate_index(self, plate_index: PlateIndex):
+        """
+        Enables indexed partial-plate search. The index is filled with the plates
+        parked right now and kept in sync by every park and unpark from then on.
+        """
+        # Parks and unparks update the index inside their plate's stripe, so
+        # holding every stripe means none of them can slip between the fill
+        # and the switch
+        with self._main_lock, self.activeTickets.lock_all():
+            plate_index.clear()
+            for license_number in list(self.activeTickets.keys()):
+                plate_index.add(license_number)
+            self._plate_index = plate_index
+
+    def locate_vehicle(self, license_number: str) -> Optional[VehicleLocation]:
+        """Returns where a vehicle is parked, or None if it is not in the lot."""
+        ticket = self.activeTickets.get(license_number)
+        return VehicleLocation(ticket) if ticket is not None else None
+
+    def search_plates(self, query: str, limit: Optional[int] = None) -> List[VehicleLocation]:
+        """
+        Finds parked vehicles by partial plate, e.g. "42K$" for plates ending in
+        42K (see PlateIndex). Without a plate index every active ticket is scanned.
+        """
+        if self._plate_index is not None:
+            plates = self._plate_index.search(query)
+        else:
+            plates = sorted(
+                plate
+                for plate in list(self.activeTickets.keys())
+                if PlateIndex.matches(plate, query)
+            )
+        locations = []
+        for plate in plates:
+            location = self.locate_vehicle(plate)  # Skips a vehicle that just left
+            if location is not None:
+                locations.append(location)
+                if limit is not None and len(locations) >= limit:
+                    break
+        return locations
+
+    def set_concurrency_mode(self, concurrency_mode: ConcurrencyMode):
+        """Switches between one lot-wide lock and fine-grained per-floor locking."""
+        with self._main_lock:
+            self.concurrency_mode = concurrency_mode
+
     def park_vehicle(self, vehicle: Vehicle) -> Optional[ParkingTicket]:
         """
         Finds a spot for a vehicle using the current parking strategy,
         parks the vehicle, and issues a ticket.
         Returns the ticket on success, None on failure.
         """
-        with self._main_lock:
-            # Delegate the task of finding a spot to the current strategy object
-            spot = self.parking_strategy.find_spot(self.floors, vehicle)
-            if spot is not None:
-                spot.park_vehicle(vehicle)  # Occupy the spot
-                # Create a new ticket for this parking session
-                ticket = ParkingTicket(vehicle, spot)
-                self.activeTickets[vehicle.get_license_number()] = (
-                    ticket  # Store the active ticket
+        if self.concurrency_mode == ConcurrencyMode.FINE_GRAINED:
+            ticket = self._park_vehicle_fine_grained(vehicle)
+        else:
+            with self._main_lock:
+                # Delegate the task of finding a spot to the current strategy object
+                spot = call_find_spot(
+                    self.parking_strategy,
+                    self.floors,
+                    vehicle,
+                    self._availability,
+                    self._walk_in_filter(),
+                    self.overflow_policy,
                 )
-                print(
-                    f"Vehicle {vehicle.get_license_number()} parked at spot {spot.get_spot_id()}"
-                )
-                return ticket
-            else:
-                print(f"No available spot for vehicle {vehicle.get_license_number()}")
+                ticket = None
+                if spot is not None:
+                    spot.park_vehicle(vehicle)  # Occupy the spot
+                    ticket = self._issue_ticket(vehicle, spot)
+
+        # Report the outcome only after the lock is released
+        self.publish([self._park_event(vehicle, ticket)])
+        return ticket
+
+    def _park_vehicle_fine_grained(self, vehicle: Vehicle) -> Optional[ParkingTicket]:
+        """
+        Parks a vehicle without the lot-wide lock.
+        The strategy search only takes per-floor locks; the chosen spot is then
+        claimed atomically, and the search is retried if another gate won the race.
+        """
+        spot = self._claim_spot(vehicle, self._walk_in_filter())
+        if spot is None:
+            return None
+        return self._issue_ticket(vehicle, spot)
+
+    def _claim_spot(
+        self, vehicle: Vehicle, spot_filter: Optional[SpotFilter]
+    ) -> Optional[ParkingSpot]:
+        """
+        Finds a spot with the strategy and claims it atomically, retrying on a
+        lost race. After MAX_CLAIM_RETRIES lost races it falls back to the
+        locked path (see _claim_spot_locked), so a hot spot cannot starve a gate.
+        """
+        for _ in range(self.MAX_CLAIM_RETRIES):
+            spot = self._find_spot(vehicle, spot_filter)
+            if spot is None or spot.try_claim(vehicle):
+                return spot
+            # Lost the race for this spot; the floor index now skips it, so search again
+        # In GLOBAL_LOCK mode the caller already holds _main_lock (not reentrant)
+        if self.concurrency_mode == ConcurrencyMode.GLOBAL_LOCK:
+            return self._claim_spot_locked(vehicle, spot_filter)
+        with self._main_lock:
+            return self._claim_spot_locked(vehicle, spot_filter)
+
+    def _claim_spot_locked(
+        self, vehicle: Vehicle, spot_filter: Optional[SpotFilter]
+    ) -> Optional[ParkingSpot]:
+        """
+        Searches and claims under _main_lock, taking the spot under its floor's
+        lock: the floor claims a free spot of the size the strategy picked (on
+        the floor it picked), so a round fails only if that floor ran out of
+        the size, and the next search then sees the updated counts.
+        """
+        while True:
+            spot = self._find_spot(vehicle, spot_filter)
+            if spot is None:
                 return None
+            claimed = spot.get_floor().claim_available_spots(
+                [vehicle], spot_filter, self.overflow_policy, spot.get_spot_size()
+            )
+            if claimed:
+                return claimed[0]
+
+    def _find_spot(
+        self, vehicle: Vehicle, spot_filter: Optional[SpotFilter]
+    ) -> Optional[ParkingSpot]:
+        return call_find_spot(
+            self.parking_strategy,
+            self.floors,
+            vehicle,
+            self._availability,
+            spot_filter,
+            self.overflow_policy,
+        )
+
+    def park_reserved_vehicle(
+        self, vehicle: Vehicle, reservation_id: int
+    ) -> Optional[ParkingTicket]:
+        """
+        Parks a vehicle in the spot booked by a reservation, which is then used up.
+        If that spot is still taken (e.g. by an overstaying car), any spot that is
+        free until the reservation ends is used instead.
+        Returns None if the reservation is unknown or already used, is held for
+        another vehicle or size, is not for the current time, or no spot is available.
+        """
+        reservation = None
+        if self._reservation_book is not None:
+            reservation = self._reservation_book.check_in(
+                reservation_id, vehicle, self.clock.now()
+            )
+
+        ticket = None
+        if reservation is not None:
+            with self._lock_for_mode():
+                spot = reservation.get_spot()
+                if not spot.try_claim(vehicle):
+                    spot = self._claim_spot(
+                        vehicle,
+                        self._reservation_book.window_filter(
+                            self.clock.now(), reservation.get_end()
+                        ),
+                    )
+                if spot is not None:
+                    ticket = self._issue_ticket(vehicle, spot)
+            if ticket is None:
+                self._reservation_book.undo_check_in(reservation)
+
+        self.publish([self._park_event(vehicle, ticket)])
+        return ticket
+
+    def _walk_in_filter(self) -> Optional[SpotFilter]:
+        """The spot filter for a vehicle without a reservation (None if there are none)."""
+        if self._reservation_book is None:
+            return None
+        return self._reservation_book.walk_in_filter(self.clock.now())
+
+    def park_vehicles(self, vehicles: Iterable[Vehicle]) -> List[Optional[ParkingTicket]]:
+        """
+        Parks a batch of vehicles (e.g. a bus of event traffic) in one pass.
+        Vehicles are grouped by size; the strategy is consulted once per floor
+        rather than once per vehicle, and each chosen floor hands out as many
+        spots as it can under a single lock acquisition.
+        Returns one entry per input vehicle, in input order: the ticket, or None
+        if no spot was available.
+        """
+        tickets, events = self.park_vehicles_deferred(vehicles)
+        self.publish(events)
+        return tickets
+
+    def park_vehicles_deferred(
+        self, vehicles: Iterable[Vehicle]
+    ) -> Tuple[List[Optional[ParkingTicket]], List[ParkingEvent]]:
+        """
+        Does the work of park_vehicles but leaves reporting to the caller, who
+        must pass the returned events to publish() (e.g. an asyncio front-end
+        that waits for durability without blocking its event loop).
+        """
+        vehicles = list(vehicles)
+        tickets: List[Optional[ParkingTicket]] = [None] * len(vehicles)
+
+        # Group input positions by vehicle size, keeping arrival order within a group
+        groups: Dict[VehicleSize, List[int]] = defaultdict(list)
+        for position, vehicle in enumerate(vehicles):
+            groups[vehicle.get_size()].append(position)
+
+        with self._lock_for_mode():
+            spot_filter = self._walk_in_filter()
+            served: List[int] = []  # Input positions that got a spot, with their spots
+            spots: List[ParkingSpot] = []
+            for positions in groups.values():
+                pending = positions
+                while pending:
+                    # The strategy only picks the floor; the floor fills as much as it can
+                    spot = call_find_spot(
+                        self.parking_strategy,
+                        self.floors,
+                        vehicles[pending[0]],
+                        self._availability,
+                        spot_filter,
+                        self.overflow_policy,
+                    )
+                    if spot is None or spot.get_floor() is None:
+                        break
+                    # Only the size the strategy chose: the floor may still have
+                    # larger spots while that size is free on another floor
+                    claimed = spot.get_floor().claim_available_spots(
+                        [vehicles[position] for position in pending],
+                        spot_filter,
+                        spot_size=spot.get_spot_size(),
+                    )
+                    if not claimed:
+                        break
+                    served.extend(pending[: len(claimed)])
+                    spots.extend(claimed)
+                    pending = pending[len(claimed) :]
+            issued = self._issue_tickets(
+                [(vehicles[position], spot) for position, spot in zip(served, spots)]
+            )
+            for position, ticket in zip(served, issued):
+                tickets[position] = ticket
+
+        now = self.clock.now() if len(served) < len(vehicles) else None
+        events = [
+            ParkingEvent(ParkingEventType.PARKED, vehicle.get_license_number(), ticket,
+                         timestamp=ticket.entry_timestamp)
+            if ticket is not None
+            else ParkingEvent(ParkingEventType.NO_SPOT, vehicle.get_license_number(), timestamp=now)
+            for vehicle, ticket in zip(vehicles, tickets)
+        ]
+        return tickets, events
+
+    def _issue_tickets(
+        self, placements: List[Tuple[Vehicle, ParkingSpot]]
+    ) -> List[ParkingTicket]:
+        """
+        The batch version of _issue_ticket: each plate's stripe is taken once per
+        batch and covers its tickets, their journal records and the plate index,
+        as in the single-vehicle path.
+        """
+        tickets = ParkingTicket.issue_all(placements, self.clock)
+        journal = self._journal
+        plate_index = self._plate_index
+
+        def record(batch: List[ParkingTicket]):
+            if journal is not None:
+                journal.append_all([self._park_record(ticket) for ticket in batch])
+            if plate_index is not None:
+                plate_index.add_all(ticket.vehicle.get_license_number() for ticket in batch)
+
+        self.activeTickets.add_all(tickets, record)
+        overflowed = [ticket for ticket in tickets if ticket.spot.get_spot_size() != ticket.vehicle.get_size()]
+        if overflowed:
+            with self._overflow_lock:
+                for ticket in overflowed:
+                    self._overflowed[ticket.vehicle.get_size()][ticket.vehicle.get_license_number()] = None
+        return tickets
+
+    def _issue_ticket(self, vehicle: Vehicle, spot: ParkingSpot) -> ParkingTicket:
+        """Creates and records the ticket for a vehicle that now occupies a spot."""
+        # Create a new ticket for this parking session
+        ticket = ParkingTicket(vehicle, spot, self.clock)
+        license_number = vehicle.get_license_number()
+        # The plate's stripe lock covers the state change, its journal record and
+        # the plate index, in every mode: an unpark of this plate can't log or
+        # unindex before the park, and a snapshot (which holds every stripe)
+        # sees all of them or none
+        with self.activeTickets.lock_for(license_number):
+            self.activeTickets[license_number] = ticket  # Store the active ticket
+            if self._journal is not None:
+                self._journal.append(self._park_record(ticket))
+            if self._plate_index is not None:
+                self._plate_index.add(license_number)
+        if spot.get_spot_size() != vehicle.get_size():
+            with self._overflow_lock:
+                self._overflowed[vehicle.get_size()][license_number] = None
+        return ticket
+
+    def _park_event(
+        self, vehicle: Vehicle, ticket: Optional[ParkingTicket]
+    ) -> ParkingEvent:
+        if ticket is None:
+            return ParkingEvent(
+                ParkingEventType.NO_SPOT,
+                vehicle.get_license_number(),
+                timestamp=self.clock.now(),
+            )
+        return ParkingEvent(
+            ParkingEventType.PARKED,
+            vehicle.get_license_number(),
+            ticket,
+            timestamp=ticket.get_entry_timestamp(),
+        )
 
     def unpark_vehicle(self, license_number: str) -> Optional[float]:
         """
@@ -93,19 +553,392 @@ class ParkingLot:
         and frees the spot.
         Returns the calculated fee on success, None if the ticket is not found.
         """
-        with self._main_lock:
+        # In fine-grained mode the striped ticket map and the spot's own lock are enough
+        with self._lock_for_mode():
+            event = self._release_ticket(license_number)
+            events = [event] + self._rebalance([event])
+        self.publish(events)
+        return event.get_fee()
+
+    def unpark_vehicles(self, license_numbers: Iterable[str]) -> List[Optional[float]]:
+        """
+        Unparks a batch of vehicles under a single lock acquisition.
+        Returns one fee per license number, in input order (None if not found).
+        """
+        license_numbers = list(license_numbers)
+        events = self.unpark_vehicles_deferred(license_numbers)
+        self.publish(events)
+        # Any MOVED events from rebalancing follow the per-plate ones
+        return [event.get_fee() for event in events[: len(license_numbers)]]
+
+    def unpark_vehicles_deferred(self, license_numbers: Iterable[str]) -> List[ParkingEvent]:
+        """
+        Does the work of unpark_vehicles; the caller must publish() the events.
+        Returns one event per license number, in input order, followed by a
+        MOVED event for each overflowed vehicle rebalanced into a freed spot.
+        Like park_vehicles_deferred, each stripe and each floor is locked once
+        per batch, and the floors' counters are updated once per size.
+        """
+        license_numbers = list(license_numbers)
+        with self._lock_for_mode():
+            events = self._release_tickets(license_numbers)
+            return events + self._rebalance(events)
+
+    def _release_tickets(self, license_numbers: List[str]) -> List[ParkingEvent]:
+        """The batch version of _release_ticket; returns one event per license number."""
+        now = self.clock.now()
+        journal = self._journal
+        plate_index = self._plate_index
+        by_floor: Dict[int, Tuple[ParkingFloor, List[ParkingSpot]]] = {}
+        loose_spots: List[ParkingSpot] = []  # Spots not on a floor
+
+        def record(batch: List[ParkingTicket]):
+            # Journaled in the stripe's critical section, as in _release_ticket
+            for ticket in batch:
+                ticket.set_exit_timestamp(now)
+                spot = ticket.spot
+                floor = spot.get_floor()
+                if floor is None:
+                    loose_spots.append(spot)
+                else:
+                    by_floor.setdefault(id(floor), (floor, []))[1].append(spot)
+            if journal is not None:
+                journal.append_all(
+                    [
+                        {
+                            "op": "unpark",
+                            "ticket_id": ticket.ticket_id,
+                            "license_number": ticket.vehicle.get_license_number(),
+                        }
+                        for ticket in batch
+                    ]
+                )
+            if plate_index is not None:
+                plate_index.remove_all(ticket.vehicle.get_license_number() for ticket in batch)
+
+        tickets = self.activeTickets.pop_all(license_numbers, record)
+        # The spots stay occupied until here, so nobody can take one early; a
+        # snapshot rebuilds occupancy from the tickets, which are already gone
+        for floor, spots in by_floor.values():
+            floor.release_spots(spots)
+        for spot in loose_spots:
+            spot.unpark_vehicle()
+
+        overflowed = [
+            ticket
+            for ticket in tickets
+            if ticket is not None and ticket.spot.get_spot_size() != ticket.vehicle.get_size()
+        ]
+        if overflowed:
+            with self._overflow_lock:
+                for ticket in overflowed:
+                    self._overflowed[ticket.vehicle.get_size()].pop(
+                        ticket.vehicle.get_license_number(), None
+                    )
+
+        calculate_fee = self.fee_strategy.calculate_fee
+        return [
+            ParkingEvent(ParkingEventType.UNPARKED, license_number, ticket,
+                         calculate_fee(ticket), timestamp=now)
+            if ticket is not None
+            else ParkingEvent(ParkingEventType.TICKET_NOT_FOUND, license_number, timestamp=now)
+            for license_number, ticket in zip(license_numbers, tickets)
+        ]
+
+    def _lock_for_mode(self):
+        """The lot-wide lock in GLOBAL_LOCK mode, a no-op context otherwise."""
+        if self.concurrency_mode == ConcurrencyMode.FINE_GRAINED:
+            return nullcontext()
+        return self._main_lock
+
+    def _release_ticket(self, license_number: str) -> ParkingEvent:
+        """Removes the ticket, frees its spot and returns the resulting event."""
+        # Same stripe critical section as _issue_ticket and _rebalance's moves
+        with self.activeTickets.lock_for(license_number):
             # Remove the ticket from active tickets; returns None if not found
             ticket = self.activeTickets.pop(license_number, None)
             if ticket is None:
-                print(f"Ticket not found for vehicle {license_number}")
-                return None
-
+                return ParkingEvent(
+                    ParkingEventType.TICKET_NOT_FOUND,
+                    license_number,
+                    timestamp=self.clock.now(),
+                )
             ticket.get_spot().unpark_vehicle()  # Free up the parking spot
             ticket.set_exit_timestamp()  # Record the exit time
+            if self._journal is not None:
+                self._journal.append(
+                    {
+                        "op": "unpark",
+                        "ticket_id": ticket.get_ticket_id(),
+                        "license_number": license_number,
+                    }
+                )
+            if self._plate_index is not None:
+                self._plate_index.remove(license_number)
+
+        if ticket.get_spot().get_spot_size() != ticket.get_vehicle().get_size():
+            with self._overflow_lock:
+                self._overflowed[ticket.get_vehicle().get_size()].pop(license_number, None)
 
-            # Delegate fee calculation to the current fee strategy object
-            fee = self.fee_strategy.calculate_fee(ticket)
-            print(
-                f"Vehicle {license_number} unparked from spot {ticket.get_spot().get_spot_id()}"
+        # Delegate fee calculation to the current fee strategy object
+        fee = self.fee_strategy.calculate_fee(ticket)
+        return ParkingEvent(
+            ParkingEventType.UNPARKED,
+            license_number,
+            ticket,
+            fee,
+            timestamp=ticket.get_exit_timestamp(),
+        )
+
+    def _rebalance(self, unpark_events: List[ParkingEvent]) -> List[ParkingEvent]:
+        """
+        Moves overflowed vehicles into the spots just freed when the sizes match,
+        oldest overflow first. A move frees a larger spot, which may in turn suit
+        another overflowed vehicle. Returns one MOVED event per move.
+        """
+        if self.overflow_policy is None or not self.overflow_policy.rebalance:
+            return []
+        freed = [
+            event.get_ticket().get_spot()
+            for event in unpark_events
+            if event.get_event_type() == ParkingEventType.UNPARKED
+        ]
+        spot_filter = self._walk_in_filter()
+        moves: List[ParkingEvent] = []
+        while freed:
+            spot = freed.pop()
+            if spot.is_occupied_spot() or (spot_filter is not None and not spot_filter(spot)):
+                continue
+            with self._overflow_lock:
+                waiting = self._overflowed[spot.get_spot_size()]
+                license_number = next(iter(waiting), None)
+                if license_number is None:
+                    continue
+                del waiting[license_number]
+            # The plate's stripe lock keeps an unpark of this vehicle from
+            # freeing its old spot while the ticket moves to the new one
+            with self.activeTickets.lock_for(license_number):
+                ticket = self.activeTickets.get(license_number)
+                if ticket is None:
+                    continue  # It left meanwhile
+                old_spot = ticket.get_spot()
+                if old_spot.get_spot_size() == ticket.get_vehicle().get_size():
+                    continue  # Already moved back to its own size
+                if not spot.try_claim(ticket.get_vehicle()):
+                    with self._overflow_lock:  # A gate took the spot first; keep waiting
+                        waiting[license_number] = None
+                    continue
+                ticket.set_spot(spot)
+                old_spot.unpark_vehicle()
+                if self._journal is not None:
+                    self._journal.append(self._move_record(ticket))
+            moves.append(
+                ParkingEvent(
+                    ParkingEventType.MOVED,
+                    license_number,
+                    ticket,
+                    timestamp=self.clock.now(),
+                )
             )
-            return fee
+            freed.append(old_spot)
+        return moves
+
+    def publish(self, events: List[ParkingEvent]):
+        """
+        Runs once the locks are released: waits for the journal's group commit
+        (so a returned ticket is durable), takes a snapshot if one is due, and
+        reports the events to the sink.
+        Only blocks when a journal is attached.
+        """
+        self._sync_journal()
+        self.event_sink.emit_all(events)
+
+    # ----- Journal and recovery -----
+
+    def get_journal(self) -> Optional[TicketJournal]:
+        return self._journal
+
+    def attach_journal(self, journal: TicketJournal):
+        """
+        Starts journaling every park and unpark to the given journal, which
+        must be empty (resume from a used one with recover_from_journal).
+        An initial snapshot records the current layout and active tickets.
+        """
+        if not journal.is_empty():
+            raise ValueError(
+                "The journal already holds records; use recover_from_journal instead."
+            )
+        with self._main_lock:
+            self._journal = journal
+        journal.write_snapshot(self._capture_state)
+
+    def recover_from_journal(self, journal: TicketJournal):
+        """
+        Rebuilds floors, spot occupancy and active tickets from the journal's
+        latest snapshot plus the records after it, then keeps journaling to it.
+        Any current floors and tickets are discarded.
+        """
+        # Recovery allocates hundreds of thousands of long-lived objects; pausing
+        # the cyclic garbage collector avoids repeated full scans while doing so
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._recover(journal)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _recover(self, journal: TicketJournal):
+        snapshot, records = journal.load()
+        if self._journal is journal:
+            self._journal = None  # Keep it open: clear() closes the old journal
+        self.clear()
+        with self._main_lock:
+            floors_by_number: Dict[int, ParkingFloor] = {}
+            if snapshot is not None:
+                # Rebuild each floor with its vehicles already in place, so the
+                # free-spot index and counters are built once per floor
+                vehicles: Dict[str, Vehicle] = {}
+                parked: Dict[int, Dict[str, Vehicle]] = defaultdict(dict)
+                for row in snapshot["tickets"]:
+                    _, license_number, vehicle_type, size_value, floor_number, spot_id, _ = row
+                    vehicle = build_vehicle(vehicle_type, license_number, size_value)
+                    vehicles[license_number] = vehicle
+                    parked[floor_number][spot_id] = vehicle
+                for layout in snapshot["floors"]:
+                    floor = build_floor(layout, parked.get(layout["floor_number"]))
+                    self._add_floor_locked(floor)
+                    floors_by_number[floor.floor_number] = floor
+                self.activeTickets.update(
+                    {
+                        license_number: ParkingTicket.restore(
+                            ticket_id,
+                            vehicles[license_number],
+                            floors_by_number[floor_number].spots[spot_id],
+                            entry,
+                            self.clock,
+                        )
+                        for ticket_id, license_number, _, _, floor_number, spot_id, entry in snapshot["tickets"]
+                    }
+                )
+
+            # The snapshot is an exact cut at its LSN, so these records all postdate it;
+            # the checks below only keep replaying them safe
+            for record in records:
+                op = record["op"]
+                if op == "park":
+                    if record["license_number"] not in self.activeTickets:
+                        self._restore_ticket(floors_by_number, *record["ticket"])
+                elif op == "unpark":
+                    ticket = self.activeTickets.get(record["license_number"])
+                    if ticket is not None and ticket.get_ticket_id() == record["ticket_id"]:
+                        del self.activeTickets[record["license_number"]]
+                        ticket.get_spot().unpark_vehicle()
+                elif op == "move":
+                    self._replay_move(floors_by_number, record)
+                elif op == "floor":
+                    if record["layout"]["floor_number"] in floors_by_number:
+                        continue  # Already in the snapshot
+                    floor = build_floor(record["layout"])
+                    self._add_floor_locked(floor)
+                    floors_by_number[floor.floor_number] = floor
+            if self._plate_index is not None:
+                for license_number in list(self.activeTickets.keys()):
+                    self._plate_index.add(license_number)
+            if self.overflow_policy is not None:
+                for license_number, ticket in list(self.activeTickets.items()):
+                    vehicle_size = ticket.get_vehicle().get_size()
+                    if ticket.get_spot().get_spot_size() != vehicle_size:
+                        self._overflowed[vehicle_size][license_number] = None
+            self._journal = journal
+
+    def _replay_move(self, floors_by_number: Dict[int, ParkingFloor], record: dict):
+        ticket = self.activeTickets.get(record["license_number"])
+        if ticket is None or ticket.get_ticket_id() != record["ticket_id"]:
+            return
+        spot = floors_by_number[record["floor"]].spots[record["spot_id"]]
+        if ticket.get_spot().get_spot_id() == spot.get_spot_id():
+            return  # Already reflected in the snapshot
+        ticket.get_spot().unpark_vehicle()
+        spot.park_vehicle(ticket.get_vehicle())
+        ticket.set_spot(spot)
+
+    def _restore_ticket(
+        self,
+        floors_by_number: Dict[int, ParkingFloor],
+        ticket_id: str,
+        license_number: str,
+        vehicle_type: str,
+        size_value: int,
+        floor_number: int,
+        spot_id: str,
+        entry_timestamp: int,
+    ):
+        vehicle = build_vehicle(vehicle_type, license_number, size_value)
+        spot = floors_by_number[floor_number].spots[spot_id]
+        spot.park_vehicle(vehicle)
+        self.activeTickets[license_number] = ParkingTicket.restore(
+            ticket_id, vehicle, spot, entry_timestamp, self.clock
+        )
+
+    @staticmethod
+    def ticket_row(ticket: ParkingTicket) -> list:
+        """
+        A compact, picklable list describing an active ticket, as stored in the
+        journal: [ticket ID, plate, vehicle type, size, floor, spot ID, entry time].
+        """
+        vehicle = ticket.get_vehicle()
+        spot = ticket.get_spot()
+        return [
+            ticket.get_ticket_id(),
+            vehicle.get_license_number(),
+            type(vehicle).__name__,
+            vehicle.get_size().value,
+            spot.get_floor().floor_number,
+            spot.get_spot_id(),
+            ticket.get_entry_timestamp(),
+        ]
+
+    @staticmethod
+    def _move_record(ticket: ParkingTicket) -> dict:
+        spot = ticket.get_spot()
+        return {
+            "op": "move",
+            "ticket_id": ticket.get_ticket_id(),
+            "license_number": ticket.get_vehicle().get_license_number(),
+            "floor": spot.get_floor().floor_number,
+            "spot_id": spot.get_spot_id(),
+        }
+
+    def _park_record(self, ticket: ParkingTicket) -> dict:
+        return {
+            "op": "park",
+            "license_number": ticket.get_vehicle().get_license_number(),
+            "ticket": self.ticket_row(ticket),
+        }
+
+    def _capture_state(self) -> dict:
+        """
+        Reads the layout and active tickets for a journal snapshot.
+        The floors and every ticket stripe are read while all of them are held,
+        so the snapshot is one consistent cut: every journaled change is either
+        fully in it or not at all (e.g. never an old and a new ticket for the
+        same spot).
+        Every journal append happens under the main lock or a ticket stripe, so
+        the journal's last LSN read here is exactly the last change the
+        snapshot contains; recovery replays only the records after it.
+        """
+        with self._main_lock, self.activeTickets.lock_all():
+            state = {
+                "floors": [floor.to_layout() for floor in self.floors],
+                "tickets": [self.ticket_row(ticket) for ticket in self.activeTickets.values()],
+            }
+            if self._journal is not None:
+                state["lsn"] = self._journal.last_lsn()
+            return state
+
+    def _sync_journal(self):
+        journal = self._journal
+        if journal is not None:
+            journal.wait_durable()
+            journal.maybe_snapshot(self._capture_state)
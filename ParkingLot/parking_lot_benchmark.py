@@ -0,0 +1,275 @@
+"""
+Benchmark suite for the ParkingLot subsystem.
+
+Measures park/unpark throughput and p50/p99 latency with 1, 8 and 32 gate
+threads for every ParkingStrategy, on lots of 2k up to 1M spots (half full
+before the run, which leaves room for every gate's working set, so parks are
+not NO_SPOT rejections), plus fee computation rates for every FeeStrategy.
+Results are written as JSON; --compare checks them against a stored baseline
+and exits with status 1 if any metric regressed by more than --threshold, or if
+a baseline metric is missing from the run.
+
+    python parking_lot_benchmark.py --output baseline.json
+    python parking_lot_benchmark.py --output current.json --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor
+from compact_parking_floor import CompactParkingFloor
+from parking_spot import ParkingSpot
+from parking_strategy import NearestFirstStrategy, FarthestFirstStrategy, BestFitStrategy
+from fee_strategy import FlatRateFeeStrategy, VehicleBasedFeeStrategy
+from fee_benchmark import make_closed_tickets
+from concurrency_mode import ConcurrencyMode
+from event_sink import NullEventSink
+from vehicle_size import VehicleSize
+from bike import Bike
+from car import Car
+from truck import Truck
+from typing import Dict, List
+
+FLOORS = 10
+THREAD_COUNTS = (1, 8, 32)
+OPERATIONS_PER_RUN = 20_000  # Park plus unpark operations, split across the threads
+WORKING_SET = 20  # Vehicles each gate keeps parked before it starts unparking
+# Free spots every lot keeps for the gates: each one's working set, at the most threads
+MIN_FREE_SPOTS = max(THREAD_COUNTS) * WORKING_SET
+# The smallest lot is the smallest round size whose free half still covers MIN_FREE_SPOTS
+LOT_SIZES = (2_000, 10_000, 1_000_000)
+QUICK_LOT_SIZES = (2_000, 10_000)
+FEE_TICKETS = 200_000
+# Floors at least this large use the array-backed layout to keep memory sane
+COMPACT_FROM_SPOTS_PER_FLOOR = 10_000
+
+STRATEGIES = (NearestFirstStrategy, FarthestFirstStrategy, BestFitStrategy)
+FEE_STRATEGIES = (FlatRateFeeStrategy, VehicleBasedFeeStrategy)
+VEHICLE_TYPES = (Bike, Car, Truck)
+
+
+# ----- Park/unpark -----
+
+
+def _setup_parking_lot(total_spots: int, mode: ConcurrencyMode) -> ParkingLot:
+    """
+    Builds a lot of FLOORS floors, spots split evenly by size, then fills half
+    of it, or less if that would leave fewer than MIN_FREE_SPOTS free.
+    """
+    parking_lot = ParkingLot.get_instance()
+    parking_lot.clear()
+    parking_lot.set_concurrency_mode(mode)
+    parking_lot.set_event_sink(NullEventSink())
+    spots_per_floor = max(1, total_spots // FLOORS)
+    sizes = list(VehicleSize)
+    for floor_number in range(1, FLOORS + 1):
+        floor_sizes = [sizes[i % len(sizes)] for i in range(spots_per_floor)]
+        if spots_per_floor >= COMPACT_FROM_SPOTS_PER_FLOOR:
+            floor = CompactParkingFloor(floor_number, floor_sizes)
+        else:
+            floor = ParkingFloor(floor_number)
+            floor.add_spots(
+                ParkingSpot(f"F{floor_number}-{i}", size)
+                for i, size in enumerate(floor_sizes)
+            )
+        parking_lot.add_floor(floor)
+
+    capacity = spots_per_floor * FLOORS
+    if capacity < MIN_FREE_SPOTS:
+        raise ValueError(
+            f"A {capacity}-spot lot cannot hold {MIN_FREE_SPOTS} vehicles in the gates' working sets."
+        )
+    resident_count = min(capacity // 2, capacity - MIN_FREE_SPOTS)
+    parking_lot.park_vehicles(
+        VEHICLE_TYPES[i % len(VEHICLE_TYPES)](f"RESIDENT-{i}") for i in range(resident_count)
+    )
+    return parking_lot
+
+
+def _gate(
+    parking_lot: ParkingLot, gate: int, operations: int, latencies: List[int], rejected: List[int]
+):
+    parked: List[str] = []
+    for op in range(operations):
+        start = time.perf_counter_ns()
+        if len(parked) >= WORKING_SET:
+            parking_lot.unpark_vehicle(parked.pop(0))
+        else:
+            vehicle = VEHICLE_TYPES[op % len(VEHICLE_TYPES)](f"G{gate}-{op}")
+            if parking_lot.park_vehicle(vehicle) is not None:
+                parked.append(vehicle.get_license_number())
+            else:
+                rejected[gate] += 1
+        latencies.append(time.perf_counter_ns() - start)
+    for license_number in parked:
+        parking_lot.unpark_vehicle(license_number)
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> int:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def bench_park_unpark(parking_lot: ParkingLot, threads: int) -> Dict[str, float]:
+    per_thread = OPERATIONS_PER_RUN // threads
+    latencies: List[List[int]] = [[] for _ in range(threads)]
+    rejected = [0] * threads  # NO_SPOT parks per gate
+    gates = [
+        threading.Thread(
+            target=_gate, args=(parking_lot, gate, per_thread, latencies[gate], rejected)
+        )
+        for gate in range(threads)
+    ]
+    start = time.perf_counter()
+    for gate in gates:
+        gate.start()
+    for gate in gates:
+        gate.join()
+    elapsed = time.perf_counter() - start
+
+    merged = sorted(latency for gate_latencies in latencies for latency in gate_latencies)
+    return {
+        "ops_per_s": len(merged) / elapsed,
+        "p50_us": _percentile(merged, 0.50) / 1000,
+        "p99_us": _percentile(merged, 0.99) / 1000,
+        # Lower is better, like the latencies; near 0 unless the lot is sized wrong
+        "rejected_pct": 100 * sum(rejected) / len(merged),
+    }
+
+
+# ----- Fees -----
+
+
+def bench_fees() -> Dict[str, Dict[str, float]]:
+    tickets = make_closed_tickets(FEE_TICKETS)
+    results = {}
+    for strategy_type in FEE_STRATEGIES:
+        strategy = strategy_type()
+        start = time.perf_counter()
+        for ticket in tickets:
+            strategy.calculate_fee(ticket)
+        scalar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        strategy.calculate_fees(tickets)
+        batch_s = time.perf_counter() - start
+
+        results[f"fees/{strategy_type.__name__}"] = {
+            "scalar_tickets_per_s": FEE_TICKETS / scalar_s,
+            "batch_tickets_per_s": FEE_TICKETS / batch_s,
+        }
+    return results
+
+
+# ----- Suite, output and comparison -----
+
+
+def run_suite(lot_sizes, mode: ConcurrencyMode) -> dict:
+    results: Dict[str, Dict[str, float]] = {}
+    for total_spots in lot_sizes:
+        parking_lot = _setup_parking_lot(total_spots, mode)
+        for strategy_type in STRATEGIES:
+            parking_lot.set_parking_strategy(strategy_type())
+            for threads in THREAD_COUNTS:
+                key = f"park_unpark/{strategy_type.__name__}/spots={total_spots}/threads={threads}"
+                results[key] = bench_park_unpark(parking_lot, threads)
+                print(_format_row(key, results[key]), flush=True)
+    for key, metrics in bench_fees().items():
+        results[key] = metrics
+        print(_format_row(key, metrics), flush=True)
+    parking_lot.clear()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "concurrency_mode": mode.name,
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+
+
+def _format_row(key: str, metrics: Dict[str, float]) -> str:
+    return f"{key:<60} " + "  ".join(f"{name} {value:,.1f}" for name, value in metrics.items())
+
+
+def _is_rate(metric: str) -> bool:
+    """Rates (…_per_s) are better when higher; latencies (…_us) when lower."""
+    return metric.endswith("_per_s")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Returns a description of every metric that is worse than the baseline by
+    more than threshold, and of every baseline metric the current run lacks
+    (e.g. a lot size or strategy that was dropped), so coverage cannot shrink
+    unnoticed.
+    """
+    regressions = []
+    for key, baseline_metrics in baseline["results"].items():
+        metrics = current["results"].get(key)
+        if metrics is None:
+            regressions.append(f"{key}: missing from this run")
+            continue
+        for metric, old in baseline_metrics.items():
+            value = metrics.get(metric)
+            if value is None:
+                regressions.append(f"{key} {metric}: missing from this run")
+                continue
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if _is_rate(metric) else change
+            if worse > threshold:
+                regressions.append(
+                    f"{key} {metric}: {old:,.1f} -> {value:,.1f} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15,
+        help="relative slowdown that counts as a regression (default 0.15)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true",
+        help="skip the 1M-spot lot (compare against a --quick baseline)",
+    )
+    parser.add_argument(
+        "--mode", choices=[mode.name for mode in ConcurrencyMode],
+        default=ConcurrencyMode.FINE_GRAINED.name, help="lot concurrency mode",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        QUICK_LOT_SIZES if args.quick else LOT_SIZES, ConcurrencyMode[args.mode]
+    )
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"REGRESSIONS (threshold {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,8 +31,7 @@ class AdvancedParkingLotDemo:
         parking_lot = ParkingLot.get_instance()
 
         # Clear existing floors and tickets for a clean run
-        parking_lot.floors.clear()
-        parking_lot.activeTickets.clear()
+        parking_lot.clear()
 
         # Create 3 floors with a specific layout for testing strategies
         floor1 = ParkingFloor(1)
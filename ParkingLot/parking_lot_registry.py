@@ -0,0 +1,250 @@
+"""
+Registries of independent ParkingLot instances, one per garage, routed by lot ID.
+
+ParkingLotRegistry keeps every lot in the current process. Each lot has its own
+floors, strategies and locks, so a busy garage never holds another garage's
+locks.
+
+ProcessParkingLotRegistry spreads the lots over a fixed pool of worker
+processes, so throughput scales with cores instead of being capped by one
+interpreter. Each lot lives in exactly one worker and is reached over a pipe.
+Vehicles travel as (type name, plate, size) and tickets come back as
+ParkingLot.ticket_row lists, so nothing holding a lock ever crosses a process
+boundary.
+"""
+
+import multiprocessing
+import os
+import threading
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor
+from parking_strategy import ParkingStrategy
+from fee_strategy import FeeStrategy
+from event_sink import NullEventSink
+from floor_layout import build_floor, build_vehicle
+from vehicle import Vehicle
+from vehicle_size import VehicleSize
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# How a vehicle is sent to a worker: (vehicle class name, license number, size value)
+VehicleSpec = Tuple[str, str, int]
+
+
+class ParkingLotRegistry:
+    """Independent lots in this process, looked up by lot ID."""
+
+    def __init__(self):
+        self._lots: Dict[str, ParkingLot] = {}
+        self._lock = threading.Lock()  # Guards the lot table only, never a lot's state
+
+    def create_lot(
+        self,
+        lot_id: str,
+        floors: Iterable[ParkingFloor] = (),
+        parking_strategy: Optional[ParkingStrategy] = None,
+        fee_strategy: Optional[FeeStrategy] = None,
+    ) -> ParkingLot:
+        """Creates and registers a new lot; raises ValueError if the ID is taken."""
+        lot = ParkingLot.create(lot_id)
+        if parking_strategy is not None:
+            lot.set_parking_strategy(parking_strategy)
+        if fee_strategy is not None:
+            lot.set_fee_strategy(fee_strategy)
+        for floor in floors:
+            lot.add_floor(floor)
+        with self._lock:
+            if lot_id in self._lots:
+                raise ValueError(f"Lot {lot_id} already exists.")
+            self._lots[lot_id] = lot
+        return lot
+
+    def remove_lot(self, lot_id: str):
+        with self._lock:
+            del self._lots[lot_id]
+
+    def get_lot(self, lot_id: str) -> ParkingLot:
+        """Returns the lot with this ID; raises KeyError if there is none."""
+        lot = self._lots.get(lot_id)
+        if lot is None:
+            raise KeyError(f"Unknown lot: {lot_id}")
+        return lot
+
+    def get_lot_ids(self) -> List[str]:
+        return list(self._lots)
+
+    def park_vehicle(self, lot_id: str, vehicle: Vehicle):
+        return self.get_lot(lot_id).park_vehicle(vehicle)
+
+    def park_vehicles(self, lot_id: str, vehicles: Iterable[Vehicle]):
+        return self.get_lot(lot_id).park_vehicles(vehicles)
+
+    def unpark_vehicle(self, lot_id: str, license_number: str) -> Optional[float]:
+        return self.get_lot(lot_id).unpark_vehicle(license_number)
+
+    def unpark_vehicles(self, lot_id: str, license_numbers: Iterable[str]) -> List[Optional[float]]:
+        return self.get_lot(lot_id).unpark_vehicles(license_numbers)
+
+
+def vehicle_spec(vehicle: Vehicle) -> VehicleSpec:
+    """The picklable form of a vehicle sent to a worker process."""
+    return (type(vehicle).__name__, vehicle.get_license_number(), vehicle.get_size().value)
+
+
+# ----- Worker process side -----
+
+
+def _create_lot(registry, lot_id, layouts, parking_strategy, fee_strategy):
+    lot = registry.create_lot(
+        lot_id, [build_floor(layout) for layout in layouts], parking_strategy, fee_strategy
+    )
+    # Events stay inside the worker; callers get tickets and fees as results
+    lot.set_event_sink(NullEventSink())
+
+
+def _park_vehicles(registry, lot_id, specs):
+    tickets = registry.park_vehicles(lot_id, [build_vehicle(*spec) for spec in specs])
+    return [ParkingLot.ticket_row(ticket) if ticket is not None else None for ticket in tickets]
+
+
+def _free_counts(registry, lot_id):
+    lot = registry.get_lot(lot_id)
+    return {
+        floor.floor_number: {size.name: floor.get_free_count(size) for size in VehicleSize}
+        for floor in lot.floors
+    }
+
+
+_HANDLERS = {
+    "create_lot": _create_lot,
+    "remove_lot": lambda registry, lot_id: registry.remove_lot(lot_id),
+    "park_vehicles": _park_vehicles,
+    "unpark_vehicles": lambda registry, lot_id, plates: registry.unpark_vehicles(lot_id, plates),
+    "free_counts": _free_counts,
+}
+
+
+def _serve(connection):
+    """Worker loop: runs commands against this worker's lots until told to stop."""
+    registry = ParkingLotRegistry()
+    while True:
+        command = connection.recv()
+        if command is None:
+            break
+        op, lot_id, args = command
+        try:
+            connection.send((True, _HANDLERS[op](registry, lot_id, *args)))
+        except Exception as error:
+            connection.send((False, error))
+    connection.close()
+
+
+# ----- Parent process side -----
+
+
+class ProcessParkingLotRegistry:
+    """
+    Runs lots on a pool of worker processes. Each new lot goes to the worker
+    with the fewest lots. Calls for lots on different workers run in parallel;
+    calls for lots on the same worker are served one at a time.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        workers = workers or os.cpu_count() or 1
+        # spawn: workers start from a clean interpreter, not a fork of our threads
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        for _ in range(workers):
+            parent_end, worker_end = context.Pipe()
+            process = context.Process(target=_serve, args=(worker_end,), daemon=True)
+            process.start()
+            worker_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+        self._worker_locks = [threading.Lock() for _ in range(workers)]
+        self._lot_counts = [0] * workers
+        self._placement: Dict[str, int] = {}  # lot ID -> worker index
+        self._lock = threading.Lock()
+
+    def get_worker_count(self) -> int:
+        return len(self._processes)
+
+    def create_lot(
+        self,
+        lot_id: str,
+        floors: Iterable[ParkingFloor] = (),
+        parking_strategy: Optional[ParkingStrategy] = None,
+        fee_strategy: Optional[FeeStrategy] = None,
+    ):
+        """Creates a lot on the least loaded worker from the given floors' layouts."""
+        layouts = [floor.to_layout() for floor in floors]
+        with self._lock:
+            if lot_id in self._placement:
+                raise ValueError(f"Lot {lot_id} already exists.")
+            worker = self._lot_counts.index(min(self._lot_counts))
+            self._placement[lot_id] = worker
+            self._lot_counts[worker] += 1
+        try:
+            self._call(worker, "create_lot", lot_id, layouts, parking_strategy, fee_strategy)
+        except Exception:
+            with self._lock:
+                del self._placement[lot_id]
+                self._lot_counts[worker] -= 1
+            raise
+
+    def remove_lot(self, lot_id: str):
+        worker = self._worker_for(lot_id)
+        self._call(worker, "remove_lot", lot_id)
+        with self._lock:
+            del self._placement[lot_id]
+            self._lot_counts[worker] -= 1
+
+    def get_lot_ids(self) -> List[str]:
+        return list(self._placement)
+
+    def park_vehicle(self, lot_id: str, vehicle: Vehicle) -> Optional[list]:
+        """Parks one vehicle; returns its ticket row, or None if the lot is full."""
+        return self.park_vehicles(lot_id, [vehicle])[0]
+
+    def park_vehicles(self, lot_id: str, vehicles: Iterable[Vehicle]) -> List[Optional[list]]:
+        """Parks a batch in one round trip; returns one ticket row (or None) per vehicle."""
+        specs = [vehicle_spec(vehicle) for vehicle in vehicles]
+        return self._call(self._worker_for(lot_id), "park_vehicles", lot_id, specs)
+
+    def unpark_vehicle(self, lot_id: str, license_number: str) -> Optional[float]:
+        return self.unpark_vehicles(lot_id, [license_number])[0]
+
+    def unpark_vehicles(self, lot_id: str, license_numbers: Iterable[str]) -> List[Optional[float]]:
+        """Unparks a batch in one round trip; returns one fee (or None) per plate."""
+        return self._call(
+            self._worker_for(lot_id), "unpark_vehicles", lot_id, list(license_numbers)
+        )
+
+    def get_free_counts(self, lot_id: str) -> Dict[int, Dict[str, int]]:
+        """Free spots per floor number and size name."""
+        return self._call(self._worker_for(lot_id), "free_counts", lot_id)
+
+    def close(self):
+        """Stops every worker process."""
+        for worker, connection in enumerate(self._connections):
+            with self._worker_locks[worker]:
+                connection.send(None)
+                connection.close()
+        for process in self._processes:
+            process.join()
+
+    def _worker_for(self, lot_id: str) -> int:
+        worker = self._placement.get(lot_id)
+        if worker is None:
+            raise KeyError(f"Unknown lot: {lot_id}")
+        return worker
+
+    def _call(self, worker: int, op: str, lot_id: str, *args):
+        # One request in flight per pipe; waiting on recv releases the GIL
+        with self._worker_locks[worker]:
+            connection = self._connections[worker]
+            connection.send((op, lot_id, args))
+            ok, result = connection.recv()
+        if not ok:
+            raise result
+        return result
@@ -0,0 +1,92 @@
+"""
+Drives many garages at once through a ParkingLotRegistry (threads in one
+process) and a ProcessParkingLotRegistry (a worker pool), one gate thread per
+garage, and reports the combined park/unpark throughput of each.
+"""
+
+import os
+import threading
+import time
+from parking_lot_registry import ParkingLotRegistry, ProcessParkingLotRegistry
+from parking_floor import ParkingFloor
+from event_sink import NullEventSink
+from parking_spot import ParkingSpot
+from vehicle_size import VehicleSize
+from bike import Bike
+from car import Car
+from truck import Truck
+
+LOTS = 60
+FLOORS_PER_LOT = 3
+SPOTS_PER_SIZE = 40
+ROUNDS = 40
+BATCH = 30
+
+
+def _build_floors():
+    floors = []
+    for floor_number in range(1, FLOORS_PER_LOT + 1):
+        floor = ParkingFloor(floor_number)
+        floor.add_spots(
+            ParkingSpot(f"F{floor_number}-{size.name[0]}{i}", size)
+            for size in VehicleSize
+            for i in range(SPOTS_PER_SIZE)
+        )
+        floors.append(floor)
+    return floors
+
+
+def _gate(registry, lot_id: str, failures: list):
+    vehicle_types = [Bike, Car, Truck]
+    for round_number in range(ROUNDS):
+        vehicles = [
+            vehicle_types[i % 3](f"{lot_id}-{round_number}-{i}") for i in range(BATCH)
+        ]
+        tickets = registry.park_vehicles(lot_id, vehicles)
+        parked = [
+            vehicle.get_license_number()
+            for vehicle, ticket in zip(vehicles, tickets)
+            if ticket is not None
+        ]
+        fees = registry.unpark_vehicles(lot_id, parked)
+        if len(parked) != BATCH or None in fees:
+            failures.append(lot_id)
+
+
+def _run(registry, label: str):
+    for lot_id in [f"garage-{n}" for n in range(LOTS)]:
+        registry.create_lot(lot_id, _build_floors())
+        if isinstance(registry, ParkingLotRegistry):
+            # Worker lots already drop their events; quiet the in-process ones too
+            registry.get_lot(lot_id).set_event_sink(NullEventSink())
+
+    failures = []
+    gates = [
+        threading.Thread(target=_gate, args=(registry, lot_id, failures))
+        for lot_id in registry.get_lot_ids()
+    ]
+    start = time.perf_counter()
+    for gate in gates:
+        gate.start()
+    for gate in gates:
+        gate.join()
+    elapsed = time.perf_counter() - start
+
+    operations = LOTS * ROUNDS * BATCH * 2
+    print(f"{label:>28}: {operations / elapsed:>10,.0f} operations/s")
+    if failures:
+        raise SystemExit(f"FAILED: {len(failures)} batches did not park and unpark fully")
+
+
+def main():
+    print(f"{LOTS} lots, one gate thread each, {os.cpu_count()} CPU(s)")
+    _run(ParkingLotRegistry(), "in-process registry")
+    process_registry = ProcessParkingLotRegistry()
+    try:
+        _run(process_registry, f"process pool ({process_registry.get_worker_count()} workers)")
+    finally:
+        process_registry.close()
+
+
+if __name__ == "__main__":
+    main()
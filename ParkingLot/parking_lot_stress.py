@@ -0,0 +1,116 @@
+"""
+A multi-threaded stress driver for the fine-grained concurrency mode.
+Twenty gate threads park and unpark cars as fast as they can while a checker
+records every spot handed out; any spot assigned to two vehicles at once is
+reported as a double booking.
+"""
+
+import random
+import threading
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor
+from parking_spot import ParkingSpot
+from concurrency_mode import ConcurrencyMode
+from event_sink import NullEventSink
+from vehicle_size import VehicleSize
+from bike import Bike
+from car import Car
+from truck import Truck
+
+
+class ParkingLotStress:
+    GATES = 20
+    OPERATIONS_PER_GATE = 2000
+    FLOORS = 5
+    SPOTS_PER_SIZE = 20
+
+    def __init__(self):
+        self.assigned = {}  # spot id -> license number currently holding it
+        self.violations = []
+        self._check_lock = threading.Lock()
+
+    @staticmethod
+    def _setup_parking_lot() -> ParkingLot:
+        parking_lot = ParkingLot.get_instance()
+        parking_lot.clear()
+        parking_lot.set_concurrency_mode(ConcurrencyMode.FINE_GRAINED)
+        # Drop the per-vehicle events so they don't dominate the run
+        parking_lot.set_event_sink(NullEventSink())
+        for floor_number in range(1, ParkingLotStress.FLOORS + 1):
+            floor = ParkingFloor(floor_number)
+            for size in VehicleSize:
+                for i in range(ParkingLotStress.SPOTS_PER_SIZE):
+                    floor.add_spot(
+                        ParkingSpot(f"F{floor_number}-{size.name[0]}{i}", size)
+                    )
+            parking_lot.add_floor(floor)
+        return parking_lot
+
+    def _record_park(self, license_number: str, spot_id: str):
+        with self._check_lock:
+            holder = self.assigned.get(spot_id)
+            if holder is not None:
+                self.violations.append((spot_id, holder, license_number))
+            self.assigned[spot_id] = license_number
+
+    def _record_unpark(self, spot_id: str):
+        with self._check_lock:
+            self.assigned.pop(spot_id, None)
+
+    def _gate(self, parking_lot: ParkingLot, gate: int):
+        rng = random.Random(gate)
+        vehicle_types = [Bike, Car, Truck]
+        parked = []  # (license number, spot id) parked through this gate
+        for op in range(self.OPERATIONS_PER_GATE):
+            if parked and rng.random() < 0.5:
+                license_number, spot_id = parked.pop(rng.randrange(len(parked)))
+                # Release the record first so the spot can't look double-booked
+                self._record_unpark(spot_id)
+                parking_lot.unpark_vehicle(license_number)
+            else:
+                vehicle = rng.choice(vehicle_types)(f"G{gate}-{op}")
+                ticket = parking_lot.park_vehicle(vehicle)
+                if ticket is not None:
+                    spot_id = ticket.get_spot().get_spot_id()
+                    self._record_park(vehicle.get_license_number(), spot_id)
+                    parked.append((vehicle.get_license_number(), spot_id))
+
+    def run(self):
+        parking_lot = self._setup_parking_lot()
+        gates = [
+            threading.Thread(target=self._gate, args=(parking_lot, gate))
+            for gate in range(self.GATES)
+        ]
+        for thread in gates:
+            thread.start()
+        for thread in gates:
+            thread.join()
+
+        occupied = sum(
+            spot.is_occupied_spot()
+            for floor in parking_lot.floors
+            for spot in floor.spots.values()
+        )
+        print(f"Gates: {self.GATES}, operations per gate: {self.OPERATIONS_PER_GATE}")
+        print(f"Active tickets: {len(parking_lot.activeTickets)}, occupied spots: {occupied}")
+        if self.violations:
+            print(f"FAILED: {len(self.violations)} double bookings, e.g. {self.violations[0]}")
+            raise SystemExit(1)
+        if occupied != len(parking_lot.activeTickets):
+            print("FAILED: occupied spots and active tickets disagree")
+            raise SystemExit(1)
+        for floor in parking_lot.floors:
+            for size in VehicleSize:
+                free = sum(
+                    1
+                    for spot in floor.spots.values()
+                    if spot.get_spot_size() == size and not spot.is_occupied_spot()
+                )
+                if free != floor.get_free_count(size):
+                    print(f"FAILED: floor {floor.floor_number} {size.name} counter drifted")
+                    raise SystemExit(1)
+        print("PASSED: no spot was ever assigned twice")
+
+
+if __name__ == "__main__":
+    ParkingLotStress().run()
@@ -0,0 +1,351 @@
+"""
+A discrete-event simulator for capacity planning.
+
+It replays a stream of arrivals (synthetic or recorded) through ParkingLot on a
+ManualClock, so a day of traffic runs in seconds, and reports admission
+rejections, spot-finding cost and fee revenue for each combination of
+ParkingStrategy and FeeStrategy.
+
+Run it directly for a synthetic comparison, or pass a CSV of recorded arrivals:
+    python parking_simulator.py [arrivals.csv]
+The CSV needs the columns arrival_ms, license_number, vehicle_type, dwell_ms.
+"""
+
+import csv
+import heapq
+import random
+import sys
+import time
+from clock import ManualClock
+from parking_lot import ParkingLot
+from parking_floor import ParkingFloor, SpotFilter
+from parking_spot import ParkingSpot
+from parking_strategy import (
+    ParkingStrategy,
+    NearestFirstStrategy,
+    FarthestFirstStrategy,
+    BestFitStrategy,
+    call_find_spot,
+)
+from fee_strategy import FeeStrategy, FlatRateFeeStrategy, VehicleBasedFeeStrategy
+from lot_availability import LotAvailability
+from overflow_policy import OverflowPolicy
+from concurrency_mode import ConcurrencyMode
+from event_sink import NullEventSink
+from floor_layout import VEHICLE_TYPES
+from vehicle import Vehicle
+from vehicle_size import VehicleSize
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+MS_PER_HOUR = 60 * 60 * 1000
+
+
+class Arrival:
+    """One vehicle entering the lot at arrival_ms and staying for dwell_ms."""
+
+    __slots__ = ("arrival_ms", "license_number", "vehicle_type", "dwell_ms")
+
+    def __init__(self, arrival_ms: int, license_number: str, vehicle_type: str, dwell_ms: int):
+        self.arrival_ms = arrival_ms
+        self.license_number = license_number
+        self.vehicle_type = vehicle_type  # A key of floor_layout.VEHICLE_TYPES
+        self.dwell_ms = dwell_ms
+
+
+def synthetic_arrivals(
+    count: int,
+    arrivals_per_hour: float,
+    mean_dwell_ms: int = 2 * MS_PER_HOUR,
+    vehicle_mix: Optional[dict] = None,
+    start_ms: int = 0,
+    seed: int = 1,
+) -> Iterator[Arrival]:
+    """
+    Generates a seeded Poisson arrival stream with exponentially distributed
+    dwell times. vehicle_mix maps vehicle type names to relative weights.
+    """
+    vehicle_mix = vehicle_mix or {"Bike": 2, "Car": 7, "Truck": 1}
+    names = list(vehicle_mix)
+    weights = [vehicle_mix[name] for name in names]
+    rng = random.Random(seed)
+    mean_gap_ms = MS_PER_HOUR / arrivals_per_hour
+    now = float(start_ms)
+    for index in range(count):
+        now += rng.expovariate(1.0 / mean_gap_ms)
+        yield Arrival(
+            int(now),
+            f"SIM-{index}",
+            rng.choices(names, weights)[0],
+            max(1, int(rng.expovariate(1.0 / mean_dwell_ms))),
+        )
+
+
+def load_arrivals(path: str) -> List[Arrival]:
+    """Reads a recorded arrival stream from a CSV file, sorted by arrival time."""
+    with open(path, newline="") as csv_file:
+        arrivals = [
+            Arrival(
+                int(row["arrival_ms"]),
+                row["license_number"],
+                row["vehicle_type"],
+                int(row["dwell_ms"]),
+            )
+            for row in csv.DictReader(csv_file)
+        ]
+    arrivals.sort(key=lambda arrival: arrival.arrival_ms)
+    return arrivals
+
+
+class TimedParkingStrategy(ParkingStrategy):
+    """Wraps another strategy and measures how long its find_spot calls take."""
+
+    def __init__(self, strategy: ParkingStrategy):
+        self.strategy = strategy
+        self.calls = 0
+        self.total_ns = 0
+
+    def find_spot(
+        self,
+        floors: List[ParkingFloor],
+        vehicle: Vehicle,
+        availability: Optional[LotAvailability] = None,
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional[OverflowPolicy] = None,
+    ) -> Optional[ParkingSpot]:
+        start = time.perf_counter_ns()
+        spot = call_find_spot(self.strategy, floors, vehicle, availability, spot_filter, overflow)
+        self.total_ns += time.perf_counter_ns() - start
+        self.calls += 1
+        return spot
+
+
+class SimulationResult:
+    """The outcome of replaying one arrival stream with one strategy pair."""
+
+    def __init__(
+        self,
+        parking_strategy: str,
+        fee_strategy: str,
+        arrivals: int,
+        rejections: int,
+        revenue: float,
+        strategy_ns: int,
+        events: int,
+        wall_seconds: float,
+        peak_occupancy: int,
+        unmatched_departures: int = 0,
+    ):
+        self.parking_strategy = parking_strategy
+        self.fee_strategy = fee_strategy
+        self.arrivals = arrivals
+        self.rejections = rejections
+        self.revenue = revenue
+        self.strategy_ns = strategy_ns  # Total time spent in find_spot
+        self.events = events  # Arrivals plus departures processed
+        self.wall_seconds = wall_seconds
+        self.peak_occupancy = peak_occupancy
+        # Departures the lot had no ticket for (e.g. a plate recorded twice)
+        self.unmatched_departures = unmatched_departures
+
+    def get_rejection_rate(self) -> float:
+        return self.rejections / self.arrivals if self.arrivals else 0.0
+
+    def get_strategy_cost_us(self) -> float:
+        """Average find_spot time per arrival, in microseconds."""
+        return self.strategy_ns / self.arrivals / 1000 if self.arrivals else 0.0
+
+    def get_events_per_minute(self) -> float:
+        return self.events / self.wall_seconds * 60 if self.wall_seconds else 0.0
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.parking_strategy:>22} + {self.fee_strategy:<24} "
+            f"rejected {self.rejections:>7} ({self.get_rejection_rate():6.2%}), "
+            f"find_spot {self.get_strategy_cost_us():6.2f} us, "
+            f"revenue ${self.revenue:>14,.2f}, peak {self.peak_occupancy:>6}, "
+            f"{self.get_events_per_minute():>12,.0f} events/min"
+        )
+        if self.unmatched_departures:
+            text += f", {self.unmatched_departures} unmatched departures"
+        return text
+
+
+class ParkingSimulator:
+    """
+    Drives the ParkingLot singleton with an arrival stream in simulated time.
+    Departures are kept in a min-heap keyed by departure time and processed
+    before any arrival at the same or a later time, so spots free up first.
+    """
+
+    def __init__(
+        self,
+        build_floors: Callable[[], List[ParkingFloor]],
+        arrivals: Sequence[Arrival],
+    ):
+        """build_floors is called before every run to get a fresh, empty layout."""
+        self.build_floors = build_floors
+        self.arrivals = arrivals
+
+    def run(
+        self, parking_strategy: ParkingStrategy, fee_strategy: FeeStrategy
+    ) -> SimulationResult:
+        """
+        Replays the arrivals with one strategy pair. The lot's clock, event
+        sink, strategies and concurrency mode, and the fee strategy's clock,
+        are put back afterwards, so the singleton is not left on simulated time.
+        """
+        clock = ManualClock(self.arrivals[0].arrival_ms if self.arrivals else 0)
+        timed_strategy = TimedParkingStrategy(parking_strategy)
+        parking_lot = ParkingLot.get_instance()
+        lot_settings = (
+            parking_lot.clock,
+            parking_lot.event_sink,
+            parking_lot.parking_strategy,
+            parking_lot.fee_strategy,
+            parking_lot.concurrency_mode,
+        )
+        # Subclasses that skip FeeStrategy.__init__ have no clock of their own
+        had_fee_clock = "clock" in vars(fee_strategy)
+        fee_clock = getattr(fee_strategy, "clock", None)
+        fee_strategy.clock = clock
+        try:
+            self._setup_parking_lot(parking_lot, clock, timed_strategy, fee_strategy)
+            return self._replay(parking_lot, clock, parking_strategy, fee_strategy, timed_strategy)
+        finally:
+            if had_fee_clock:
+                fee_strategy.clock = fee_clock
+            else:
+                del fee_strategy.clock
+            (
+                parking_lot.clock,
+                parking_lot.event_sink,
+                parking_lot.parking_strategy,
+                parking_lot.fee_strategy,
+                concurrency_mode,
+            ) = lot_settings
+            parking_lot.set_concurrency_mode(concurrency_mode)
+
+    def _replay(
+        self,
+        parking_lot: ParkingLot,
+        clock: ManualClock,
+        parking_strategy: ParkingStrategy,
+        fee_strategy: FeeStrategy,
+        timed_strategy: TimedParkingStrategy,
+    ) -> SimulationResult:
+        departures = []  # (departure time, license number)
+        rejections = 0
+        unmatched_departures = 0
+        revenue = 0.0
+        events = 0
+        peak_occupancy = 0
+
+        def depart(departure_ms: int, license_number: str):
+            nonlocal revenue, unmatched_departures, events
+            clock.set(departure_ms)
+            fee = parking_lot.unpark_vehicle(license_number)
+            if fee is None:
+                # No ticket: the plate left already, e.g. it was recorded twice
+                unmatched_departures += 1
+            else:
+                revenue += fee
+            events += 1
+
+        start = time.perf_counter()
+        for arrival in self.arrivals:
+            while departures and departures[0][0] <= arrival.arrival_ms:
+                depart(*heapq.heappop(departures))
+
+            clock.set(arrival.arrival_ms)
+            vehicle = VEHICLE_TYPES[arrival.vehicle_type](arrival.license_number)
+            events += 1
+            if parking_lot.park_vehicle(vehicle) is None:
+                rejections += 1
+                continue
+            heapq.heappush(departures, (arrival.arrival_ms + arrival.dwell_ms, arrival.license_number))
+            if len(departures) > peak_occupancy:
+                peak_occupancy = len(departures)
+
+        # Let the remaining vehicles leave so their fees count too
+        while departures:
+            depart(*heapq.heappop(departures))
+        wall_seconds = time.perf_counter() - start
+
+        return SimulationResult(
+            type(parking_strategy).__name__,
+            type(fee_strategy).__name__,
+            len(self.arrivals),
+            rejections,
+            revenue,
+            timed_strategy.total_ns,
+            events,
+            wall_seconds,
+            peak_occupancy,
+            unmatched_departures,
+        )
+
+    def compare(
+        self,
+        parking_strategies: Iterable[ParkingStrategy],
+        fee_strategies: Iterable[FeeStrategy],
+    ) -> List[SimulationResult]:
+        """Runs every parking strategy against every fee strategy."""
+        fee_strategies = list(fee_strategies)
+        return [
+            self.run(parking_strategy, fee_strategy)
+            for parking_strategy in parking_strategies
+            for fee_strategy in fee_strategies
+        ]
+
+    def _setup_parking_lot(
+        self,
+        parking_lot: ParkingLot,
+        clock: ManualClock,
+        parking_strategy: ParkingStrategy,
+        fee_strategy: FeeStrategy,
+    ):
+        parking_lot.clear()
+        # A single driver thread: the global lock is never contended
+        parking_lot.set_concurrency_mode(ConcurrencyMode.GLOBAL_LOCK)
+        parking_lot.set_event_sink(NullEventSink())
+        parking_lot.set_clock(clock)
+        parking_lot.set_parking_strategy(parking_strategy)
+        parking_lot.set_fee_strategy(fee_strategy)
+        for floor in self.build_floors():
+            parking_lot.add_floor(floor)
+
+
+def build_sample_floors(floors: int = 10, spots_per_size: int = 100) -> List[ParkingFloor]:
+    """A uniform layout with the same number of spots of each size on every floor."""
+    built = []
+    for floor_number in range(1, floors + 1):
+        floor = ParkingFloor(floor_number)
+        floor.add_spots(
+            ParkingSpot(f"F{floor_number}-{size.name[0]}{i}", size)
+            for size in VehicleSize
+            for i in range(spots_per_size)
+        )
+        built.append(floor)
+    return built
+
+
+def main():
+    if len(sys.argv) > 1:
+        arrivals = load_arrivals(sys.argv[1])
+        print(f"Replaying {len(arrivals)} recorded arrivals from {sys.argv[1]}")
+    else:
+        # About five days of busy traffic, close to the sample layout's capacity
+        arrivals = list(synthetic_arrivals(120_000, arrivals_per_hour=1_000))
+        print(f"Replaying {len(arrivals)} synthetic arrivals")
+
+    simulator = ParkingSimulator(build_sample_floors, arrivals)
+    results = simulator.compare(
+        [NearestFirstStrategy(), FarthestFirstStrategy(), BestFitStrategy()],
+        [FlatRateFeeStrategy(), VehicleBasedFeeStrategy()],
+    )
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
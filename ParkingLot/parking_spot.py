@@ -1,7 +1,12 @@
 from vehicle import Vehicle
 from vehicle_size import VehicleSize
+from typing import Optional, TYPE_CHECKING
 import threading
 
+if TYPE_CHECKING:
+    from parking_floor import ParkingFloor
+    from overflow_policy import OverflowPolicy
+
 
 class ParkingSpot:
     def __init__(self, spot_id: str, spot_size: VehicleSize):
@@ -9,6 +14,7 @@ class ParkingSpot:
         self.spot_size = spot_size
         self.is_occupied = False
         self.parked_vehicle = None
+        self._floor: Optional["ParkingFloor"] = None  # Set when the spot is added to a floor
         self._lock = threading.Lock()
 
     def get_spot_id(self) -> str:
@@ -17,6 +23,12 @@ class ParkingSpot:
     def get_spot_size(self) -> VehicleSize:
         return self.spot_size
 
+    def get_floor(self) -> Optional["ParkingFloor"]:
+        return self._floor
+
+    def set_floor(self, floor: "ParkingFloor"):
+        self._floor = floor
+
     def is_available(self) -> bool:
         with self._lock:
             return not self.is_occupied
@@ -26,17 +38,47 @@ class ParkingSpot:
 
     def park_vehicle(self, vehicle: Vehicle):
         with self._lock:
+            was_occupied = self.is_occupied
+            self.parked_vehicle = vehicle
+            self.is_occupied = True
+        # Tell the owning floor outside the spot lock so its free-spot index stays current
+        if not was_occupied and self._floor is not None:
+            self._floor.on_spot_parked(self)
+
+    def try_claim(self, vehicle: Vehicle, notify_floor: bool = True) -> bool:
+        """
+        Atomically parks the vehicle only if the spot is still free.
+        Returns False if another thread claimed it first.
+        Without notify_floor the caller updates the floor's counters itself
+        (a floor claiming a batch of spots does it once per batch).
+        """
+        with self._lock:
+            if self.is_occupied:
+                return False
             self.parked_vehicle = vehicle
             self.is_occupied = True
+        if notify_floor and self._floor is not None:
+            self._floor.on_spot_parked(self)
+        return True
 
-    def unpark_vehicle(self):
+    def unpark_vehicle(self, notify_floor: bool = True) -> bool:
+        """Frees the spot; returns False if it was already free."""
         with self._lock:
+            was_occupied = self.is_occupied
             self.parked_vehicle = None
             self.is_occupied = False
+        if notify_floor and was_occupied and self._floor is not None:
+            self._floor.on_spot_unparked(self)
+        return was_occupied
 
-    def can_fit_vehicle(self, vehicle: Vehicle) -> bool:
+    def can_fit_vehicle(
+        self, vehicle: Vehicle, overflow: Optional["OverflowPolicy"] = None
+    ) -> bool:
+        """Exact size match only, unless an overflow policy allows this larger spot."""
         if self.is_occupied:
             return False
+        if overflow is not None:
+            return overflow.get_cost(vehicle.get_size(), self.spot_size) is not None
 
         if vehicle.get_size() == VehicleSize.SMALL:
             return self.spot_size == VehicleSize.SMALL
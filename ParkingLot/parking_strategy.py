@@ -1,9 +1,12 @@
+import inspect
 from abc import ABC, abstractmethod
-from parking_floor import ParkingFloor
+from parking_floor import ParkingFloor, SpotFilter
 from vehicle import Vehicle
 from parking_spot import ParkingSpot
 from vehicle_size import VehicleSize
-from typing import List, Optional
+from lot_availability import LotAvailability
+from overflow_policy import OverflowPolicy
+from typing import Dict, List, Optional, Tuple
 
 
 class ParkingStrategy(ABC):
@@ -14,64 +17,155 @@ class ParkingStrategy(ABC):
 
     @abstractmethod
     def find_spot(
-        self, floors: List[ParkingFloor], vehicle: Vehicle
+        self,
+        floors: List[ParkingFloor],
+        vehicle: Vehicle,
+        availability: Optional[LotAvailability] = None,
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional[OverflowPolicy] = None,
     ) -> Optional[ParkingSpot]:
-        """The method that each concrete strategy must implement."""
+        """
+        The method that each concrete strategy must implement.
+        When the lot passes its availability summary, strategies use it to visit
+        only the floors that actually have a free spot of the right size.
+        spot_filter, if given, is passed on to the floors so that spots it
+        rejects (e.g. ones reserved soon) are skipped.
+        overflow, if given, also allows larger spots at the policy's cost.
+        """
         pass
 
+    @staticmethod
+    def _sizes_for(vehicle: Vehicle, overflow: Optional[OverflowPolicy]) -> List[VehicleSize]:
+        """The spot sizes the vehicle may take, cheapest first."""
+        if overflow is None:
+            return [vehicle.get_size()]
+        return overflow.get_candidate_sizes(vehicle.get_size())
+
+    @classmethod
+    def _find_cheapest(
+        cls,
+        floors: List[ParkingFloor],
+        vehicle: Vehicle,
+        availability: Optional[LotAvailability],
+        spot_filter: Optional[SpotFilter],
+        overflow: Optional[OverflowPolicy],
+        descending: bool = False,
+    ) -> Optional[ParkingSpot]:
+        """
+        Tries the vehicle's own size on every floor before any larger size, so a
+        larger spot is only used when no cheaper size is free anywhere. Within a
+        size, floors are visited lowest first (highest first if descending).
+        """
+        availability = cls._usable(floors, availability)
+        for size in cls._sizes_for(vehicle, overflow):
+            if availability is not None:
+                # The per-size bitmask names the floors worth looking at
+                candidates = (
+                    floors[index] for index in availability.floors_with(size, descending)
+                )
+            else:
+                candidates = reversed(floors) if descending else iter(floors)
+            for floor in candidates:
+                spot = floor.find_free_spot_of_size(size, spot_filter)
+                if spot is not None:
+                    return spot
+        return None
+
+    @staticmethod
+    def _usable(
+        floors: List[ParkingFloor], availability: Optional[LotAvailability]
+    ) -> Optional[LotAvailability]:
+        """Returns the summary only if it describes exactly this list of floors."""
+        if availability is not None and availability.get_floor_count() == len(floors):
+            return availability
+        return None
+
 
 class NearestFirstStrategy(ParkingStrategy):
     """A concrete strategy that finds a spot on the lowest possible floor."""
 
     def find_spot(
-        self, floors: List[ParkingFloor], vehicle: Vehicle
+        self,
+        floors: List[ParkingFloor],
+        vehicle: Vehicle,
+        availability: Optional[LotAvailability] = None,
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional[OverflowPolicy] = None,
     ) -> Optional[ParkingSpot]:
-        # Iterate through floors from the first to the last
-        for floor in floors:
-            spot = floor.find_available_spot(vehicle)
-            if spot is not None:
-                return spot  # Return the first spot found
-        return None
+        # Lowest floor with a spot of the vehicle's size; with an overflow
+        # policy, larger sizes only once that size is full on every floor
+        return self._find_cheapest(floors, vehicle, availability, spot_filter, overflow)
 
 
 class FarthestFirstStrategy(ParkingStrategy):
     """A concrete strategy that finds a spot on the highest possible floor."""
 
     def find_spot(
-        self, floors: List[ParkingFloor], vehicle: Vehicle
+        self,
+        floors: List[ParkingFloor],
+        vehicle: Vehicle,
+        availability: Optional[LotAvailability] = None,
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional[OverflowPolicy] = None,
     ) -> Optional[ParkingSpot]:
-        # Iterate through floors from the last to the first by reversing the list
-        for floor in reversed(floors):
-            spot = floor.find_available_spot(vehicle)
-            if spot is not None:
-                return spot  # Return the first spot found from the top
-        return None
+        # As NearestFirst, but each size is searched from the top floor down
+        return self._find_cheapest(
+            floors, vehicle, availability, spot_filter, overflow, descending=True
+        )
 
 
 class BestFitStrategy(ParkingStrategy):
     """
     A concrete strategy that searches all floors to find the most size-appropriate
     (i.e., smallest possible) spot in the entire lot.
+    With an overflow policy, "smallest" means cheapest: a larger spot is only
+    used when no cheaper size is free on any floor.
     """
 
     def find_spot(
-        self, floors: List[ParkingFloor], vehicle: Vehicle
+        self,
+        floors: List[ParkingFloor],
+        vehicle: Vehicle,
+        availability: Optional[LotAvailability] = None,
+        spot_filter: Optional[SpotFilter] = None,
+        overflow: Optional[OverflowPolicy] = None,
     ) -> Optional[ParkingSpot]:
-        best_spot: Optional[ParkingSpot] = None
-
-        # Iterate through every floor to find all potential spots
-        for floor in floors:
-            spot_on_this_floor = floor.find_available_spot(vehicle)
-
-            if spot_on_this_floor is not None:
-                # If this is the first spot we've found, it's the best so far
-                if best_spot is None:
-                    best_spot = spot_on_this_floor
-                else:
-                    # If the new spot is a tighter fit than the current best spot, update it
-                    if (
-                        spot_on_this_floor.get_spot_size().value
-                        < best_spot.get_spot_size().value
-                    ):
-                        best_spot = spot_on_this_floor
-        return best_spot
+        # Sizes come cheapest first, and the tightest fit is the exact size, so the
+        # first size that is free anywhere wins and its lowest such floor is used
+        return self._find_cheapest(floors, vehicle, availability, spot_filter, overflow)
+
+
+# Optional find_spot arguments added after the original find_spot(floors, vehicle)
+_EXTRA_ARGUMENTS = ("availability", "spot_filter", "overflow")
+_accepted_extras: Dict[type, Tuple[str, ...]] = {}  # Strategy class -> extras its find_spot takes
+
+
+def call_find_spot(
+    strategy: ParkingStrategy,
+    floors: List[ParkingFloor],
+    vehicle: Vehicle,
+    availability: Optional[LotAvailability] = None,
+    spot_filter: Optional[SpotFilter] = None,
+    overflow: Optional[OverflowPolicy] = None,
+) -> Optional[ParkingSpot]:
+    """
+    Calls strategy.find_spot, passing the optional arguments by keyword and
+    only those its find_spot accepts. Custom strategies written against the
+    original find_spot(floors, vehicle) keep working; they just search without
+    the availability summary, the spot filter (so they may pick a spot booked
+    soon) or the overflow policy.
+    """
+    accepted = _accepted_extras.get(type(strategy))
+    if accepted is None:
+        parameters = inspect.signature(strategy.find_spot).parameters
+        if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+            accepted = _EXTRA_ARGUMENTS
+        else:
+            accepted = tuple(name for name in _EXTRA_ARGUMENTS if name in parameters)
+        _accepted_extras[type(strategy)] = accepted
+    if accepted == _EXTRA_ARGUMENTS:
+        return strategy.find_spot(
+            floors, vehicle, availability=availability, spot_filter=spot_filter, overflow=overflow
+        )
+    extras = {"availability": availability, "spot_filter": spot_filter, "overflow": overflow}
+    return strategy.find_spot(floors, vehicle, **{name: extras[name] for name in accepted})
@@ -1,20 +1,68 @@
+import os
 import uuid
-import time
 from vehicle import Vehicle
 from parking_spot import ParkingSpot
+from clock import Clock, SYSTEM_CLOCK
+from typing import List, Optional, Tuple
 
 
 class ParkingTicket:
     """Represents a ticket issued to a vehicle upon entering the parking lot."""
 
-    def __init__(self, vehicle: Vehicle, spot: ParkingSpot):
+    def __init__(
+        self, vehicle: Vehicle, spot: ParkingSpot, clock: Optional[Clock] = None
+    ):
         """Initializes a new ticket with a unique ID, vehicle/spot info, and entry time."""
         self.ticket_id = str(uuid.uuid4())  # Generate a unique ID for the ticket
         self.vehicle = vehicle  # The vehicle associated with this ticket
         self.spot = spot  # The spot where the vehicle is parked
-        self.entry_timestamp = int(time.time())  # Store entry time as a Unix timestamp
+        self.clock = clock or SYSTEM_CLOCK  # Source of entry and exit times
+        self.entry_timestamp = self.clock.now()  # Entry time as a Unix timestamp in ms
         self.exit_timestamp = 0  # Exit time is 0 until the vehicle unparks
 
+    @staticmethod
+    def restore(
+        ticket_id: str,
+        vehicle: Vehicle,
+        spot: ParkingSpot,
+        entry_timestamp: int,
+        clock: Optional[Clock] = None,
+    ) -> "ParkingTicket":
+        """Rebuilds an existing ticket (e.g. from a journal) without issuing a new ID or time."""
+        ticket = ParkingTicket.__new__(ParkingTicket)
+        ticket.ticket_id = ticket_id
+        ticket.vehicle = vehicle
+        ticket.spot = spot
+        ticket.clock = clock or SYSTEM_CLOCK
+        ticket.entry_timestamp = entry_timestamp
+        ticket.exit_timestamp = 0
+        return ticket
+
+    @staticmethod
+    def issue_all(
+        placements: List[Tuple[Vehicle, ParkingSpot]], clock: Optional[Clock] = None
+    ) -> List["ParkingTicket"]:
+        """
+        Issues one ticket per (vehicle, spot) for a batch that entered together:
+        one clock read and one read of random bytes for the whole batch.
+        """
+        clock = clock or SYSTEM_CLOCK
+        now = clock.now()
+        random_hex = os.urandom(16 * len(placements)).hex()
+        tickets = []
+        for index, (vehicle, spot) in enumerate(placements):
+            h = random_hex[32 * index : 32 * index + 32]
+            ticket = ParkingTicket.restore(
+                # A version 4 (random) UUID, as uuid.uuid4() would produce
+                f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}",
+                vehicle,
+                spot,
+                now,
+                clock,
+            )
+            tickets.append(ticket)
+        return tickets
+
     # Getter methods for ticket attributes
     def get_ticket_id(self) -> str:
         return self.ticket_id
@@ -25,12 +73,16 @@ class ParkingTicket:
     def get_spot(self) -> ParkingSpot:
         return self.spot
 
+    def set_spot(self, spot: ParkingSpot):
+        """Moves the ticket to another spot (when the lot rebalances overflow)."""
+        self.spot = spot
+
     def get_entry_timestamp(self) -> int:
         return self.entry_timestamp
 
     def get_exit_timestamp(self) -> int:
         return self.exit_timestamp
 
-    def set_exit_timestamp(self):
-        """Sets the exit timestamp to the current time."""
-        self.exit_timestamp = int(time.time())
+    def set_exit_timestamp(self, timestamp: Optional[int] = None):
+        """Sets the exit timestamp to the current time (or a time the caller already read)."""
+        self.exit_timestamp = self.clock.now() if timestamp is None else timestamp
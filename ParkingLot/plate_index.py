@@ -0,0 +1,115 @@
+# Import necessary classes and type hints
+import threading
+from collections import defaultdict
+from parking_ticket import ParkingTicket
+from typing import Dict, Iterable, List, Optional, Set
+
+GRAM = 3  # Length of the indexed substrings (trigrams)
+
+
+class VehicleLocation:
+    """Where a parked vehicle is: its ticket, floor number and spot ID."""
+
+    def __init__(self, ticket: ParkingTicket):
+        spot = ticket.get_spot()
+        floor = spot.get_floor()
+        self.ticket = ticket
+        self.floor_number = floor.floor_number if floor is not None else None
+        self.spot_id = spot.get_spot_id()
+
+    def get_ticket(self) -> ParkingTicket:
+        return self.ticket
+
+    def get_license_number(self) -> str:
+        return self.ticket.get_vehicle().get_license_number()
+
+    def get_floor_number(self) -> Optional[int]:
+        return self.floor_number
+
+    def get_spot_id(self) -> str:
+        return self.spot_id
+
+    def __str__(self) -> str:
+        return f"{self.get_license_number()} is on floor {self.floor_number}, spot {self.spot_id}"
+
+
+class PlateIndex:
+    """
+    A trigram index over the plates of parked vehicles, for partial-plate search.
+
+    Each plate is indexed by every 3-character substring of "^PLATE$", so the
+    markers let a query anchor to the start or end of a plate. A query uses the
+    same markers: "42K$" means "ends with 42K", "^AB" means "starts with AB" and
+    "7X9" means "contains 7X9". Matching is case-insensitive.
+    A query is answered by intersecting the plate sets of its trigrams (smallest
+    first) and then confirming each candidate, so its cost depends on the number
+    of matches rather than on how many vehicles are parked.
+    """
+
+    def __init__(self, plates: Iterable[str] = ()):
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        self._plates: Set[str] = set()
+        self._lock = threading.Lock()
+        for plate in plates:
+            self.add(plate)
+
+    def __len__(self) -> int:
+        return len(self._plates)
+
+    def add(self, plate: str):
+        self.add_all((plate,))
+
+    def add_all(self, plates: Iterable[str]):
+        """Indexes several plates under one lock acquisition."""
+        with self._lock:
+            for plate in plates:
+                if plate in self._plates:
+                    continue
+                self._plates.add(plate)
+                for gram in self._grams_of(f"^{plate.upper()}$"):
+                    self._grams[gram].add(plate)
+
+    def remove(self, plate: str):
+        self.remove_all((plate,))
+
+    def remove_all(self, plates: Iterable[str]):
+        """Drops several plates under one lock acquisition."""
+        with self._lock:
+            for plate in plates:
+                if plate not in self._plates:
+                    continue
+                self._plates.discard(plate)
+                for gram in self._grams_of(f"^{plate.upper()}$"):
+                    grams = self._grams.get(gram)
+                    if grams is not None:
+                        grams.discard(plate)
+                        if not grams:
+                            del self._grams[gram]
+
+    def clear(self):
+        with self._lock:
+            self._grams.clear()
+            self._plates.clear()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Returns the indexed plates matching a query, sorted, at most limit of them."""
+        pattern = query.upper()
+        with self._lock:
+            grams = set(self._grams_of(pattern))
+            if grams:
+                sets = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+                candidates = set(sets[0]).intersection(*sets[1:])
+            else:
+                # Too short to have a trigram: check every plate
+                candidates = set(self._plates)
+        matches = sorted(plate for plate in candidates if self.matches(plate, query))
+        return matches[:limit] if limit is not None else matches
+
+    @staticmethod
+    def matches(plate: str, query: str) -> bool:
+        """Checks a single plate against a query with optional ^ and $ anchors."""
+        return query.upper() in f"^{plate.upper()}$"
+
+    @staticmethod
+    def _grams_of(text: str) -> Iterable[str]:
+        return (text[i : i + GRAM] for i in range(len(text) - GRAM + 1))
@@ -0,0 +1,468 @@
+# Import necessary classes and type hints
+import itertools
+import random
+import threading
+from bisect import bisect_left
+from parking_floor import ParkingFloor, TimedSpotFilter
+from parking_spot import ParkingSpot
+from vehicle import Vehicle
+from vehicle_size import VehicleSize
+from typing import Callable, Dict, List, Optional, Tuple
+
+SpotKey = Tuple[int, str]  # (floor number, spot ID): spot IDs are only unique per floor
+
+# Bounds of the free gap before a spot's first booking and after its last one
+_OPEN_START = float("-inf")
+_OPEN_END = float("inf")
+
+
+class Reservation:
+    """A booking of one spot for the time window [start_ms, end_ms)."""
+
+    def __init__(
+        self,
+        reservation_id: int,
+        holder: str,
+        floor: ParkingFloor,
+        spot_id: str,
+        size: VehicleSize,
+        start_ms: int,
+        end_ms: int,
+    ):
+        self.reservation_id = reservation_id
+        self.holder = holder  # The license number the spot is held for
+        self.floor = floor
+        self.spot_id = spot_id
+        self.size = size
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.checked_in = False  # Set once the holder has parked with it
+
+    def get_reservation_id(self) -> int:
+        return self.reservation_id
+
+    def get_holder(self) -> str:
+        return self.holder
+
+    def get_spot(self) -> ParkingSpot:
+        return self.floor.spots[self.spot_id]
+
+    def get_spot_id(self) -> str:
+        return self.spot_id
+
+    def get_size(self) -> VehicleSize:
+        return self.size
+
+    def get_start(self) -> int:
+        return self.start_ms
+
+    def get_end(self) -> int:
+        return self.end_ms
+
+    def get_spot_key(self) -> SpotKey:
+        return (self.floor.floor_number, self.spot_id)
+
+    def is_checked_in(self) -> bool:
+        return self.checked_in
+
+
+class _GapNode:
+    __slots__ = ("key", "end", "priority", "max_end", "left", "right")
+
+    def __init__(self, key: Tuple[float, SpotKey], end: float, priority: float):
+        self.key = key  # (gap start, spot)
+        self.end = end
+        self.priority = priority
+        self.max_end = end  # The latest gap end in this subtree
+        self.left: Optional["_GapNode"] = None
+        self.right: Optional["_GapNode"] = None
+
+
+class FreeGapIndex:
+    """
+    The free gaps [start, end) between the bookings of every booked spot of
+    one size, in a treap ordered by gap start. Each node also holds the latest
+    gap end in its subtree. A spot is free for [t1, t2) if one of its gaps
+    starts at or before t1 and ends at or after t2; the subtree maxima steer
+    the search straight to such a gap, in O(log gaps) expected time.
+    """
+
+    def __init__(self):
+        self._root: Optional[_GapNode] = None
+        self._random = random.Random()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, start: float, end: float, spot_key: SpotKey):
+        node = _GapNode((start, spot_key), end, self._random.random())
+        self._root = self._insert(self._root, node)
+        self._count += 1
+
+    def remove(self, start: float, spot_key: SpotKey):
+        self._root = self._delete(self._root, (start, spot_key))
+        self._count -= 1
+
+    def find(self, start_ms: int, end_ms: int) -> Optional[SpotKey]:
+        """Returns a spot with a gap covering [start_ms, end_ms), or None."""
+        node = self._root
+        # Invariant: if such a gap exists, it is in node's subtree
+        while node is not None and node.max_end >= end_ms:
+            if node.key[0] > start_ms:
+                node = node.left  # This gap and every later one start too late
+                continue
+            # Every gap on the left starts no later than this one, so only its end matters
+            if node.left is not None and node.left.max_end >= end_ms:
+                node = node.left
+            elif node.end >= end_ms:
+                return node.key[1]
+            else:
+                node = node.right
+        return None
+
+    @staticmethod
+    def _update(node: _GapNode):
+        node.max_end = node.end
+        if node.left is not None and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right is not None and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+
+    @classmethod
+    def _insert(cls, root: Optional[_GapNode], node: _GapNode) -> _GapNode:
+        if root is None:
+            return node
+        if node.priority > root.priority:
+            node.left, node.right = cls._split(root, node.key)
+            cls._update(node)
+            return node
+        if node.key < root.key:
+            root.left = cls._insert(root.left, node)
+        else:
+            root.right = cls._insert(root.right, node)
+        cls._update(root)
+        return root
+
+    @classmethod
+    def _delete(cls, root: Optional[_GapNode], key) -> Optional[_GapNode]:
+        if root is None:
+            raise KeyError(key)
+        if root.key == key:
+            return cls._merge(root.left, root.right)
+        if key < root.key:
+            root.left = cls._delete(root.left, key)
+        else:
+            root.right = cls._delete(root.right, key)
+        cls._update(root)
+        return root
+
+    @classmethod
+    def _split(cls, root: Optional[_GapNode], key) -> Tuple[Optional[_GapNode], Optional[_GapNode]]:
+        """Splits a subtree into the nodes before key and the nodes after it."""
+        if root is None:
+            return None, None
+        if root.key < key:
+            root.right, after = cls._split(root.right, key)
+            cls._update(root)
+            return root, after
+        before, root.left = cls._split(root.left, key)
+        cls._update(root)
+        return before, root
+
+    @classmethod
+    def _merge(cls, left: Optional[_GapNode], right: Optional[_GapNode]) -> Optional[_GapNode]:
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = cls._merge(left.right, right)
+            cls._update(left)
+            return left
+        right.left = cls._merge(left, right.left)
+        cls._update(right)
+        return right
+
+
+class SpotSchedule:
+    """
+    The bookings of a single spot, kept as parallel lists sorted by start time.
+    Bookings on one spot never overlap, so the end times are sorted too, and a
+    window [start, end) conflicts only if the last booking starting before
+    `end` finishes after `start`: one binary search per check.
+    The free gaps between bookings are mirrored into the size's FreeGapIndex.
+    """
+
+    def __init__(self, gaps: FreeGapIndex, spot_key: SpotKey):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._reservation_ids: List[int] = []
+        self._gaps = gaps
+        self._spot_key = spot_key
+        gaps.add(_OPEN_START, _OPEN_END, spot_key)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def is_free(self, start_ms: int, end_ms: int) -> bool:
+        position = bisect_left(self._starts, end_ms) - 1
+        return position < 0 or self._ends[position] <= start_ms
+
+    def free_from(self, now_ms: int, length_ms: int) -> float:
+        """The earliest time at or after now_ms from which the spot is free for length_ms."""
+        start = now_ms
+        position = bisect_left(self._ends, now_ms + 1)  # The first booking still running
+        while position < len(self._starts) and self._starts[position] < start + length_ms:
+            start = max(start, self._ends[position])
+            position += 1
+        return start
+
+    def add(self, reservation: Reservation):
+        position = bisect_left(self._starts, reservation.start_ms)
+        gap_start, gap_end = self._gap_before(position)
+        self._gaps.remove(gap_start, self._spot_key)
+        self._add_gap(gap_start, reservation.start_ms)
+        self._add_gap(reservation.end_ms, gap_end)
+        self._starts.insert(position, reservation.start_ms)
+        self._ends.insert(position, reservation.end_ms)
+        self._reservation_ids.insert(position, reservation.reservation_id)
+
+    def remove(self, reservation: Reservation):
+        position = bisect_left(self._starts, reservation.start_ms)
+        del self._starts[position]
+        del self._ends[position]
+        del self._reservation_ids[position]
+        gap_start, gap_end = self._gap_before(position)
+        self._remove_gap(gap_start, reservation.start_ms)
+        self._remove_gap(reservation.end_ms, gap_end)
+        self._gaps.add(gap_start, gap_end, self._spot_key)
+
+    def pop_ended(self, before_ms: int) -> List[int]:
+        """Drops bookings that ended at or before before_ms; returns their IDs."""
+        count = bisect_left(self._ends, before_ms + 1)
+        if count == 0:
+            return []
+        for position in range(count + 1):
+            self._remove_gap(*self._gap_before(position))
+        ended = self._reservation_ids[:count]
+        del self._starts[:count]
+        del self._ends[:count]
+        del self._reservation_ids[:count]
+        self._gaps.add(*self._gap_before(0), self._spot_key)
+        return ended
+
+    def detach(self):
+        """Removes the spot's (single, unbounded) gap once it has no bookings left."""
+        self._gaps.remove(_OPEN_START, self._spot_key)
+
+    def _gap_before(self, position: int) -> Tuple[float, float]:
+        """The free gap that ends where the booking at position starts."""
+        gap_start = self._ends[position - 1] if position > 0 else _OPEN_START
+        gap_end = self._starts[position] if position < len(self._starts) else _OPEN_END
+        return gap_start, gap_end
+
+    def _add_gap(self, start: float, end: float):
+        if start < end:  # Back-to-back bookings leave no gap
+            self._gaps.add(start, end, self._spot_key)
+
+    def _remove_gap(self, start: float, end: float):
+        if start < end:
+            self._gaps.remove(start, self._spot_key)
+
+
+class ReservationBook:
+    """
+    Future bookings for the lot's spots, keyed by (floor number, spot ID).
+
+    Spots that have never been booked sit on one stack per size, so booking
+    one of them is O(1). Spots with bookings have a SpotSchedule, and checking
+    whether such a spot is free for a window takes O(log bookings), however
+    many future bookings it holds. Finding any booked spot of a size that is
+    free for a window is one FreeGapIndex search, O(log gaps).
+
+    Walk-in vehicles may only take a spot that has no booking starting within
+    walk_in_window_ms, so a reserved spot is free when its holder arrives.
+    """
+
+    # How far ahead a walk-in must leave a spot free of bookings
+    DEFAULT_WALK_IN_WINDOW_MS = 60 * 60 * 1000
+
+    def __init__(self, walk_in_window_ms: int = DEFAULT_WALK_IN_WINDOW_MS):
+        self.walk_in_window_ms = walk_in_window_ms
+        self._unreserved: Dict[VehicleSize, List[Tuple[ParkingFloor, str]]] = {
+            size: [] for size in VehicleSize
+        }
+        # Free gaps of the booked spots, per size
+        self._gaps: Dict[VehicleSize, FreeGapIndex] = {size: FreeGapIndex() for size in VehicleSize}
+        # Only booked spots have a schedule
+        self._schedules: Dict[SpotKey, Tuple[ParkingFloor, SpotSchedule]] = {}
+        self._reservations: Dict[int, Reservation] = {}
+        self._next_id = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_floor(self, floor: ParkingFloor):
+        """Makes every spot on a floor available for booking."""
+        with self._lock:
+            for spot in floor.spots.values():
+                self._unreserved[spot.get_spot_size()].append(
+                    (floor, spot.get_spot_id())
+                )
+
+    def reserve(
+        self, size: VehicleSize, start_ms: int, end_ms: int, holder: str
+    ) -> Optional[Reservation]:
+        """
+        Books a spot of the given size for [start_ms, end_ms) for the vehicle
+        with license number holder; None if none is free.
+        """
+        if end_ms <= start_ms:
+            raise ValueError("A reservation must end after it starts.")
+        with self._lock:
+            unreserved = self._unreserved[size]
+            if unreserved:
+                # Fast path: a spot with no bookings at all
+                floor, spot_id = unreserved.pop()
+                spot_key = (floor.floor_number, spot_id)
+                schedule = SpotSchedule(self._gaps[size], spot_key)
+                self._schedules[spot_key] = (floor, schedule)
+            else:
+                spot_key = self._gaps[size].find(start_ms, end_ms)
+                if spot_key is None:
+                    return None
+                floor, schedule = self._schedules[spot_key]
+            return self._book(floor, spot_key[1], schedule, size, start_ms, end_ms, holder)
+
+    def cancel(self, reservation_id: int) -> bool:
+        """Cancels a booking; returns False if it does not exist (any more)."""
+        with self._lock:
+            reservation = self._reservations.pop(reservation_id, None)
+            if reservation is None:
+                return False
+            spot_key = reservation.get_spot_key()
+            floor, schedule = self._schedules[spot_key]
+            schedule.remove(reservation)
+            self._release_if_empty(spot_key, floor, schedule)
+        # The floor may be keeping the spot from walk-ins; outside our lock,
+        # since floors call the walk-in filter (and so this book) under theirs
+        floor.recheck_spot(reservation.spot_id)
+        return True
+
+    def check_in(self, reservation_id: int, vehicle: Vehicle, now_ms: int) -> Optional[Reservation]:
+        """
+        Marks a reservation as used by its holder arriving at now_ms. Returns
+        None unless the vehicle is the holder, has the booked size, arrives
+        within the booked window, and the reservation was not used already.
+        """
+        with self._lock:
+            reservation = self._reservations.get(reservation_id)
+            if (
+                reservation is None
+                or reservation.checked_in
+                or reservation.holder != vehicle.get_license_number()
+                or reservation.size != vehicle.get_size()
+                or not reservation.start_ms <= now_ms < reservation.end_ms
+            ):
+                return None
+            reservation.checked_in = True
+            return reservation
+
+    def undo_check_in(self, reservation: Reservation):
+        """Makes a reservation usable again, e.g. when no spot could be found for it."""
+        with self._lock:
+            reservation.checked_in = False
+
+    def expire(self, now_ms: int) -> int:
+        """Forgets every booking that ended at or before now_ms; returns how many."""
+        expired = 0
+        with self._lock:
+            for spot_key, (floor, schedule) in list(self._schedules.items()):
+                for reservation_id in schedule.pop_ended(now_ms):
+                    del self._reservations[reservation_id]
+                    expired += 1
+                self._release_if_empty(spot_key, floor, schedule)
+        return expired
+
+    def get_reservation(self, reservation_id: int) -> Optional[Reservation]:
+        return self._reservations.get(reservation_id)
+
+    def get_reservation_count(self) -> int:
+        return len(self._reservations)
+
+    def is_spot_free(self, floor_number: int, spot_id: str, start_ms: int, end_ms: int) -> bool:
+        """Checks whether a spot has no booking overlapping [start_ms, end_ms)."""
+        # Under the lock: a booking being added updates the schedule's lists one by one
+        with self._lock:
+            entry = self._schedules.get((floor_number, spot_id))
+            return entry is None or entry[1].is_free(start_ms, end_ms)  # None: never booked
+
+    def spot_free_from(self, floor_number: int, spot_id: str, now_ms: int, length_ms: int) -> float:
+        """The earliest time at or after now_ms from which a spot is free for length_ms."""
+        with self._lock:
+            entry = self._schedules.get((floor_number, spot_id))
+            return now_ms if entry is None else entry[1].free_from(now_ms, length_ms)
+
+    def window_filter(self, start_ms: int, end_ms: int) -> Optional[Callable[[ParkingSpot], bool]]:
+        """
+        Returns a spot_filter for the parking strategies that only accepts spots
+        free for [start_ms, end_ms), or None when nothing is booked at all.
+        """
+        if not self._reservations:
+            return None
+        return lambda spot: self.is_spot_free(
+            spot.get_floor().floor_number, spot.get_spot_id(), start_ms, end_ms
+        )
+
+    def walk_in_filter(self, now_ms: int) -> Optional[Callable[[ParkingSpot], bool]]:
+        """
+        The spot_filter for a walk-in vehicle arriving at now_ms (None when
+        nothing is booked). Floors keep the spots it rejects out of their
+        free-spot index until a walk-in could take them.
+        """
+        if not self._reservations:
+            return None
+        return _WalkInFilter(self, now_ms)
+
+    def _book(
+        self,
+        floor: ParkingFloor,
+        spot_id: str,
+        schedule: SpotSchedule,
+        size: VehicleSize,
+        start_ms: int,
+        end_ms: int,
+        holder: str,
+    ) -> Reservation:
+        reservation = Reservation(
+            next(self._next_id), holder, floor, spot_id, size, start_ms, end_ms
+        )
+        schedule.add(reservation)
+        self._reservations[reservation.reservation_id] = reservation
+        return reservation
+
+    def _release_if_empty(self, spot_key: SpotKey, floor: ParkingFloor, schedule: SpotSchedule):
+        """Moves a spot whose last booking is gone back onto the unreserved stack."""
+        if len(schedule) == 0:
+            schedule.detach()
+            del self._schedules[spot_key]
+            self._unreserved[floor.spots[spot_key[1]].get_spot_size()].append((floor, spot_key[1]))
+
+
+class _WalkInFilter(TimedSpotFilter):
+    """Accepts spots with no booking starting within the book's walk-in window."""
+
+    def __init__(self, book: ReservationBook, now_ms: int):
+        super().__init__(now_ms)
+        self._book = book
+        self._end_ms = now_ms + book.walk_in_window_ms
+
+    def __call__(self, spot: ParkingSpot) -> bool:
+        return self._book.is_spot_free(
+            spot.get_floor().floor_number, spot.get_spot_id(), self.now_ms, self._end_ms
+        )
+
+    def available_from(self, spot: ParkingSpot) -> float:
+        return self._book.spot_free_from(
+            spot.get_floor().floor_number,
+            spot.get_spot_id(),
+            self.now_ms,
+            self._book.walk_in_window_ms,
+        )
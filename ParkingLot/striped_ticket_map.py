@@ -0,0 +1,145 @@
+import threading
+from collections.abc import MutableMapping
+from contextlib import ExitStack, contextmanager
+from parking_ticket import ParkingTicket
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class StripedTicketMap(MutableMapping):
+    """
+    A dictionary of active tickets keyed by license number, split into stripes.
+    Each stripe has its own lock, so gates handling different plates rarely
+    contend with each other. The locks are reentrant, so a caller can hold a
+    plate's stripe (lock_for) across several steps that must not interleave
+    with another gate handling the same plate, e.g. a state change and its
+    journal record.
+    """
+
+    DEFAULT_STRIPES = 16
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES):
+        self._maps: List[Dict[str, ParkingTicket]] = [{} for _ in range(stripes)]
+        self._locks: List[threading.RLock] = [threading.RLock() for _ in range(stripes)]
+
+    def _stripe(self, license_number: str) -> int:
+        return hash(license_number) % len(self._maps)
+
+    def lock_for(self, license_number: str) -> threading.RLock:
+        """The lock of the stripe holding this plate."""
+        return self._locks[self._stripe(license_number)]
+
+    @contextmanager
+    def lock_all(self):
+        """
+        Holds every stripe at once (always in stripe order, so it cannot
+        deadlock with another lock_all), for a consistent cut of all tickets.
+        """
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
+
+    def __getitem__(self, license_number: str) -> ParkingTicket:
+        index = self._stripe(license_number)
+        with self._locks[index]:
+            return self._maps[index][license_number]
+
+    def __setitem__(self, license_number: str, ticket: ParkingTicket):
+        index = self._stripe(license_number)
+        with self._locks[index]:
+            self._maps[index][license_number] = ticket
+
+    def __delitem__(self, license_number: str):
+        index = self._stripe(license_number)
+        with self._locks[index]:
+            del self._maps[index][license_number]
+
+    def pop(self, license_number: str, *default) -> Optional[ParkingTicket]:
+        """Atomically removes and returns a ticket (the mixin version is not atomic)."""
+        index = self._stripe(license_number)
+        with self._locks[index]:
+            return self._maps[index].pop(license_number, *default)
+
+    def update(self, tickets: Dict[str, ParkingTicket]):
+        """Adds many tickets, taking each stripe's lock once."""
+        by_stripe: List[Dict[str, ParkingTicket]] = [{} for _ in self._maps]
+        for license_number, ticket in tickets.items():
+            by_stripe[self._stripe(license_number)][license_number] = ticket
+        for index, batch in enumerate(by_stripe):
+            if batch:
+                with self._locks[index]:
+                    self._maps[index].update(batch)
+
+    def add_all(
+        self,
+        tickets: List[ParkingTicket],
+        while_locked: Optional[Callable[[List[ParkingTicket]], None]] = None,
+    ):
+        """
+        Adds a batch of tickets, taking each stripe's lock once. while_locked,
+        if given, is called with each stripe's tickets while that stripe is
+        still held (e.g. to journal them in the same critical section).
+        """
+        by_stripe: List[List[ParkingTicket]] = [[] for _ in self._maps]
+        for ticket in tickets:
+            by_stripe[self._stripe(ticket.get_vehicle().get_license_number())].append(ticket)
+        for index, batch in enumerate(by_stripe):
+            if batch:
+                with self._locks[index]:
+                    stripe = self._maps[index]
+                    for ticket in batch:
+                        stripe[ticket.get_vehicle().get_license_number()] = ticket
+                    if while_locked is not None:
+                        while_locked(batch)
+
+    def pop_all(
+        self,
+        license_numbers: List[str],
+        while_locked: Optional[Callable[[List[ParkingTicket]], None]] = None,
+    ) -> List[Optional[ParkingTicket]]:
+        """
+        Removes a batch of tickets, taking each stripe's lock once, and returns
+        them aligned with license_numbers (None where there was no ticket).
+        while_locked, if given, is called with each stripe's removed tickets
+        while that stripe is still held.
+        """
+        by_stripe: List[List[int]] = [[] for _ in self._maps]
+        for position, license_number in enumerate(license_numbers):
+            by_stripe[self._stripe(license_number)].append(position)
+        tickets: List[Optional[ParkingTicket]] = [None] * len(license_numbers)
+        for index, positions in enumerate(by_stripe):
+            if positions:
+                with self._locks[index]:
+                    stripe = self._maps[index]
+                    removed = []
+                    for position in positions:
+                        ticket = stripe.pop(license_numbers[position], None)
+                        if ticket is not None:
+                            tickets[position] = ticket
+                            removed.append(ticket)
+                    if removed and while_locked is not None:
+                        while_locked(removed)
+        return tickets
+
+    def __iter__(self) -> Iterator[str]:
+        # Iterate over a copy of each stripe so concurrent writers don't break iteration
+        for index, stripe in enumerate(self._maps):
+            with self._locks[index]:
+                keys = list(stripe)
+            yield from keys
+
+    def values(self) -> List[ParkingTicket]:
+        """Returns a copy of the tickets, taken one stripe at a time."""
+        tickets: List[ParkingTicket] = []
+        for index, stripe in enumerate(self._maps):
+            with self._locks[index]:
+                tickets.extend(stripe.values())
+        return tickets
+
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self._maps)
+
+    def clear(self):
+        for index, stripe in enumerate(self._maps):
+            with self._locks[index]:
+                stripe.clear()
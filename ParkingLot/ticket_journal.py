@@ -0,0 +1,291 @@
+"""
+An append-only, crash-safe journal of park and unpark events for ParkingLot.
+
+Records are JSON lines tagged with a log sequence number (LSN). Appends only
+buffer the record; a background flusher thread writes and fsyncs everything
+that has queued up in one go (group commit), so the fsync cost is shared by all
+gates that appended in the meantime. Periodic snapshots capture the layout and
+the active tickets, after which older journal segments are deleted.
+
+On disk a journal directory holds:
+  snapshot.json              - the latest snapshot and the LSN it covers
+  journal-<first LSN>.log    - journal segments, replayed in order after the snapshot
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+SNAPSHOT_FILE = "snapshot.json"
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".log"
+
+
+class TicketJournal:
+    # Default number of records after which the lot takes a new snapshot
+    DEFAULT_SNAPSHOT_EVERY = 20_000
+
+    def __init__(
+        self,
+        directory: str,
+        commit_interval: float = 0.002,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+    ):
+        """
+        Opens (or creates) a journal directory.
+        commit_interval is how long the flusher waits to gather more records
+        into one fsync; snapshot_every is the record count between snapshots.
+        """
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()  # Guards the pending buffer and LSN counters
+        self._io_lock = threading.Lock()  # Held while writing to a segment file
+        self._snapshot_lock = threading.Lock()  # Only one snapshot at a time
+        self._durable = threading.Condition(self._lock)
+        self._pending: List[str] = []
+        self._next_lsn = self._find_last_lsn() + 1
+        self._durable_lsn = self._next_lsn - 1
+        self._records_since_snapshot = 0
+        self._closed = False
+
+        # New records always go to a fresh segment; older ones stay for recovery
+        self._segment = self._open_segment(self._next_lsn)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    # ----- Appending and group commit -----
+
+    def append(self, record: dict) -> int:
+        """Buffers a record for the next group commit and returns its LSN."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The journal is closed.")
+            lsn = self._next_lsn
+            self._next_lsn += 1
+            record["lsn"] = lsn
+            self._pending.append(json.dumps(record, separators=(",", ":")) + "\n")
+            self._records_since_snapshot += 1
+            self._durable.notify_all()  # Wake the flusher
+            return lsn
+
+    def append_all(self, records: List[dict]) -> int:
+        """
+        Buffers several records, in order, under one lock acquisition (e.g. a
+        batch of parks) and returns the LSN of the last one.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The journal is closed.")
+            for record in records:
+                record["lsn"] = self._next_lsn
+                self._next_lsn += 1
+                self._pending.append(json.dumps(record, separators=(",", ":")) + "\n")
+            self._records_since_snapshot += len(records)
+            self._durable.notify_all()  # Wake the flusher
+            return self._next_lsn - 1
+
+    def wait_durable(self, lsn: Optional[int] = None):
+        """
+        Blocks until the record with this LSN (by default, every record appended
+        so far) has been fsynced.
+        """
+        with self._lock:
+            target = self._next_lsn - 1 if lsn is None else lsn
+            while self._durable_lsn < target and not self._closed:
+                self._durable.wait()
+
+    def is_empty(self) -> bool:
+        """True if the directory holds no snapshot and no records."""
+        with self._lock:
+            if self._next_lsn > 1:
+                return False
+        return not os.path.exists(os.path.join(self.directory, SNAPSHOT_FILE))
+
+    def last_lsn(self) -> int:
+        """The LSN of the latest record appended (0 if none yet)."""
+        with self._lock:
+            return self._next_lsn - 1
+
+    def records_since_snapshot(self) -> int:
+        return self._records_since_snapshot
+
+    def needs_snapshot(self) -> bool:
+        return self._records_since_snapshot >= self.snapshot_every
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._durable.wait()
+                if self._closed and not self._pending:
+                    return
+            # Give other gates a moment to join this commit
+            if self.commit_interval > 0:
+                time.sleep(self.commit_interval)
+            self._flush()
+
+    def _flush(self):
+        """Writes and fsyncs every pending record, then wakes the waiters."""
+        with self._io_lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        """The body of _flush; the caller must hold _io_lock."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            last_lsn = self._next_lsn - 1
+        if lines:
+            self._segment.writelines(lines)
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+        with self._lock:
+            self._durable_lsn = max(self._durable_lsn, last_lsn)
+            self._durable.notify_all()
+
+    # ----- Snapshots -----
+
+    def maybe_snapshot(self, capture: Callable[[], dict]):
+        """
+        Takes a snapshot if snapshot_every records have been appended since the
+        last one. Returns immediately if another thread is already snapshotting.
+        """
+        if not self.needs_snapshot():
+            return
+        if not self._snapshot_lock.acquire(blocking=False):
+            return
+        try:
+            if self.needs_snapshot():
+                self._write_snapshot(capture)
+        finally:
+            self._snapshot_lock.release()
+
+    def write_snapshot(self, capture: Callable[[], dict]):
+        """
+        Takes a snapshot and compacts the journal.
+        The journal first switches to a new segment; capture() is then called to
+        read the lot's state, which already includes every record in the older
+        segments, so those can be deleted once the snapshot is durable.
+        capture() must return the state together with state["lsn"], the
+        last_lsn() read while no change can be appended (i.e. under the same
+        locks as the state), so that the snapshot holds exactly the records up
+        to that LSN and recovery replays exactly the ones after it.
+        """
+        with self._snapshot_lock:
+            self._write_snapshot(capture)
+
+    def _write_snapshot(self, capture: Callable[[], dict]):
+        """The body of write_snapshot; the caller must hold _snapshot_lock."""
+        with self._io_lock:
+            self._write_pending()
+            with self._lock:
+                switch_lsn = self._next_lsn - 1
+                self._records_since_snapshot = 0
+            old_segment = self._segment
+            self._segment = self._open_segment(switch_lsn + 1)
+            old_segment.close()
+
+        state = capture()
+        if state["lsn"] < switch_lsn:
+            raise ValueError("A snapshot cannot cover fewer records than the segments it replaces.")
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as snapshot_file:
+            json.dump(state, snapshot_file, separators=(",", ":"))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, path)  # Atomic: readers see the old or the new snapshot
+        self._fsync_directory()
+
+        # Segments closed at the switch are fully covered; the current one may not be
+        for first_lsn, segment_path in self._segments():
+            if first_lsn <= switch_lsn:
+                os.remove(segment_path)
+
+    # ----- Recovery -----
+
+    def load(self) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Reads the latest snapshot (None if there is none) and every journal
+        record after it, in LSN order. A torn final line from a crash is ignored.
+        """
+        snapshot = self._read_snapshot()
+        covered_lsn = snapshot["lsn"] if snapshot is not None else 0
+        records: List[dict] = []
+        for _, segment_path in self._segments():
+            with open(segment_path) as segment:
+                for line in segment:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of a segment
+                    if record["lsn"] > covered_lsn:
+                        records.append(record)
+        return snapshot, records
+
+    def close(self):
+        """Flushes everything still pending and stops the flusher thread."""
+        with self._lock:
+            self._closed = True
+            self._durable.notify_all()
+        self._flusher.join()
+        self._flush()
+        self._segment.close()
+
+    # ----- File helpers -----
+
+    def _read_snapshot(self) -> Optional[dict]:
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as snapshot_file:
+            return json.load(snapshot_file)
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        """Returns (first LSN, path) for every segment, oldest first."""
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                first_lsn = int(name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+                segments.append((first_lsn, os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def _open_segment(self, first_lsn: int):
+        path = os.path.join(
+            self.directory, f"{SEGMENT_PREFIX}{first_lsn:012d}{SEGMENT_SUFFIX}"
+        )
+        segment = open(path, "a")
+        self._fsync_directory()
+        return segment
+
+    def _find_last_lsn(self) -> int:
+        """The highest LSN already on disk, so numbering continues after a restart."""
+        last_lsn = 0
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            last_lsn = snapshot["lsn"]
+        segments = self._segments()
+        if segments:
+            with open(segments[-1][1]) as segment:
+                for line in segment:
+                    try:
+                        last_lsn = max(last_lsn, json.loads(line)["lsn"])
+                    except ValueError:
+                        break
+            # An empty newest segment still tells us where numbering had reached
+            last_lsn = max(last_lsn, segments[-1][0] - 1)
+        return last_lsn
+
+    def _fsync_directory(self):
+        """Makes file creations and renames in the journal directory durable."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return  # Not supported on this platform (e.g. Windows)
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)